@@ -1,58 +1,130 @@
 # Aplicación principal de Noel Moreno Website
 import os
+import threading
 from flask import Flask, render_template, redirect
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, login_required
-from flask_admin import Admin, AdminIndexView
-from flask_admin.contrib.sqla import ModelView
 from flask_cors import CORS
 
 # Importar configuración
 from config import config
 
 # Importar base de datos
-from backend.database import db
+from backend.database import db, init_db
 
 # Inicializar extensiones
 login_manager = LoginManager()
 
 def create_app(config_name='default'):
     """Factory function para crear la aplicación"""
-    app = Flask(__name__, template_folder='backend/templates')
+    # Los estáticos propios del backend se sirven bajo /admin-static para que
+    # /static/ quede libre para el frontend (ver backend/static_handler.py)
+    app = Flask(__name__, template_folder='backend/templates',
+                static_folder='backend/static', static_url_path='/admin-static')
     
     # Configuración
     app.config.from_object(config[config_name])
     
+    # IP y esquema reales del cliente detrás del balanceador (request.remote_addr)
+    if app.config.get('PROXY_FIX_X_FOR') or app.config.get('PROXY_FIX_X_PROTO'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config.get('PROXY_FIX_X_FOR', 0),
+                                x_proto=app.config.get('PROXY_FIX_X_PROTO', 0))
+    
     # Inicializar extensiones
-    db.init_app(app)
+    init_db(app)
     login_manager.init_app(app)
-    CORS(app)
+    CORS(app, expose_headers=['ETag', 'Last-Modified'])
+    
+    # Caché de respuestas de la API pública
+    from backend.utils.cache import response_cache, register_cache_events
+    from backend.models import Project, Testimonial, BlogPost
+    response_cache.init_app(app)
+    register_cache_events(db.session, Project, Testimonial, BlogPost)
+    
+    # Contador de vistas del blog con escritura diferida
+    from backend.utils.view_counter import view_counter
+    view_counter.init_app(app)
+    
+    # Cola de trabajos en segundo plano (mensajes de contacto y notificaciones)
+    from backend.utils.job_queue import job_queue
+    import backend.utils.contact_queue  # registra los handlers de la cola
+    job_queue.init_app(app)
+    
+    # Hub de cambios para el stream SSE del dashboard
+    from backend.utils.events import change_hub, register_change_events
+    change_hub.init_app(app)
+    register_change_events(db.session)
+    
+    # Copias de seguridad de la base de datos
+    from backend.utils.backup import backup_manager
+    backup_manager.init_app(app)
+    
+    # Limitación de peticiones del formulario de contacto y del login
+    from backend.utils.rate_limit import rate_limiter
+    rate_limiter.init_app(app)
+    
+    # Perfilado de peticiones y consultas SQL
+    from backend.utils.profiling import request_profiler
+    request_profiler.init_app(app)
+    
+    # Métricas de Prometheus (/metrics)
+    from backend.utils.metrics import metrics
+    metrics.init_app(app)
+    with app.app_context():
+        metrics.watch_pool(db.engine)
     
     # Configuración de Login Manager
     login_manager.login_view = 'auth.admin_login'
     login_manager.login_message = 'Por favor, inicia sesión para acceder a esta página.'
     login_manager.login_message_category = 'info'
     
+    # Los usuarios autenticados se sirven desde caché sin consultar la base
+    from backend.utils.user_cache import user_cache
+    user_cache.init_app(app)
+    
     @login_manager.user_loader
     def load_user(user_id):
-        from backend.models import User
-        return User.query.get(int(user_id))
+        return user_cache.load(int(user_id))
     
     # Registrar blueprints
-    from backend.routes import main_bp, api_bp, auth_bp
+    from backend.routes import main_bp, api_bp, auth_bp, metrics_bp
     from backend.routes.admin import admin_bp
     from backend.static_handler import static_bp
     app.register_blueprint(static_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp)
     app.register_blueprint(auth_bp)
+    app.register_blueprint(metrics_bp)
     app.register_blueprint(admin_bp)
     
+    # Comandos de línea de órdenes (flask backup ...)
+    from backend.cli import register_commands
+    register_commands(app)
+    
     # Ruta raíz que redirige al frontend
     @app.route('/')
     def root():
         return redirect('/static/index.html')
     
+    # Flask-Admin (/admin-flask) se registra justo antes de la primera
+    # petición: la CLI, los scripts y los tests no pagan su importación
+    app.extensions['flask_admin_lazy'] = {'admin': None, 'lock': threading.Lock()}
+    app.wsgi_app = _LazyFlaskAdmin(app, app.wsgi_app)
+    
+    # Crear tablas e índices y datos iniciales solo si se pide (base en memoria
+    # de los tests); en el resto se usa "flask init-db" y "flask seed"
+    if app.config.get('AUTO_INIT_DB'):
+        with app.app_context():
+            init_database(seed=True)
+    
+    return app
+
+def register_flask_admin(app):
+    """Crear Flask-Admin y sus vistas sobre los modelos"""
+    from flask_admin import Admin, AdminIndexView
+    from flask_admin.contrib.sqla import ModelView
+    
     # Definir clases para Flask-Admin
     from backend.models import User, ContactMessage, Project, Testimonial, BlogPost
     
@@ -100,11 +172,20 @@ def create_app(config_name='default'):
             'mensaje': 'Mensaje'
         }
         column_filters = ['fecha', 'servicio', 'leido']
+        form_excluded_columns = ['token_envio']
         column_searchable_list = ['nombre', 'email', 'mensaje']
         
         def on_model_change(self, form, model, is_created):
             if not is_created:
                 model.leido = True
+        
+        def _apply_search(self, query, count_query, joins, count_joins, search):
+            """Buscar a través del índice FTS5 en lugar de LIKE '%término%'"""
+            from backend.utils.search import filter_messages
+            query = filter_messages(query, search)
+            if count_query is not None:
+                count_query = filter_messages(count_query, search)
+            return query, count_query, joins, count_joins
     
     
     # Agregar vistas al admin
@@ -113,13 +194,38 @@ def create_app(config_name='default'):
     admin.add_view(SecureModelView(Testimonial, db.session, name='Testimonios'))
     admin.add_view(SecureModelView(BlogPost, db.session, name='Blog'))
     
-    # Crear tablas de base de datos
-    with app.app_context():
-        db.create_all()
-        create_admin_user()
-        create_sample_data()
+    return admin
+
+def ensure_flask_admin(app):
+    """Registrar Flask-Admin una sola vez (antes de servir peticiones)"""
+    state = app.extensions['flask_admin_lazy']
+    if state['admin'] is None:
+        with state['lock']:
+            if state['admin'] is None:
+                state['admin'] = register_flask_admin(app)
+    return state['admin']
+
+class _LazyFlaskAdmin:
+    """Middleware WSGI que registra Flask-Admin al llegar la primera petición"""
     
-    return app
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+        self.ready = False
+    
+    def __call__(self, environ, start_response):
+        if not self.ready:
+            ensure_flask_admin(self.app)
+            self.ready = True
+        return self.wsgi_app(environ, start_response)
+
+def init_database(seed=False):
+    """Crear tablas e índices que falten y el usuario administrador (y datos de ejemplo)"""
+    from backend.migrations import upgrade_schema
+    upgrade_schema()
+    create_admin_user()
+    if seed:
+        create_sample_data()
 
 def create_admin_user():
     """Crear usuario administrador por defecto"""
@@ -229,10 +335,19 @@ def create_sample_data():
     db.session.commit()
     print("✅ Datos de ejemplo creados")
 
-# Crear aplicación
-app = create_app()
+def __getattr__(name):
+    """Crear ``app`` al primer acceso (gunicorn app:app, flask --app app) y no al importar"""
+    if name == 'app':
+        application = create_app(os.environ.get('FLASK_ENV', 'default'))
+        globals()['app'] = application
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
+    app = create_app(os.environ.get('FLASK_ENV', 'default'))
+    with app.app_context():
+        init_database(seed=True)
+    
     print("\n🚀 Backend de Noel Moreno iniciado")
     print("📊 Panel de administración: http://localhost:5000/admin")
     print("🔐 Usuario: admin / Contraseña: admin123")
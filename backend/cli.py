@@ -0,0 +1,85 @@
+# Comandos de línea de órdenes (flask --app app <comando>)
+import os
+
+import click
+from flask.cli import AppGroup, with_appcontext
+
+from backend.utils.backup import BackupError, backup_manager, format_size
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Crear las tablas e índices que falten y el usuario administrador"""
+    from app import init_database
+    init_database()
+    click.echo('✅ Base de datos inicializada')
+
+
+@click.command('seed')
+@with_appcontext
+def seed_command():
+    """Crear los proyectos y testimonios de ejemplo si la base está vacía"""
+    from app import create_sample_data
+    create_sample_data()
+
+
+backup_cli = AppGroup('backup', help='Copias de seguridad de la base de datos.')
+
+
+@backup_cli.command('create')
+def backup_create():
+    """Crear una copia comprimida de la base de datos"""
+    try:
+        backup = backup_manager.create_backup()
+    except BackupError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"✅ Backup creado: {backup['path']}")
+    click.echo(f"   {backup['pages']} páginas, {format_size(backup['size'])} comprimido, "
+               f"{backup['duration']:.2f} s")
+    click.echo(f"   sha256 {backup['sha256']}")
+    for name in backup['removed']:
+        click.echo(f"   Eliminado por rotación: {name}")
+
+
+@backup_cli.command('list')
+def backup_list():
+    """Listar las copias existentes"""
+    backups = backup_manager.list_backups()
+    if not backups:
+        click.echo('No hay backups')
+        return
+    for backup in backups:
+        click.echo(f"{backup['created']:%Y-%m-%d %H:%M:%S}  {format_size(backup['size']):>10}  "
+                   f"{backup['name']}")
+
+
+@backup_cli.command('verify')
+@click.argument('name', required=False)
+def backup_verify(name):
+    """Comprobar el sha256 de una copia (por defecto, de todas)"""
+    backups = backup_manager.list_backups()
+    if name:
+        backups = [backup for backup in backups if backup['name'] == os.path.basename(name)]
+        if not backups:
+            raise click.ClickException(f'No existe el backup {name}')
+
+    failed = False
+    for backup in backups:
+        try:
+            valid = backup_manager.verify(backup['path'])
+        except BackupError as e:
+            click.echo(f"⚠️  {backup['name']}: {e}")
+            failed = True
+            continue
+        click.echo(f"{'✅' if valid else '❌'} {backup['name']}")
+        failed = failed or not valid
+    if failed:
+        raise SystemExit(1)
+
+
+def register_commands(app):
+    """Registrar los comandos en la CLI de Flask"""
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(backup_cli)
@@ -1,5 +1,31 @@
 # Configuración de la base de datos
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 # Instancia global de la base de datos
 db = SQLAlchemy()
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Ejecutar los PRAGMA configurados sobre una conexión SQLite nueva"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def init_db(app):
+    """Inicializar la base de datos y aplicar los PRAGMA de SQLite en cada conexión"""
+    db.init_app(app)
+
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
@@ -0,0 +1,41 @@
+# Migraciones ligeras del esquema de base de datos
+import logging
+
+from backend.database import db
+from backend.utils.search import ensure_search_index
+
+
+def upgrade_schema():
+    """Crear las tablas, columnas e índices (incluidos los FTS5) que falten en una base de datos existente.
+
+    ``db.create_all()`` no toca las tablas que ya existen, así que las columnas
+    (opcionales) y los índices declarados después de crearlas se añaden aquí
+    uno a uno.
+    """
+    db.create_all()
+
+    created = []
+    with db.engine.begin() as connection:
+        inspector = db.inspect(connection)
+        for table in db.metadata.sorted_tables:
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    column_type = column.type.compile(dialect=connection.dialect)
+                    connection.exec_driver_sql(
+                        f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                    )
+                    created.append(f'{table.name}.{column.name}')
+
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(bind=connection)
+                    created.append(index.name)
+
+        # Índices de búsqueda de texto completo (FTS5)
+        created.extend(ensure_search_index(connection))
+
+    if created:
+        logging.info(f"Columnas e índices creados: {', '.join(created)}")
+    return created
@@ -5,6 +5,12 @@ from backend.database import db
 class BlogPost(db.Model):
     """Modelo para artículos del blog"""
     __tablename__ = 'blog_post'
+    __table_args__ = (
+        db.Index('ix_blog_post_publicado_fecha_publicacion', 'publicado', 'fecha_publicacion'),
+        db.Index('ix_blog_post_categoria_fecha_creacion', 'categoria', 'fecha_creacion'),
+        db.Index('ix_blog_post_fecha_creacion_id', 'fecha_creacion', 'id'),
+        db.Index('ix_blog_post_fecha_actualizacion', 'fecha_actualizacion'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(200), nullable=False)
@@ -5,6 +5,13 @@ from backend.database import db
 class ContactMessage(db.Model):
     """Modelo para mensajes de contacto"""
     __tablename__ = 'contact_message'
+    __table_args__ = (
+        db.Index('ix_contact_message_leido_servicio_fecha', 'leido', 'servicio', 'fecha'),
+        db.Index('ix_contact_message_servicio_fecha', 'servicio', 'fecha'),
+        db.Index('ix_contact_message_fecha_id', 'fecha', 'id'),
+        # Un reintento de la cola no puede insertar dos veces el mismo envío
+        db.Index('ux_contact_message_token_envio', 'token_envio', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(100), nullable=False)
@@ -17,6 +24,7 @@ class ContactMessage(db.Model):
     ip_address = db.Column(db.String(45))
     respuesta = db.Column(db.Text)
     fecha_respuesta = db.Column(db.DateTime)
+    token_envio = db.Column(db.String(32))
 
     def __repr__(self):
         return f'<ContactMessage {self.nombre} - {self.email}>'
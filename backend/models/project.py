@@ -5,6 +5,12 @@ from backend.database import db
 class Project(db.Model):
     """Modelo para proyectos mostrados en la web"""
     __tablename__ = 'project'
+    __table_args__ = (
+        db.Index('ix_project_activo_orden', 'activo', 'orden'),
+        db.Index('ix_project_categoria_fecha_creacion', 'categoria', 'fecha_creacion'),
+        db.Index('ix_project_fecha_creacion_id', 'fecha_creacion', 'id'),
+        db.Index('ix_project_fecha_actualizacion', 'fecha_actualizacion'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(200), nullable=False)
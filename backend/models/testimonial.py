@@ -5,6 +5,10 @@ from backend.database import db
 class Testimonial(db.Model):
     """Modelo para testimonios de clientes"""
     __tablename__ = 'testimonial'
+    __table_args__ = (
+        db.Index('ix_testimonial_activo_orden', 'activo', 'orden'),
+        db.Index('ix_testimonial_fecha_creacion_id', 'fecha_creacion', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nombre_cliente = db.Column(db.String(100), nullable=False)
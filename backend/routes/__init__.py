@@ -2,5 +2,6 @@
 from .main import main_bp
 from .api import api_bp
 from .auth import auth_bp
+from .metrics import metrics_bp
 
-__all__ = ['main_bp', 'api_bp', 'auth_bp']
\ No newline at end of file
+__all__ = ['main_bp', 'api_bp', 'auth_bp', 'metrics_bp']
\ No newline at end of file
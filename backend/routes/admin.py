@@ -1,10 +1,19 @@
 # Rutas del Panel de Administración
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context, current_app
 from flask_login import login_required, current_user
-from backend.models import ContactMessage, Project, Testimonial, BlogPost, User
+from backend.models import ContactMessage, Project, Testimonial, BlogPost
 from backend.database import db
-from datetime import datetime, timedelta
+from backend.utils.stats import get_stats, get_overview
+from backend.utils.pagination import paginate_query
+from backend.utils.search import filter_messages
+from backend.utils.profiling import request_profiler
+from backend.utils.events import change_hub
+from backend.utils.backup import backup_manager, format_size
+from backend.utils.job_queue import job_queue
+import json
 import logging
+import queue
+import time
 
 admin_bp = Blueprint('admin_panel', __name__, url_prefix='/admin')
 
@@ -20,14 +29,8 @@ def dashboard():
     """Dashboard principal del administrador"""
     try:
         # Estadísticas generales
-        stats = {
-            'total_messages': ContactMessage.query.count(),
-            'unread_messages': ContactMessage.query.filter_by(leido=False).count(),
-            'active_projects': Project.query.filter_by(activo=True).count(),
-            'active_testimonials': Testimonial.query.filter_by(activo=True).count(),
-            'published_posts': BlogPost.query.filter_by(publicado=True).count(),
-            'total_users': User.query.count()
-        }
+        snapshot = get_stats()
+        stats = get_overview(snapshot)
         
         # Mensajes recientes
         recent_messages = ContactMessage.query.order_by(
@@ -40,14 +43,9 @@ def dashboard():
         ).limit(3).all()
         
         # Estadísticas de los últimos 30 días
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
         monthly_stats = {
-            'messages_this_month': ContactMessage.query.filter(
-                ContactMessage.fecha >= thirty_days_ago
-            ).count(),
-            'projects_created': Project.query.filter(
-                Project.fecha_creacion >= thirty_days_ago
-            ).count()
+            'messages_this_month': snapshot['messages']['month'],
+            'projects_created': snapshot['projects']['month']
         }
         
         return render_template('admin/dashboard.html', 
@@ -66,12 +64,12 @@ def dashboard():
 def messages():
     """Gestión de mensajes de contacto"""
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = 10
         
         # Filtros
         filter_read = request.args.get('read', 'all')
         filter_service = request.args.get('service', 'all')
+        search_text = request.args.get('q', '').strip()
         
         query = ContactMessage.query
         
@@ -83,9 +81,11 @@ def messages():
         if filter_service != 'all':
             query = query.filter_by(servicio=filter_service)
         
-        messages = query.order_by(ContactMessage.fecha.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Búsqueda de texto completo
+        if search_text:
+            query = filter_messages(query, search_text)
+        
+        messages = paginate_query(query, ContactMessage.fecha, ContactMessage.id, per_page, with_total=True)
         
         # Servicios únicos para filtro
         services = db.session.query(ContactMessage.servicio).distinct().all()
@@ -96,7 +96,8 @@ def messages():
                              services=services,
                              current_filters={
                                  'read': filter_read,
-                                 'service': filter_service
+                                 'service': filter_service,
+                                 'q': search_text
                              })
                              
     except Exception as e:
@@ -153,7 +154,6 @@ def delete_message(message_id):
 def projects():
     """Gestión de proyectos"""
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = 10
         
         # Filtros
@@ -170,9 +170,7 @@ def projects():
         if filter_category != 'all':
             query = query.filter_by(categoria=filter_category)
         
-        projects = query.order_by(Project.fecha_creacion.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        projects = paginate_query(query, Project.fecha_creacion, Project.id, per_page, with_total=True)
         
         # Categorías únicas para filtro
         categories = db.session.query(Project.categoria).distinct().all()
@@ -196,7 +194,6 @@ def projects():
 def testimonials():
     """Gestión de testimonios"""
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = 10
         
         # Filtros
@@ -209,9 +206,7 @@ def testimonials():
         elif filter_active == 'inactive':
             query = query.filter_by(activo=False)
         
-        testimonials = query.order_by(Testimonial.fecha_creacion.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        testimonials = paginate_query(query, Testimonial.fecha_creacion, Testimonial.id, per_page, with_total=True)
         
         return render_template('admin/testimonials.html',
                              testimonials=testimonials,
@@ -227,7 +222,6 @@ def testimonials():
 def blog():
     """Gestión del blog"""
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = 10
         
         # Filtros
@@ -244,9 +238,7 @@ def blog():
         if filter_category != 'all':
             query = query.filter_by(categoria=filter_category)
         
-        posts = query.order_by(BlogPost.fecha_creacion.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        posts = paginate_query(query, BlogPost.fecha_creacion, BlogPost.id, per_page, with_total=True)
         
         # Categorías únicas para filtro
         categories = db.session.query(BlogPost.categoria).distinct().all()
@@ -271,11 +263,17 @@ def settings():
     """Configuración del sistema"""
     try:
         # Obtener estadísticas del sistema
+        snapshot = get_stats()
+        database = backup_manager.database_info()
         system_stats = {
-            'total_users': User.query.count(),
-            'admin_users': User.query.filter_by(is_admin=True).count(),
-            'last_backup': 'N/A',  # Implementar sistema de backups
-            'database_size': 'N/A'  # Implementar cálculo de tamaño
+            'total_users': snapshot['users']['total'],
+            'admin_users': snapshot['users']['admins'],
+            'last_backup': (database['last_backup'].strftime('%d/%m/%Y %H:%M')
+                            if database['last_backup'] else 'Nunca'),
+            'backup_count': database['backup_count'],
+            'database_size': format_size(database['size']) if database['size'] is not None else 'N/A',
+            'page_count': database['page_count'] if database['page_count'] is not None else 'N/A',
+            'wal_size': format_size(database['wal_size']) if database['wal_size'] is not None else 'N/A'
         }
         
         return render_template('admin/settings.html', stats=system_stats)
@@ -285,30 +283,49 @@ def settings():
         flash('Error al cargar la configuración', 'error')
         return redirect(url_for('admin.dashboard'))
 
+@admin_bp.route('/api/backup', methods=['POST'])
+@login_required
+def api_backup():
+    """API para crear una copia de seguridad en segundo plano (solo administradores)"""
+    if not current_user.is_admin:
+        return jsonify({
+            'success': False,
+            'message': 'No autorizado'
+        }), 403
+    
+    if backup_manager.database_path() is None:
+        return jsonify({
+            'success': False,
+            'message': 'La base de datos no es un archivo SQLite'
+        }), 400
+    
+    try:
+        job_queue.enqueue('database_backup', {})
+    except Exception as e:
+        logging.error(f"Error al crear backup: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Error al crear el backup'
+        }), 500
+    
+    return jsonify({
+        'success': True,
+        'message': 'Backup en curso. Aparecerá en database/backups en unos segundos.'
+    }), 202
+
 # Rutas API para el dashboard
 @admin_bp.route('/api/stats')
 @login_required
 def api_stats():
     """API para obtener estadísticas en tiempo real"""
     try:
-        stats = {
-            'total_messages': ContactMessage.query.count(),
-            'unread_messages': ContactMessage.query.filter_by(leido=False).count(),
-            'active_projects': Project.query.filter_by(activo=True).count(),
-            'active_testimonials': Testimonial.query.filter_by(activo=True).count(),
-            'published_posts': BlogPost.query.filter_by(publicado=True).count(),
-            'total_users': User.query.count()
-        }
+        snapshot = get_stats()
+        stats = get_overview(snapshot)
         
         # Estadísticas de los últimos 7 días
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
         weekly_stats = {
-            'messages_this_week': ContactMessage.query.filter(
-                ContactMessage.fecha >= seven_days_ago
-            ).count(),
-            'projects_created': Project.query.filter(
-                Project.fecha_creacion >= seven_days_ago
-            ).count()
+            'messages_this_week': snapshot['messages']['week'],
+            'projects_created': snapshot['projects']['week']
         }
         
         return jsonify({
@@ -324,6 +341,84 @@ def api_stats():
             'message': 'Error al obtener estadísticas'
         }), 500
 
+@admin_bp.route('/api/perf')
+@login_required
+def api_perf():
+    """API con las métricas de rendimiento por endpoint (solo administradores)"""
+    if not current_user.is_admin:
+        return jsonify({
+            'success': False,
+            'message': 'No autorizado'
+        }), 403
+    
+    return jsonify({
+        'success': True,
+        'window': request_profiler.window,
+        'slow_threshold_ms': request_profiler.slow_threshold_ms,
+        'endpoints': request_profiler.snapshot()
+    })
+
+def _sse(event_type, data):
+    """Formatear un evento Server-Sent Events"""
+    return f'event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n'
+
+def _current_overview():
+    """Resumen de estadísticas liberando la conexión al pool en seguida"""
+    try:
+        return get_overview(get_stats())
+    finally:
+        db.session.remove()
+
+@admin_bp.route('/api/events')
+@login_required
+def api_events():
+    """Stream SSE con los cambios de mensajes, proyectos y posts (solo administradores)"""
+    if not current_user.is_admin:
+        return jsonify({
+            'success': False,
+            'message': 'No autorizado'
+        }), 403
+    
+    keepalive = current_app.config.get('EVENTS_KEEPALIVE', 15)
+    max_duration = current_app.config.get('EVENTS_STREAM_TIMEOUT', 300)
+    
+    def stream():
+        subscriber = change_hub.subscribe()
+        try:
+            stats = _current_overview()
+            yield f'retry: 5000\n{_sse("stats", stats)}'
+            
+            deadline = time.monotonic() + max_duration
+            while time.monotonic() < deadline:
+                try:
+                    events = [subscriber.get(timeout=keepalive)]
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                # Agrupar los eventos que llegaron juntos y recalcular una sola vez
+                while True:
+                    try:
+                        events.append(subscriber.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                for event_type, data in events:
+                    yield _sse(event_type, data)
+                
+                # Enviar solo los contadores que cambiaron
+                current = _current_overview()
+                changed = {key: value for key, value in current.items() if stats.get(key) != value}
+                if changed or any(event_type == 'resync' for event_type, _ in events):
+                    yield _sse('stats', current if not changed else changed)
+                stats = current
+        finally:
+            change_hub.unsubscribe(subscriber)
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # sin buffer en nginx
+    return response
+
 @admin_bp.route('/api/recent-activity')
 @login_required
 def api_recent_activity():
@@ -3,12 +3,50 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 from backend.models import ContactMessage, Project, Testimonial, BlogPost, User
 from backend.database import db
+from backend.utils.cache import response_cache
+from backend.utils.view_counter import view_counter
+from backend.utils.stats import get_stats, get_overview, invalidate_stats
+from backend.utils.pagination import paginate_query, pagination_metadata, invalidate_counts
+from backend.utils.search import search_blog_posts, search_messages, filter_messages
+from backend.utils.contact_queue import enqueue_contact_message
+from backend.utils.rate_limit import rate_limiter, client_ip
+from backend.utils.events import change_hub
+from backend.utils.export import EXPORT_FORMATS, EXPORT_CHUNK_SIZE, stream_export
+from backend.utils.serializers import PROJECT, TESTIMONIAL, BLOG_POST, CONTACT_MESSAGE
 from datetime import datetime, timedelta
 import logging
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+def _table_validator(model, visible):
+    """Validadores HTTP de una tabla con una sola consulta agregada.
+
+    Se usa la fecha de actualización máxima de toda la tabla y los conteos
+    total y visible, de modo que cualquier alta, baja o edición cambia el ETag.
+    Cada subconsulta se resuelve con un índice, sin recorrer la tabla.
+    """
+    def validator():
+        last_modified, total, visible_count = db.session.query(
+            db.select(db.func.max(model.fecha_actualizacion)).scalar_subquery(),
+            db.select(db.func.count(model.id)).scalar_subquery(),
+            db.select(db.func.count(model.id)).where(visible == db.true()).scalar_subquery()
+        ).one()
+        return f'{last_modified}|{total}|{visible_count}', last_modified
+    return validator
+
+@api_bp.after_request
+def add_conditional_headers(response):
+    """Añadir ETag a las respuestas JSON públicas que no lo tengan"""
+    if (request.method == 'GET' and response.status_code == 200 and response.is_json
+            and not response.is_streamed and 'ETag' not in response.headers
+            and not (request.endpoint or '').startswith('api.admin_')):
+        response.add_etag()
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+    return response
+
 @api_bp.route('/contact', methods=['POST'])
+@rate_limiter.limit('contact', [('ip', client_ip)])
 def contact_form():
     """API para procesar formulario de contacto"""
     try:
@@ -23,100 +61,171 @@ def contact_form():
                     'message': f'El campo {field} es requerido'
                 }), 400
         
-        # Crear nuevo mensaje
-        message = ContactMessage(
-            nombre=data['nombre'],
-            email=data['email'],
-            telefono=data.get('telefono', ''),
-            servicio=data['servicio'],
-            mensaje=data['mensaje'],
-            ip_address=request.remote_addr
-        )
-        
-        db.session.add(message)
-        db.session.commit()
+        # Encolar el mensaje: la inserción y el aviso por email se hacen en
+        # segundo plano para no bloquear la respuesta
+        enqueue_contact_message(data, client_ip())
         
         return jsonify({
             'success': True,
             'message': 'Mensaje enviado correctamente. Te contactaremos pronto.'
-        })
+        }), 202
         
     except Exception as e:
+        logging.error(f"Error al encolar mensaje de contacto: {str(e)}")
         db.session.rollback()
         return jsonify({
             'success': False,
             'message': 'Error al enviar el mensaje. Inténtalo de nuevo.'
         }), 500
 
+# Campos de cada endpoint: los que se devuelven sin ?fields= y, en la API
+# pública, también los únicos que se pueden pedir
+PROJECT_PUBLIC_FIELDS = ('id', 'titulo', 'descripcion_problema', 'descripcion_solucion',
+                         'resultados', 'imagen_url', 'categoria', 'cliente', 'tecnologias',
+                         'duracion')
+TESTIMONIAL_PUBLIC_FIELDS = ('id', 'nombre_cliente', 'empresa', 'cargo', 'testimonio',
+                             'imagen_url', 'calificacion', 'proyecto_relacionado')
+BLOG_PUBLIC_FIELDS = ('id', 'titulo', 'slug', 'resumen', 'imagen_url', 'categoria', 'tags',
+                      'fecha_publicacion', 'autor', 'tiempo_lectura', 'vistas')
+BLOG_DETAIL_FIELDS = BLOG_PUBLIC_FIELDS + ('contenido',)
+MESSAGE_RECENT_FIELDS = ('id', 'nombre', 'email', 'mensaje', 'fecha', 'leido', 'servicio')
+MESSAGE_ADMIN_FIELDS = ('id', 'nombre', 'email', 'telefono', 'servicio', 'mensaje', 'fecha',
+                        'leido', 'ip_address')
+PROJECT_ADMIN_FIELDS = PROJECT_PUBLIC_FIELDS + ('activo', 'orden', 'fecha_creacion')
+TESTIMONIAL_ADMIN_FIELDS = TESTIMONIAL_PUBLIC_FIELDS + ('activo', 'orden', 'fecha_creacion')
+# El listado no incluye el contenido completo de cada artículo (?fields=contenido)
+BLOG_ADMIN_FIELDS = ('id', 'titulo', 'slug', 'resumen', 'imagen_url', 'categoria', 'tags',
+                     'publicado', 'vistas', 'fecha_creacion', 'fecha_publicacion')
+
+def _requested_fields(serializer, default, allowed=None):
+    """Campos pedidos en ``?fields=``; lanza ValueError si alguno no se admite"""
+    return serializer.parse(request.args.get('fields', '').strip(), default, allowed)
+
+def project_list(fields=PROJECT_PUBLIC_FIELDS):
+    """Proyectos activos tal como los devuelve /api/projects"""
+    query = Project.query.filter_by(activo=True).order_by(Project.orden)
+    return PROJECT.dump_many(PROJECT.query(query, fields).all(), fields)
+
+def testimonial_list(fields=TESTIMONIAL_PUBLIC_FIELDS):
+    """Testimonios activos tal como los devuelve /api/testimonials"""
+    query = Testimonial.query.filter_by(activo=True).order_by(Testimonial.orden)
+    return TESTIMONIAL.dump_many(TESTIMONIAL.query(query, fields).all(), fields)
+
+def blog_post_list(fields=BLOG_PUBLIC_FIELDS):
+    """Últimos artículos publicados tal como los devuelve /api/blog"""
+    query = BlogPost.query.filter_by(publicado=True).order_by(BlogPost.fecha_publicacion.desc()).limit(6)
+    return BLOG_POST.dump_many(BLOG_POST.query(query, fields).all(), fields)
+
+# Secciones de la página de inicio (/api/bootstrap y datos incrustados)
+BOOTSTRAP_SECTIONS = {
+    'projects': (project_list, PROJECT_PUBLIC_FIELDS),
+    'testimonials': (testimonial_list, TESTIMONIAL_PUBLIC_FIELDS),
+    'blog': (blog_post_list, BLOG_PUBLIC_FIELDS)
+}
+
+def landing_data(selected=None):
+    """Contenido de la página de inicio (proyectos, testimonios y blog).
+
+    ``selected`` es el resultado de ``_bootstrap_fields``: secciones a incluir
+    y, para cada una, los campos (None = todos). Solo se leen de la base de
+    datos las columnas de los campos pedidos.
+    """
+    if selected is None:
+        selected = dict.fromkeys(BOOTSTRAP_SECTIONS)
+    data = {}
+    for section, (loader, default) in BOOTSTRAP_SECTIONS.items():
+        if section in selected:
+            data[section] = loader(selected[section] or default)
+    return data
+
+def _bootstrap_fields():
+    """Secciones y campos pedidos en ``?fields=``; lanza ValueError si alguno no existe.
+
+    ``projects`` incluye la sección completa y ``projects.titulo`` solo ese
+    campo; sin el parámetro se devuelven todas las secciones completas.
+    """
+    value = request.args.get('fields', '').strip()
+    if not value:
+        return dict.fromkeys(BOOTSTRAP_SECTIONS)
+
+    selected = {}
+    for item in value.split(','):
+        section, _, field = item.strip().partition('.')
+        if not section:
+            continue
+        if section not in BOOTSTRAP_SECTIONS:
+            raise ValueError(f'Sección no válida: {section}. Opciones: {", ".join(BOOTSTRAP_SECTIONS)}')
+        if not field:
+            selected[section] = None
+            continue
+        if field not in BOOTSTRAP_SECTIONS[section][1]:
+            raise ValueError(f'Campo no válido: {section}.{field}')
+        fields = selected.setdefault(section, [])
+        if fields is not None and field not in fields:
+            fields.append(field)
+    return selected
+
+def _invalid_fields(error):
+    return jsonify({
+        'success': False,
+        'message': str(error)
+    }), 400
+
 @api_bp.route('/projects')
+@response_cache.cached('project', validator=_table_validator(Project, Project.activo))
 def get_projects():
     """API para obtener proyectos activos"""
-    projects = Project.query.filter_by(activo=True).order_by(Project.orden).all()
-    
-    projects_data = []
-    for project in projects:
-        projects_data.append({
-            'id': project.id,
-            'titulo': project.titulo,
-            'descripcion_problema': project.descripcion_problema,
-            'descripcion_solucion': project.descripcion_solucion,
-            'resultados': project.resultados,
-            'imagen_url': project.imagen_url,
-            'categoria': project.categoria,
-            'cliente': getattr(project, 'cliente', None),
-            'tecnologias': getattr(project, 'tecnologias', None),
-            'duracion': getattr(project, 'duracion', None)
-        })
-    
-    return jsonify(projects_data)
+    try:
+        fields = _requested_fields(PROJECT, PROJECT_PUBLIC_FIELDS, PROJECT_PUBLIC_FIELDS)
+    except ValueError as e:
+        return _invalid_fields(e)
+    return jsonify(project_list(fields))
 
 @api_bp.route('/testimonials')
+@response_cache.cached('testimonial')
 def get_testimonials():
     """API para obtener testimonios activos"""
-    testimonials = Testimonial.query.filter_by(activo=True).order_by(Testimonial.orden).all()
-    
-    testimonials_data = []
-    for testimonial in testimonials:
-        testimonials_data.append({
-            'id': testimonial.id,
-            'nombre_cliente': testimonial.nombre_cliente,
-            'empresa': testimonial.empresa,
-            'cargo': testimonial.cargo,
-            'testimonio': testimonial.testimonio,
-            'imagen_url': testimonial.imagen_url,
-            'calificacion': getattr(testimonial, 'calificacion', 5),
-            'proyecto_relacionado': getattr(testimonial, 'proyecto_relacionado', None)
-        })
-    
-    return jsonify(testimonials_data)
+    try:
+        fields = _requested_fields(TESTIMONIAL, TESTIMONIAL_PUBLIC_FIELDS, TESTIMONIAL_PUBLIC_FIELDS)
+    except ValueError as e:
+        return _invalid_fields(e)
+    return jsonify(testimonial_list(fields))
 
 @api_bp.route('/blog')
+@response_cache.cached('blog_post', validator=_table_validator(BlogPost, BlogPost.publicado))
 def get_blog_posts():
     """API para obtener artículos del blog"""
-    posts = BlogPost.query.filter_by(publicado=True).order_by(BlogPost.fecha_publicacion.desc()).limit(6).all()
-    
-    posts_data = []
-    for post in posts:
-        posts_data.append({
-            'id': post.id,
-            'titulo': post.titulo,
-            'slug': post.slug,
-            'resumen': post.resumen,
-            'imagen_url': post.imagen_url,
-            'categoria': post.categoria,
-            'tags': post.tags.split(',') if post.tags else [],
-            'fecha_publicacion': post.fecha_publicacion.isoformat() if post.fecha_publicacion else None,
-            'autor': getattr(post, 'autor', 'Noel Moreno'),
-            'tiempo_lectura': getattr(post, 'tiempo_lectura', None),
-            'vistas': post.vistas
-        })
+    try:
+        fields = _requested_fields(BLOG_POST, BLOG_PUBLIC_FIELDS, BLOG_PUBLIC_FIELDS)
+    except ValueError as e:
+        return _invalid_fields(e)
+    return jsonify(blog_post_list(fields))
+
+@api_bp.route('/bootstrap')
+@response_cache.cached('project', 'testimonial', 'blog_post')
+def get_bootstrap():
+    """API con proyectos, testimonios y últimos artículos en una sola respuesta.
+
+    Las tres consultas comparten la sesión (y la conexión) de la petición y
+    el resultado se serializa una vez; ``?fields=`` limita secciones y campos.
+    """
+    try:
+        selected = _bootstrap_fields()
+    except ValueError as e:
+        return _invalid_fields(e)
     
-    return jsonify(posts_data)
+    return jsonify(landing_data(selected))
 
 @api_bp.route('/blog/<slug>')
 def get_blog_post(slug):
     """API para obtener un artículo específico del blog"""
-    post = BlogPost.query.filter_by(slug=slug, publicado=True).first()
+    try:
+        fields = _requested_fields(BLOG_POST, BLOG_DETAIL_FIELDS, BLOG_DETAIL_FIELDS)
+    except ValueError as e:
+        return _invalid_fields(e)
+    
+    query = BlogPost.query.filter_by(slug=slug, publicado=True)
+    post = BLOG_POST.query(query, fields).first()
     
     if not post:
         return jsonify({
@@ -124,34 +233,76 @@ def get_blog_post(slug):
             'message': 'Artículo no encontrado'
         }), 404
     
-    # Incrementar contador de vistas
-    post.vistas += 1
-    db.session.commit()
+    # Incrementar contador de vistas (se persiste por lotes)
+    pending_views = view_counter.increment(post.id)
     
-    return jsonify({
-        'id': post.id,
-        'titulo': post.titulo,
-        'slug': post.slug,
-        'contenido': post.contenido,
-        'resumen': post.resumen,
-        'imagen_url': post.imagen_url,
-        'categoria': post.categoria,
-        'tags': post.tags.split(',') if post.tags else [],
-        'fecha_publicacion': post.fecha_publicacion.isoformat() if post.fecha_publicacion else None,
-        'autor': getattr(post, 'autor', 'Noel Moreno'),
-        'tiempo_lectura': getattr(post, 'tiempo_lectura', None),
-        'vistas': post.vistas
-    })
+    post_data = BLOG_POST.dump(post, fields)
+    if 'vistas' in post_data:
+        post_data['vistas'] = (post.vistas or 0) + pending_views
+    return jsonify(post_data)
+
+@api_bp.route('/search')
+def search():
+    """API de búsqueda de texto completo ordenada por relevancia (bm25)"""
+    query_text = request.args.get('q', '').strip()
+    scope = request.args.get('scope', 'blog')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    
+    if not query_text:
+        return jsonify({
+            'success': False,
+            'message': 'El parámetro q es requerido'
+        }), 400
+    
+    if scope not in ('blog', 'messages'):
+        return jsonify({
+            'success': False,
+            'message': 'Ámbito de búsqueda no válido'
+        }), 400
+    
+    # Los mensajes de contacto solo son visibles para administradores
+    if scope == 'messages' and not (current_user.is_authenticated and current_user.is_admin):
+        return jsonify({
+            'success': False,
+            'message': 'No autorizado'
+        }), 403
+    
+    try:
+        if scope == 'messages':
+            results = search_messages(query_text, limit)
+            date_field = 'fecha'
+        else:
+            results = search_blog_posts(query_text, limit)
+            date_field = 'fecha_publicacion'
+        
+        for result in results:
+            if result.get(date_field):
+                result[date_field] = result[date_field].isoformat()
+        
+        return jsonify({
+            'success': True,
+            'query': query_text,
+            'scope': scope,
+            'results': results
+        })
+        
+    except Exception as e:
+        logging.error(f"Error en API search: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Error al realizar la búsqueda'
+        }), 500
 
 @api_bp.route('/dashboard/stats')
 def get_dashboard_stats():
     """API para obtener estadísticas del dashboard"""
     try:
+        snapshot = get_stats()
         stats = {
-            'contact_count': ContactMessage.query.count(),
-            'project_count': Project.query.filter_by(activo=True).count(),
-            'testimonial_count': Testimonial.query.filter_by(activo=True).count(),
-            'blog_count': BlogPost.query.filter_by(publicado=True).count()
+            'contact_count': snapshot['messages']['total'],
+            'project_count': snapshot['projects']['active'],
+            'testimonial_count': snapshot['testimonials']['active'],
+            'blog_count': snapshot['posts']['published']
         }
         return jsonify(stats)
     except Exception as e:
@@ -161,22 +312,16 @@ def get_dashboard_stats():
         }), 500
 
 @api_bp.route('/dashboard/recent-messages')
+@login_required
 def get_recent_messages():
     """API para obtener mensajes recientes"""
     try:
-        messages = ContactMessage.query.order_by(ContactMessage.fecha.desc()).limit(5).all()
-        messages_data = []
-        for message in messages:
-            messages_data.append({
-                'id': message.id,
-                'nombre': message.nombre,
-                'email': message.email,
-                'mensaje': message.mensaje,
-                'fecha': message.fecha.isoformat(),
-                'leido': message.leido,
-                'servicio': message.servicio
-            })
-        return jsonify(messages_data)
+        fields = _requested_fields(CONTACT_MESSAGE, MESSAGE_RECENT_FIELDS, MESSAGE_RECENT_FIELDS)
+        query = ContactMessage.query.order_by(ContactMessage.fecha.desc()).limit(5)
+        messages = CONTACT_MESSAGE.query(query, fields).all()
+        return jsonify(CONTACT_MESSAGE.dump_many(messages, fields))
+    except ValueError as e:
+        return _invalid_fields(e)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -187,57 +332,82 @@ def get_recent_messages():
 # RUTAS API DEL ADMINISTRADOR
 # ==========================================
 
+def _active_message_filters(filters):
+    """Devolver solo los filtros que restringen la consulta
+    
+    ``read``/``service`` con ``'all'`` y ``q`` en blanco no filtran nada.
+    Las fechas deben ser cadenas ISO; otro tipo lanza ValueError.
+    """
+    active = {}
+    if filters.get('read') in ('read', 'unread'):
+        active['read'] = filters['read']
+    if filters.get('service') and filters['service'] != 'all':
+        active['service'] = filters['service']
+    for key in ('date_from', 'date_to'):
+        value = filters.get(key)
+        if value in (None, ''):
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f'"{key}" debe ser una fecha ISO en texto')
+        active[key] = value
+    q = filters.get('q')
+    if isinstance(q, str) and q.strip():
+        active['q'] = q
+    return active
+
+def _filter_message_query(query, filters):
+    """Aplicar los filtros de mensajes (read, service, date_from, date_to, q)"""
+    filter_read = filters.get('read', 'all')
+    filter_service = filters.get('service', 'all')
+    search_text = (filters.get('q') or '').strip()
+    
+    if filter_read == 'unread':
+        query = query.filter_by(leido=False)
+    elif filter_read == 'read':
+        query = query.filter_by(leido=True)
+        
+    if filter_service and filter_service != 'all':
+        query = query.filter_by(servicio=filter_service)
+    
+    if filters.get('date_from'):
+        query = query.filter(ContactMessage.fecha >= datetime.fromisoformat(filters['date_from']))
+    if filters.get('date_to'):
+        date_to = filters['date_to']
+        if len(date_to) == 10:
+            # Una fecha sin hora incluye todo el día
+            end = datetime.fromisoformat(date_to) + timedelta(days=1)
+            query = query.filter(ContactMessage.fecha < end)
+        else:
+            query = query.filter(ContactMessage.fecha <= datetime.fromisoformat(date_to))
+    
+    if search_text:
+        query = filter_messages(query, search_text)
+    return query
+
 @api_bp.route('/admin/messages', methods=['GET'])
 @login_required
 def admin_get_messages():
     """API para obtener mensajes con paginación y filtros"""
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
-        filter_read = request.args.get('read', 'all')
-        filter_service = request.args.get('service', 'all')
+        fields = _requested_fields(CONTACT_MESSAGE, MESSAGE_ADMIN_FIELDS)
+        query = _filter_message_query(ContactMessage.query, request.args)
+        # La fecha se carga siempre: la usa el cursor de la página siguiente
+        query = CONTACT_MESSAGE.query(query, fields, 'fecha')
         
-        query = ContactMessage.query
-        
-        if filter_read == 'unread':
-            query = query.filter_by(leido=False)
-        elif filter_read == 'read':
-            query = query.filter_by(leido=True)
-            
-        if filter_service != 'all':
-            query = query.filter_by(servicio=filter_service)
-        
-        messages = query.order_by(ContactMessage.fecha.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        messages_data = []
-        for message in messages.items:
-            messages_data.append({
-                'id': message.id,
-                'nombre': message.nombre,
-                'email': message.email,
-                'telefono': message.telefono,
-                'servicio': message.servicio,
-                'mensaje': message.mensaje,
-                'fecha': message.fecha.isoformat(),
-                'leido': message.leido,
-                'ip_address': message.ip_address
-            })
+        messages = paginate_query(query, ContactMessage.fecha, ContactMessage.id, per_page)
         
         return jsonify({
             'success': True,
-            'messages': messages_data,
-            'pagination': {
-                'page': messages.page,
-                'pages': messages.pages,
-                'per_page': messages.per_page,
-                'total': messages.total,
-                'has_next': messages.has_next,
-                'has_prev': messages.has_prev
-            }
+            'messages': CONTACT_MESSAGE.dump_many(messages.items, fields),
+            'pagination': pagination_metadata(messages)
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logging.error(f"Error en API admin messages: {str(e)}")
         return jsonify({
@@ -245,28 +415,56 @@ def admin_get_messages():
             'message': 'Error al obtener mensajes'
         }), 500
 
+MESSAGE_EXPORT_FIELDS = ('id', 'fecha', 'nombre', 'email', 'telefono', 'servicio',
+                         'mensaje', 'leido', 'ip_address')
+
+def _export_format():
+    """Formato pedido en ``?format=``; lanza ValueError si no se admite"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Formato no válido. Opciones: {", ".join(EXPORT_FORMATS)}')
+    return fmt
+
+@api_bp.route('/admin/messages/export', methods=['GET'])
+@login_required
+def admin_export_messages():
+    """API para exportar mensajes en CSV o NDJSON con los filtros del listado.
+
+    Solo se seleccionan las columnas exportadas y se leen del cursor en
+    trozos con ``yield_per``, así que la memoria no crece con la tabla.
+    """
+    try:
+        fmt = _export_format()
+        query = _filter_message_query(ContactMessage.query, request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+
+    columns = [getattr(ContactMessage, field) for field in MESSAGE_EXPORT_FIELDS]
+    rows = query.with_entities(*columns).order_by(
+        ContactMessage.fecha.desc(), ContactMessage.id.desc()
+    ).yield_per(EXPORT_CHUNK_SIZE)
+
+    filename = f'mensajes-{datetime.utcnow():%Y%m%d-%H%M%S}'
+    return stream_export(rows, MESSAGE_EXPORT_FIELDS, fmt, filename)
+
 @api_bp.route('/admin/messages/<int:message_id>', methods=['GET'])
 @login_required
 def admin_get_message(message_id):
     """API para obtener un mensaje específico"""
     try:
+        fields = _requested_fields(CONTACT_MESSAGE, MESSAGE_ADMIN_FIELDS)
         message = ContactMessage.query.get_or_404(message_id)
         
         return jsonify({
             'success': True,
-            'message': {
-                'id': message.id,
-                'nombre': message.nombre,
-                'email': message.email,
-                'telefono': message.telefono,
-                'servicio': message.servicio,
-                'mensaje': message.mensaje,
-                'fecha': message.fecha.isoformat(),
-                'leido': message.leido,
-                'ip_address': message.ip_address
-            }
+            'message': CONTACT_MESSAGE.dump(message, fields)
         })
         
+    except ValueError as e:
+        return _invalid_fields(e)
     except Exception as e:
         logging.error(f"Error en API admin message {message_id}: {str(e)}")
         return jsonify({
@@ -316,17 +514,117 @@ def admin_delete_message(message_id):
             'message': 'Error al eliminar el mensaje'
         }), 500
 
+# Acciones masivas sobre mensajes: valores que se asignan (None = borrar)
+BULK_MESSAGE_ACTIONS = {
+    'mark_read': {'leido': True},
+    'mark_unread': {'leido': False},
+    'delete': None
+}
+BULK_FILTERS = ('read', 'service', 'date_from', 'date_to', 'q')
+BULK_ID_CHUNK = 500  # ids por sentencia, por debajo del límite de variables de SQLite
+
+@api_bp.route('/admin/messages/bulk', methods=['POST'])
+@login_required
+def admin_bulk_messages():
+    """API para marcar o eliminar muchos mensajes en una sola transacción.
+    
+    Acepta ``ids`` (lista) o ``filters`` (read, service, date_from, date_to,
+    q) y ejecuta un UPDATE/DELETE por conjunto, sin cargar los mensajes.
+    """
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    ids = data.get('ids')
+    filters = data.get('filters')
+    
+    if action not in BULK_MESSAGE_ACTIONS:
+        return jsonify({
+            'success': False,
+            'message': f'Acción no válida. Opciones: {", ".join(BULK_MESSAGE_ACTIONS)}'
+        }), 400
+    if (ids is None) == (filters is None):
+        return jsonify({
+            'success': False,
+            'message': 'Indica "ids" o "filters", pero no ambos'
+        }), 400
+    if ids is not None and not (isinstance(ids, list) and all(isinstance(i, int) for i in ids)):
+        return jsonify({
+            'success': False,
+            'message': '"ids" debe ser una lista de enteros'
+        }), 400
+    if filters is not None:
+        try:
+            active = _active_message_filters(filters) if isinstance(filters, dict) else {}
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Filtro no válido: {str(e)}'
+            }), 400
+        if not active:
+            # Evitar que un filtro vacío o sin efecto ('all', q en blanco)
+            # afecte a toda la bandeja por accidente
+            return jsonify({
+                'success': False,
+                'message': f'"filters" necesita al menos uno de: {", ".join(BULK_FILTERS)}'
+            }), 400
+        filters = active
+    
+    values = BULK_MESSAGE_ACTIONS[action]
+    try:
+        if ids is not None:
+            unique_ids = sorted(set(ids))
+            queries = [
+                ContactMessage.query.filter(ContactMessage.id.in_(unique_ids[i:i + BULK_ID_CHUNK]))
+                for i in range(0, len(unique_ids), BULK_ID_CHUNK)
+            ]
+        else:
+            queries = [_filter_message_query(ContactMessage.query, filters)]
+        
+        affected = 0
+        for query in queries:
+            if values is None:
+                affected += query.delete(synchronize_session=False)
+            else:
+                # Solo las filas que cambian: el conteo refleja el efecto real
+                query = query.filter(ContactMessage.leido != values['leido'])
+                affected += query.update(values, synchronize_session=False)
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Filtro no válido: {str(e)}'
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error en API bulk messages: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Error al procesar los mensajes'
+        }), 500
+    
+    # Los UPDATE/DELETE masivos no pasan por los eventos del ORM
+    if affected:
+        invalidate_stats()
+        invalidate_counts()
+        change_hub.publish('message.bulk', {'action': action, 'affected': affected})
+    
+    return jsonify({
+        'success': True,
+        'action': action,
+        'affected': affected
+    })
+
 @api_bp.route('/admin/projects', methods=['GET'])
 @login_required
 def admin_get_projects():
     """API para obtener proyectos con paginación y filtros"""
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        fields = _requested_fields(PROJECT, PROJECT_ADMIN_FIELDS)
         filter_active = request.args.get('active', 'all')
         filter_category = request.args.get('category', 'all')
         
-        query = Project.query
+        query = PROJECT.query(Project.query, fields, 'fecha_creacion')
         
         if filter_active == 'active':
             query = query.filter_by(activo=True)
@@ -336,41 +634,19 @@ def admin_get_projects():
         if filter_category != 'all':
             query = query.filter_by(categoria=filter_category)
         
-        projects = query.order_by(Project.fecha_creacion.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        projects_data = []
-        for project in projects.items:
-            projects_data.append({
-                'id': project.id,
-                'titulo': project.titulo,
-                'descripcion_problema': project.descripcion_problema,
-                'descripcion_solucion': project.descripcion_solucion,
-                'resultados': project.resultados,
-                'imagen_url': project.imagen_url,
-                'categoria': project.categoria,
-                'cliente': project.cliente,
-                'tecnologias': project.tecnologias,
-                'duracion': project.duracion,
-                'activo': project.activo,
-                'orden': project.orden,
-                'fecha_creacion': project.fecha_creacion.isoformat() if project.fecha_creacion else None
-            })
+        projects = paginate_query(query, Project.fecha_creacion, Project.id, per_page)
         
         return jsonify({
             'success': True,
-            'projects': projects_data,
-            'pagination': {
-                'page': projects.page,
-                'pages': projects.pages,
-                'per_page': projects.per_page,
-                'total': projects.total,
-                'has_next': projects.has_next,
-                'has_prev': projects.has_prev
-            }
+            'projects': PROJECT.dump_many(projects.items, fields),
+            'pagination': pagination_metadata(projects)
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logging.error(f"Error en API admin projects: {str(e)}")
         return jsonify({
@@ -383,50 +659,30 @@ def admin_get_projects():
 def admin_get_testimonials():
     """API para obtener testimonios con paginación y filtros"""
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        fields = _requested_fields(TESTIMONIAL, TESTIMONIAL_ADMIN_FIELDS)
         filter_active = request.args.get('active', 'all')
         
-        query = Testimonial.query
+        query = TESTIMONIAL.query(Testimonial.query, fields, 'fecha_creacion')
         
         if filter_active == 'active':
             query = query.filter_by(activo=True)
         elif filter_active == 'inactive':
             query = query.filter_by(activo=False)
         
-        testimonials = query.order_by(Testimonial.fecha_creacion.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        testimonials_data = []
-        for testimonial in testimonials.items:
-            testimonials_data.append({
-                'id': testimonial.id,
-                'nombre_cliente': testimonial.nombre_cliente,
-                'empresa': testimonial.empresa,
-                'cargo': testimonial.cargo,
-                'testimonio': testimonial.testimonio,
-                'imagen_url': testimonial.imagen_url,
-                'calificacion': testimonial.calificacion,
-                'proyecto_relacionado': testimonial.proyecto_relacionado,
-                'activo': testimonial.activo,
-                'orden': testimonial.orden,
-                'fecha_creacion': testimonial.fecha_creacion.isoformat() if testimonial.fecha_creacion else None
-            })
+        testimonials = paginate_query(query, Testimonial.fecha_creacion, Testimonial.id, per_page)
         
         return jsonify({
             'success': True,
-            'testimonials': testimonials_data,
-            'pagination': {
-                'page': testimonials.page,
-                'pages': testimonials.pages,
-                'per_page': testimonials.per_page,
-                'total': testimonials.total,
-                'has_next': testimonials.has_next,
-                'has_prev': testimonials.has_prev
-            }
+            'testimonials': TESTIMONIAL.dump_many(testimonials.items, fields),
+            'pagination': pagination_metadata(testimonials)
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logging.error(f"Error en API admin testimonials: {str(e)}")
         return jsonify({
@@ -439,12 +695,12 @@ def admin_get_testimonials():
 def admin_get_blog_posts():
     """API para obtener artículos del blog con paginación y filtros"""
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        fields = _requested_fields(BLOG_POST, BLOG_ADMIN_FIELDS)
         filter_published = request.args.get('published', 'all')
         filter_category = request.args.get('category', 'all')
         
-        query = BlogPost.query
+        query = BLOG_POST.query(BlogPost.query, fields, 'fecha_creacion')
         
         if filter_published == 'published':
             query = query.filter_by(publicado=True)
@@ -454,40 +710,19 @@ def admin_get_blog_posts():
         if filter_category != 'all':
             query = query.filter_by(categoria=filter_category)
         
-        posts = query.order_by(BlogPost.fecha_creacion.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        posts_data = []
-        for post in posts.items:
-            posts_data.append({
-                'id': post.id,
-                'titulo': post.titulo,
-                'slug': post.slug,
-                'resumen': post.resumen,
-                'contenido': post.contenido,
-                'imagen_url': post.imagen_url,
-                'categoria': post.categoria,
-                'tags': post.tags.split(',') if post.tags else [],
-                'publicado': post.publicado,
-                'vistas': post.vistas,
-                'fecha_creacion': post.fecha_creacion.isoformat() if post.fecha_creacion else None,
-                'fecha_publicacion': post.fecha_publicacion.isoformat() if post.fecha_publicacion else None
-            })
+        posts = paginate_query(query, BlogPost.fecha_creacion, BlogPost.id, per_page)
         
         return jsonify({
             'success': True,
-            'posts': posts_data,
-            'pagination': {
-                'page': posts.page,
-                'pages': posts.pages,
-                'per_page': posts.per_page,
-                'total': posts.total,
-                'has_next': posts.has_next,
-                'has_prev': posts.has_prev
-            }
+            'posts': BLOG_POST.dump_many(posts.items, fields),
+            'pagination': pagination_metadata(posts)
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logging.error(f"Error en API admin blog: {str(e)}")
         return jsonify({
@@ -500,30 +735,15 @@ def admin_get_blog_posts():
 def admin_get_analytics():
     """API para obtener analytics y estadísticas detalladas"""
     try:
-        # Estadísticas generales
-        stats = {
-            'total_messages': ContactMessage.query.count(),
-            'unread_messages': ContactMessage.query.filter_by(leido=False).count(),
-            'active_projects': Project.query.filter_by(activo=True).count(),
-            'active_testimonials': Testimonial.query.filter_by(activo=True).count(),
-            'published_posts': BlogPost.query.filter_by(publicado=True).count(),
-            'total_users': User.query.count()
-        }
-        
-        # Estadísticas por período
-        now = datetime.utcnow()
-        periods = {
-            'today': now - timedelta(days=1),
-            'week': now - timedelta(weeks=1),
-            'month': now - timedelta(days=30),
-            'year': now - timedelta(days=365)
-        }
+        # Estadísticas generales y por período (una consulta por tabla)
+        snapshot = get_stats()
+        stats = get_overview(snapshot)
         
         period_stats = {}
-        for period_name, start_date in periods.items():
+        for period_name in ('today', 'week', 'month', 'year'):
             period_stats[period_name] = {
-                'messages': ContactMessage.query.filter(ContactMessage.fecha >= start_date).count(),
-                'projects': Project.query.filter(Project.fecha_creacion >= start_date).count()
+                'messages': snapshot['messages'][period_name],
+                'projects': snapshot['projects'][period_name]
             }
         
         # Mensajes por servicio
@@ -553,3 +773,26 @@ def admin_get_analytics():
             'success': False,
             'message': 'Error al obtener analytics'
         }), 500
+
+@api_bp.route('/admin/analytics/export', methods=['GET'])
+@login_required
+def admin_export_analytics():
+    """API para exportar el número de mensajes por día y servicio (CSV o NDJSON)"""
+    try:
+        fmt = _export_format()
+        query = _filter_message_query(ContactMessage.query, request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+
+    day = db.func.date(ContactMessage.fecha)
+    rows = query.with_entities(
+        day, ContactMessage.servicio, db.func.count(ContactMessage.id)
+    ).group_by(day, ContactMessage.servicio).order_by(
+        day, ContactMessage.servicio
+    ).yield_per(EXPORT_CHUNK_SIZE)
+
+    filename = f'mensajes-por-dia-{datetime.utcnow():%Y%m%d-%H%M%S}'
+    return stream_export(rows, ('dia', 'servicio', 'mensajes'), fmt, filename)
@@ -1,14 +1,51 @@
 # Rutas de Autenticación Mejoradas
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from backend.models import User
 from backend.database import db
+from backend.utils.user_cache import user_cache
+from backend.utils.rate_limit import rate_limiter, client_ip, too_many_requests, retry_after_seconds
 from datetime import datetime
 import logging
 
 auth_bp = Blueprint('auth', __name__)
 
+def _failed_login_key(username):
+    """Bucket de intentos fallidos de un usuario desde la IP del cliente.
+
+    Se limita por (usuario, IP) y no solo por usuario para que nadie pueda
+    bloquear la cuenta del administrador fallando contraseñas desde otra IP.
+    A cambio, un ataque repartido entre muchas IPs solo lo frena el límite
+    por IP (``RATELIMIT_LOGIN_IP``).
+    """
+    return f'{username.lower()}|{client_ip()}'
+
+def _failed_logins_exceeded(username):
+    """Respuesta 429 si se agotaron los intentos fallidos; None si se puede probar"""
+    limit = current_app.config.get('RATELIMIT_LOGIN_USERNAME')
+    if not rate_limiter.enabled or not limit:
+        return None
+    allowed, retry_after = rate_limiter.peek('login:username', _failed_login_key(username), limit)
+    return None if allowed else _login_limited(retry_after)
+
+def _count_failed_login(username):
+    """Consumir un intento del bucket (usuario, IP) tras una contraseña incorrecta"""
+    limit = current_app.config.get('RATELIMIT_LOGIN_USERNAME')
+    if rate_limiter.enabled and limit:
+        rate_limiter.hit('login:username', _failed_login_key(username), limit)
+
+def _login_limited(retry_after):
+    """Respuesta 429 del login, en JSON o con el formulario"""
+    logging.warning(f"Login limitado para IP {client_ip()}")
+    if request.is_json:
+        return too_many_requests(retry_after)
+    flash('Demasiados intentos. Espera un momento e inténtalo de nuevo.', 'error')
+    response = current_app.make_response((render_template('admin/login.html'), 429))
+    response.headers['Retry-After'] = str(retry_after_seconds(retry_after))
+    return response
+
 @auth_bp.route('/admin/login', methods=['GET', 'POST'])
+@rate_limiter.limit('login', [('ip', client_ip)], on_limited=_login_limited)
 def admin_login():
     """Página de login mejorada para administradores"""
     if request.method == 'POST':
@@ -33,6 +70,11 @@ def admin_login():
                     flash('Usuario y contraseña son requeridos', 'error')
                     return render_template('admin/login.html')
             
+            # Intentos fallidos agotados para este usuario desde esta IP
+            limited = _failed_logins_exceeded(username)
+            if limited is not None:
+                return limited
+            
             # Buscar usuario
             user = User.query.filter_by(username=username, is_admin=True).first()
             
@@ -59,6 +101,7 @@ def admin_login():
             else:
                 # Log del intento fallido
                 logging.warning(f"Intento de login fallido para usuario: {username}")
+                _count_failed_login(username)
                 
                 if request.is_json:
                     return jsonify({
@@ -86,8 +129,11 @@ def admin_logout():
     """Cerrar sesión del administrador"""
     try:
         username = current_user.username if current_user.is_authenticated else 'desconocido'
-        logout_user()
+        user_cache.invalidate(current_user.id)
+        # Vaciar la sesión antes de logout_user(): este marca la cookie
+        # "remember" para borrarla y session.clear() eliminaría esa marca
         session.clear()
+        logout_user()
         
         # Log del logout
         logging.info(f"Logout exitoso para usuario: {username}")
@@ -0,0 +1,39 @@
+# Exportador de métricas para Prometheus
+import hmac
+import ipaddress
+
+from flask import Blueprint, Response, abort, current_app, request
+
+from backend.utils.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+def _is_loopback(address):
+    """La petición viene de la propia máquina (127.0.0.0/8 o ::1)"""
+    try:
+        return ipaddress.ip_address(address or '').is_loopback
+    except ValueError:
+        return False
+
+@metrics_bp.route('/metrics')
+def export_metrics():
+    """Métricas agregadas de todos los workers en formato de texto de Prometheus"""
+    if not metrics.enabled:
+        abort(404)
+
+    # Con METRICS_TOKEN configurado se exige "Authorization: Bearer <token>";
+    # sin él, METRICS_LOOPBACK_ONLY limita el acceso a la propia máquina
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        provided = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(provided, f'Bearer {token}'):
+            abort(401)
+    elif current_app.config.get('METRICS_LOOPBACK_ONLY'):
+        # El par real del socket: con ProxyFix, remote_addr sale de
+        # X-Forwarded-For y lo podría falsificar el cliente
+        peer = request.environ.get('werkzeug.proxy_fix.orig', {}).get('REMOTE_ADDR',
+                                                                     request.remote_addr)
+        if not _is_loopback(peer):
+            abort(403)
+
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
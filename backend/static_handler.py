@@ -1,6 +1,14 @@
 # Manejador de archivos estáticos
-from flask import Blueprint, send_from_directory, abort
+from flask import Blueprint, abort, request, current_app
+from werkzeug.security import safe_join
+import logging
 import os
+import re
+
+from backend.routes.api import landing_data
+from backend.utils.images import negotiate_image, forget_derivative, is_negotiable
+from backend.utils.landing import landing_response
+from backend.utils.static_files import static_files, has_extension
 
 static_bp = Blueprint('static_files', __name__)
 
@@ -9,74 +17,149 @@ static_bp = Blueprint('static_files', __name__)
 current_dir = os.path.dirname(__file__)
 project_root = os.path.dirname(current_dir)  # Subir un nivel desde backend/
 FRONTEND_DIR = os.path.join(project_root, 'frontend')
+ASSETS_DIR = os.path.join(FRONTEND_DIR, 'assets')
+
+# Salida de scripts/build_assets.py (bundles con hash y versiones precomprimidas)
+DIST_DIR = os.path.join(ASSETS_DIR, 'dist')
+
+# Codificaciones precomprimidas en orden de preferencia
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]
+
+# Nombres con hash de contenido: su contenido nunca cambia
+HASHED_NAME = re.compile(r'\.[0-9a-f]{10}\.(css|js)$')
+IMMUTABLE_MAX_AGE = 31536000  # 1 año
 
 # Verificar que el directorio frontend existe
 if not os.path.exists(FRONTEND_DIR):
-    print(f"⚠️  ADVERTENCIA: Directorio frontend no encontrado en {FRONTEND_DIR}")
-    print("   Asegúrate de que el directorio frontend existe en la raíz del proyecto")
+    logging.warning(f"Directorio frontend no encontrado en {FRONTEND_DIR}")
+
+
+def _is_inside(path, directory):
+    path, directory = os.path.abspath(path), os.path.abspath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+
+@static_bp.record_once
+def _init_static_files(state):
+    """Indexar el frontend y las imágenes subidas (en la primera petición, no al arrancar)"""
+    config = state.app.config
+    # Las variantes generadas no deben quedar publicadas como estáticos ni subidas
+    for public_dir in (FRONTEND_DIR, config['UPLOAD_FOLDER']):
+        if _is_inside(config['IMAGE_CACHE_DIR'], public_dir):
+            raise RuntimeError(f"IMAGE_CACHE_DIR no puede estar dentro de {public_dir}")
+    static_files.init_app(state.app, [
+        (FRONTEND_DIR, None),
+        (config['UPLOAD_FOLDER'], config['UPLOAD_PUBLIC_EXTENSIONS'])
+    ])
+
+
+def _index_path():
+    """index.html compilado si existe, o el original del frontend"""
+    built = os.path.join(DIST_DIR, 'index.html')
+    return built if static_files.lookup(built) else os.path.join(FRONTEND_DIR, 'index.html')
+
+
+def _negotiate_encoding(path):
+    """Elegir la versión precomprimida que acepta el cliente, si existe"""
+    for encoding, extension in PRECOMPRESSED:
+        if encoding in request.accept_encodings:
+            variant = static_files.lookup(path + extension, cache_missing=True)
+            if variant:
+                return encoding, variant
+    return None, None
+
+
+def _varies_on_accept(entry):
+    """La respuesta depende de Accept (también cuando se sirve el original)"""
+    return current_app.config.get('IMAGE_DERIVATIVES_ENABLED', True) and is_negotiable(entry)
+
+
+def _negotiate_image(entry):
+    """Variante de la imagen según Accept y el ancho pedido en ?w="""
+    if not _varies_on_accept(entry):
+        return None
+    return negotiate_image(
+        entry,
+        current_app.config['IMAGE_CACHE_DIR'],
+        request.accept_mimetypes,
+        requested_width=request.args.get('w', type=int),
+        widths=current_app.config.get('IMAGE_WIDTHS'),
+        recheck_interval=static_files.check_interval
+    )
+
+
+def _send(path):
+    """Enviar un archivo negociando la codificación y con cabeceras de caché"""
+    entry = static_files.lookup(path)
+    if entry is None:
+        abort(404)
+
+    # Mientras la variante no existe se sirve el original (se genera en la cola)
+    derivative = _negotiate_image(entry)
+    if derivative:
+        send_path, mimetype = derivative
+        derivative_entry = static_files.lookup(send_path)
+        if derivative_entry is not None:
+            response = static_files.send(derivative_entry, mimetype=mimetype)
+            response.vary.add('Accept')
+            response.vary.add('Accept-Encoding')
+            return response
+        forget_derivative(entry, send_path)
+
+    encoding, variant = _negotiate_encoding(path)
+
+    # Los nombres con hash se cachean para siempre; el resto se revalida
+    # siempre con ETag/Last-Modified
+    immutable = bool(HASHED_NAME.search(path))
+    response = static_files.send(
+        variant or entry,
+        mimetype=entry.mimetype,
+        max_age=IMMUTABLE_MAX_AGE if immutable else None,
+        immutable=immutable,
+        content_encoding=encoding
+    )
+    response.vary.add('Accept-Encoding')
+    if _varies_on_accept(entry):
+        # Un caché no debe reutilizar el original para un cliente con AVIF/WebP
+        response.vary.add('Accept')
+    return response
+
+
+def _send_landing():
+    """Página de inicio con proyectos, testimonios y blog incrustados"""
+    if current_app.config.get('LANDING_PRERENDER', True):
+        template = static_files.lookup(_index_path())
+        if template is None:
+            abort(404)
+        response = landing_response(template, landing_data)
+        if response is not None:
+            return response
+    return _send(_index_path())
+
 
 @static_bp.route('/static/<path:filename>')
 def serve_static(filename):
     """Servir archivos estáticos del frontend"""
-    print(f"Intentando servir: {filename}")
-    print(f"Directorio frontend: {FRONTEND_DIR}")
-    print(f"Directorio existe: {os.path.exists(FRONTEND_DIR)}")
-    
-    # Verificar que el directorio existe
-    if not os.path.exists(FRONTEND_DIR):
-        print(f"Error: Directorio frontend no existe: {FRONTEND_DIR}")
-        abort(404)
-    
-    # Verificar que el archivo existe
-    file_path = os.path.join(FRONTEND_DIR, filename)
-    if not os.path.exists(file_path):
-        print(f"Error: Archivo no existe: {file_path}")
-        abort(404)
-    
-    # Servir el archivo
-    try:
-        return send_from_directory(FRONTEND_DIR, filename)
-    except Exception as e:
-        print(f"Error al servir archivo: {e}")
-        abort(404)
+    if filename == 'index.html':
+        return _send_landing()
+    return _send(safe_join(FRONTEND_DIR, filename))
+
 
 @static_bp.route('/assets/<path:filename>')
 def serve_assets(filename):
     """Servir archivos de assets (CSS, JS, imágenes)"""
-    print(f"Intentando servir asset: {filename}")
-    print(f"Directorio frontend: {FRONTEND_DIR}")
-    
-    # Verificar que el directorio existe
-    if not os.path.exists(FRONTEND_DIR):
-        print(f"Error: Directorio frontend no existe: {FRONTEND_DIR}")
-        abort(404)
-    
-    # Verificar que el archivo existe
-    file_path = os.path.join(FRONTEND_DIR, 'assets', filename)
-    if not os.path.exists(file_path):
-        print(f"Error: Asset no existe: {file_path}")
-        abort(404)
-    
-    # Servir el archivo
-    try:
-        return send_from_directory(os.path.join(FRONTEND_DIR, 'assets'), filename)
-    except Exception as e:
-        print(f"Error al servir asset: {e}")
+    return _send(safe_join(ASSETS_DIR, filename))
+
+
+@static_bp.route('/uploads/<path:filename>')
+def serve_uploads(filename):
+    """Servir imágenes subidas (imagen_url de proyectos, testimonios y blog)"""
+    if not has_extension(filename, current_app.config['UPLOAD_PUBLIC_EXTENSIONS']):
         abort(404)
+    return _send(safe_join(current_app.config['UPLOAD_FOLDER'], filename))
+
 
 @static_bp.route('/')
 def serve_index():
     """Servir página principal"""
-    print(f"Sirviendo página principal desde: {FRONTEND_DIR}")
-    
-    # Verificar que el directorio existe
-    if not os.path.exists(FRONTEND_DIR):
-        print(f"Error: Directorio frontend no existe: {FRONTEND_DIR}")
-        abort(404)
-    
-    # Servir index.html
-    try:
-        return send_from_directory(FRONTEND_DIR, 'index.html')
-    except Exception as e:
-        print(f"Error al servir index.html: {e}")
-        abort(404)
+    return _send_landing()
@@ -0,0 +1,323 @@
+# Copias de seguridad en caliente de la base de datos SQLite
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+from backend.database import db
+from backend.utils.job_queue import job_queue
+
+BACKUP_SUFFIX = '.db.gz'
+CHECKSUM_SUFFIX = '.sha256'
+
+
+class BackupError(Exception):
+    """La copia de seguridad no se pudo crear o verificar"""
+
+
+def format_size(size):
+    """Tamaño en bytes legible (KB, MB...)"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+
+class _BackupLock:
+    """flock exclusivo sobre el directorio de copias; sin efecto donde fcntl no existe"""
+
+    def __init__(self, path, blocking=True):
+        self.path = path
+        self.blocking = blocking
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return True
+        self._file = open(self.path, 'a')
+        flags = fcntl.LOCK_EX if self.blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(self._file, flags)
+        except BlockingIOError:
+            self._file.close()
+            self._file = None
+            return False
+        return True
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class _HashingWriter:
+    """Archivo de salida que va calculando el hash de lo que se escribe"""
+
+    def __init__(self, fileobj, digest):
+        self._fileobj = fileobj
+        self._digest = digest
+
+    def write(self, data):
+        self._digest.update(data)
+        return self._fileobj.write(data)
+
+    def flush(self):
+        self._fileobj.flush()
+
+
+class BackupManager:
+    """Copias comprimidas de la base de datos con la API de backup de SQLite.
+
+    La copia se hace en pasos de ``pages_per_step`` páginas con una pausa
+    entre ellos sobre una instantánea de lectura, así que con WAL las
+    escrituras de la web siguen mientras tanto. Cada copia se comprueba con ``PRAGMA integrity_check``, se comprime
+    con gzip junto a un ``.sha256`` (formato de ``sha256sum``) y se conservan
+    las ``keep`` más recientes.
+
+    Con ``BACKUP_INTERVAL`` cada proceso tiene un hilo que crea la copia
+    cuando la última es más antigua que el intervalo; un flock sobre el
+    directorio evita que dos workers la hagan a la vez.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.keep = 14
+        self.pages_per_step = 256
+        self.step_sleep = 0.01
+        self.interval = 0
+        self._app = None
+        self._lock = threading.Lock()
+        self._scheduler_pid = None
+
+    def init_app(self, app):
+        """Leer la configuración y arrancar la copia programada por proceso"""
+        self.directory = app.config.get('BACKUP_DIR')
+        self.keep = app.config.get('BACKUP_KEEP', self.keep)
+        self.pages_per_step = app.config.get('BACKUP_PAGES_PER_STEP', self.pages_per_step)
+        self.step_sleep = app.config.get('BACKUP_STEP_SLEEP', self.step_sleep)
+        self.interval = app.config.get('BACKUP_INTERVAL', self.interval)
+        self._app = app
+        app.extensions['backup_manager'] = self
+
+        if self.interval:
+            # Los hilos no sobreviven a un fork: se arranca en la primera
+            # petición de cada proceso
+            app.before_request(self.start)
+
+    def database_path(self):
+        """Ruta del archivo SQLite de la aplicación (None si no es un archivo)"""
+        url = db.engine.url
+        if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+            return None
+        return os.path.abspath(url.database)
+
+    def _prefix(self, db_path):
+        return os.path.splitext(os.path.basename(db_path))[0] + '-'
+
+    def list_backups(self):
+        """Copias existentes, de la más reciente a la más antigua"""
+        db_path = self.database_path()
+        if db_path is None or not self.directory or not os.path.isdir(self.directory):
+            return []
+        prefix = self._prefix(db_path)
+        backups = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(prefix) and entry.name.endswith(BACKUP_SUFFIX):
+                stat = entry.stat()
+                backups.append({
+                    'name': entry.name,
+                    'path': entry.path,
+                    'size': stat.st_size,
+                    'created': datetime.fromtimestamp(stat.st_mtime)
+                })
+        backups.sort(key=lambda backup: (backup['created'], backup['name']), reverse=True)
+        return backups
+
+    def create_backup(self, scheduled=False):
+        """Crear una copia y devolver sus datos.
+
+        Con ``scheduled`` no se espera a otro proceso que esté copiando y solo
+        se copia si todavía toca; en ese caso devuelve None.
+        """
+        db_path = self.database_path()
+        if db_path is None:
+            raise BackupError('La base de datos no es un archivo SQLite')
+
+        os.makedirs(self.directory, exist_ok=True)
+        lock_path = os.path.join(self.directory, '.backup.lock')
+        with _BackupLock(lock_path, blocking=not scheduled) as acquired:
+            if not acquired or (scheduled and self.seconds_until_due()):
+                return None
+            return self._create(db_path)
+
+    def _create(self, db_path):
+        started = time.monotonic()
+        name = f'{self._prefix(db_path)}{datetime.utcnow():%Y%m%d-%H%M%S}'
+        if os.path.exists(os.path.join(self.directory, name + BACKUP_SUFFIX)):
+            name += f'-{int(time.time() * 1000) % 1000:03d}'
+        raw_path = os.path.join(self.directory, f'.{name}.db.tmp')
+        final_path = os.path.join(self.directory, name + BACKUP_SUFFIX)
+        tmp_path = final_path + '.tmp'
+
+        try:
+            source = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+            target = sqlite3.connect(raw_path)
+            try:
+                # Una transacción de lectura abierta fija la instantánea del WAL:
+                # sin ella cada escritura de otra conexión reinicia la copia
+                # desde el principio y con tráfico constante no termina nunca
+                source.execute('BEGIN')
+                source.execute('SELECT count(*) FROM sqlite_master').fetchone()
+                # ``sleep`` solo se aplica cuando la base está ocupada: la pausa
+                # entre pasos se hace en el callback de progreso
+                source.backup(target, pages=self.pages_per_step,
+                              progress=lambda *args: time.sleep(self.step_sleep))
+                source.execute('COMMIT')
+                pages = target.execute('PRAGMA page_count').fetchone()[0]
+                result = target.execute('PRAGMA integrity_check').fetchone()[0]
+                if result != 'ok':
+                    raise BackupError(f'La copia no supera integrity_check: {result}')
+            finally:
+                target.close()
+                source.close()
+
+            digest = hashlib.sha256()
+            with open(raw_path, 'rb') as raw, open(tmp_path, 'wb') as output:
+                hashing = _HashingWriter(output, digest)
+                with gzip.GzipFile(filename=name + '.db', mode='wb', fileobj=hashing) as compressed:
+                    shutil.copyfileobj(raw, compressed, 1024 * 1024)
+                output.flush()
+                os.fsync(output.fileno())
+            os.replace(tmp_path, final_path)
+            with open(final_path + CHECKSUM_SUFFIX, 'w') as checksum:
+                checksum.write(f'{digest.hexdigest()}  {os.path.basename(final_path)}\n')
+        except BaseException:
+            for path in (tmp_path, final_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        finally:
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+
+        removed = self.rotate()
+        return {
+            'path': final_path,
+            'size': os.path.getsize(final_path),
+            'sha256': digest.hexdigest(),
+            'pages': pages,
+            'duration': time.monotonic() - started,
+            'removed': removed
+        }
+
+    def rotate(self):
+        """Borrar las copias que exceden ``keep``; devuelve sus nombres"""
+        removed = []
+        for backup in self.list_backups()[self.keep:]:
+            for path in (backup['path'], backup['path'] + CHECKSUM_SUFFIX):
+                if os.path.exists(path):
+                    os.remove(path)
+            removed.append(backup['name'])
+        return removed
+
+    def verify(self, path):
+        """Comprobar el sha256 de una copia contra su archivo ``.sha256``"""
+        checksum_path = path + CHECKSUM_SUFFIX
+        if not os.path.exists(checksum_path):
+            raise BackupError(f'No existe {os.path.basename(checksum_path)}')
+        with open(checksum_path) as checksum:
+            expected = checksum.read().split()[0]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as backup:
+            for block in iter(lambda: backup.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest() == expected
+
+    def database_info(self):
+        """Tamaño, páginas y WAL de la base de datos y datos de la última copia"""
+        db_path = self.database_path()
+        info = {
+            'path': db_path,
+            'size': None,
+            'page_count': None,
+            'page_size': None,
+            'freelist_count': None,
+            'wal_size': None,
+            'last_backup': None,
+            'last_backup_size': None,
+            'backup_count': 0
+        }
+        if db_path is None or not os.path.exists(db_path):
+            return info
+
+        wal_path = db_path + '-wal'
+        info['wal_size'] = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        connection = db.session.connection()
+        for pragma in ('page_count', 'page_size', 'freelist_count'):
+            info[pragma] = connection.exec_driver_sql(f'PRAGMA {pragma}').scalar()
+        # Tamaño lógico: incluye las páginas que aún están solo en el WAL
+        info['size'] = info['page_count'] * info['page_size']
+
+        backups = self.list_backups()
+        info['backup_count'] = len(backups)
+        if backups:
+            info['last_backup'] = backups[0]['created']
+            info['last_backup_size'] = backups[0]['size']
+        return info
+
+    def seconds_until_due(self):
+        """Segundos hasta la próxima copia programada (0 si ya toca)"""
+        backups = self.list_backups()
+        if not backups:
+            return 0
+        age = time.time() - backups[0]['created'].timestamp()
+        return max(0, self.interval - age)
+
+    def start(self):
+        """Arrancar el hilo de copias programadas en este proceso si no existe"""
+        if not self.interval or self._scheduler_pid == os.getpid():
+            return
+        with self._lock:
+            if self._scheduler_pid == os.getpid():
+                return
+            self._scheduler_pid = os.getpid()
+        thread = threading.Thread(target=self._run, name='database-backup', daemon=True)
+        thread.start()
+
+    def _run(self):
+        """Bucle del hilo de copias programadas"""
+        while True:
+            try:
+                with self._app.app_context():
+                    wait = self.seconds_until_due()
+                    if not wait:
+                        backup = self.create_backup(scheduled=True)
+                        if backup:
+                            logging.info(f"Backup creado: {backup['path']}")
+                        wait = self.seconds_until_due() or self.interval
+            except Exception as e:
+                logging.error(f"Error en la copia de seguridad programada: {str(e)}")
+                wait = min(self.interval, 300)
+            # Despertar al menos cada hora por si otro proceso cambió las copias
+            time.sleep(min(max(wait, 1), 3600))
+
+
+# Instancia global de las copias de seguridad
+backup_manager = BackupManager()
+
+
+@job_queue.handler('database_backup')
+def run_backup_jobs(payloads):
+    """Crear una copia desde la cola de trabajos (botón del panel)"""
+    backup_manager.create_backup()
@@ -0,0 +1,202 @@
+# Caché de respuestas en memoria para la API pública
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+from flask import request, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from werkzeug.http import is_resource_modified
+
+from backend.utils.metrics import metrics
+
+# Cuerpo serializado junto con sus validadores HTTP
+CachedResponse = namedtuple('CachedResponse', ['body', 'etag', 'last_modified'])
+
+
+def make_etag(*parts):
+    """Calcular un ETag fuerte a partir de las partes dadas"""
+    digest = hashlib.sha1()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def not_modified(etag=None, last_modified=None):
+    """Comprobar si los validadores del cliente siguen vigentes"""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if not request.if_none_match and not request.if_modified_since:
+        return False
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+class ResponseCache:
+    """Caché LRU con TTL de respuestas JSON ya serializadas.
+
+    Cada entrada se etiqueta con las tablas de las que depende. La clave
+    incluye la versión actual de cada etiqueta, de modo que al invalidar
+    una tabla las entradas antiguas dejan de ser alcanzables al instante.
+    """
+
+    def __init__(self, max_entries=256, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._watched = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Leer la configuración de la aplicación"""
+        self.max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', self.max_entries)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        app.extensions['response_cache'] = self
+
+    def make_key(self, name, tags):
+        """Construir la clave a partir del nombre y las versiones de las etiquetas"""
+        tags = tuple(tags)
+        with self._lock:
+            versions = tuple(self._versions.get(tag, 0) for tag in tags)
+        return (name, tags, versions)
+
+    def get(self, key):
+        """Obtener la respuesta cacheada o None si no existe o expiró"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return cached
+
+    def set(self, key, cached):
+        """Guardar una respuesta serializada, descartando las entradas más antiguas"""
+        with self._lock:
+            self._entries[key] = (cached, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *tags):
+        """Invalidar todas las entradas que dependen de las etiquetas dadas"""
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+            # Las entradas con versiones antiguas ya no son alcanzables; liberarlas
+            stale = [key for key in self._entries if set(key[1]) & set(tags)]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        """Vaciar la caché por completo"""
+        with self._lock:
+            self._entries.clear()
+
+    def cached(self, *tags, validator=None):
+        """Decorador para vistas GET que devuelven JSON dependiente de tablas.
+
+        ``validator`` es una función opcional que devuelve ``(semilla,
+        última_modificación)`` con una consulta agregada barata. Si se indica,
+        una petición condicional puede responderse con 304 sin cargar filas;
+        si no, el ETag se calcula a partir del cuerpo serializado.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                name = (request.endpoint, tuple(sorted(request.args.items(multi=True))))
+                key = self.make_key(name, tags)
+                cached = self.get(key)
+                metrics.inc('cache_requests_total', {
+                    'cache': 'response',
+                    'result': 'miss' if cached is None else 'hit'
+                })
+                if cached is not None:
+                    return self._respond(cached, 'HIT')
+
+                etag = last_modified = None
+                if validator is not None:
+                    seed, last_modified = validator()
+                    etag = make_etag(name, seed)
+                    if not_modified(etag, last_modified):
+                        return self._respond(CachedResponse(b'', etag, last_modified), 'MISS')
+
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or not response.is_json:
+                    return response
+
+                body = response.get_data()
+                cached = CachedResponse(body, etag or make_etag(body), last_modified)
+                # Guardar solo si ninguna etiqueta cambió durante la consulta
+                if self.make_key(name, tags) == key:
+                    self.set(key, cached)
+                return self._respond(cached, 'MISS')
+            return wrapper
+        return decorator
+
+    def _respond(self, cached, status):
+        """Construir la respuesta (200 o 304) a partir de una entrada cacheada"""
+        response = current_app.response_class(cached.body, mimetype='application/json')
+        response.set_etag(cached.etag)
+        if cached.last_modified is not None:
+            response.last_modified = cached.last_modified
+        # Los navegadores deben revalidar siempre con los validadores
+        response.cache_control.no_cache = True
+        response.headers['X-Cache'] = status
+        return response.make_conditional(request)
+
+    def watch(self, model, tag=None):
+        """Invalidar la etiqueta del modelo en cada inserción, actualización o borrado"""
+        if model in self._watched:
+            return
+        self._watched.add(model)
+        tag = tag or model.__tablename__
+
+        def on_change(mapper, connection, target):
+            self.invalidate(tag)
+            # Volver a invalidar tras el commit, por si otra petición
+            # cacheó datos antiguos entre el flush y el commit
+            session = object_session(target)
+            if session is not None:
+                session.info.setdefault('response_cache_tags', set()).add(tag)
+
+        for event_name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(model, event_name, on_change)
+
+
+def _invalidate_after_commit(session):
+    """Invalidar las etiquetas pendientes una vez confirmada la transacción"""
+    tags = session.info.pop('response_cache_tags', None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+def _discard_after_rollback(session, previous_transaction):
+    """Olvidar las etiquetas pendientes si la transacción se revierte"""
+    session.info.pop('response_cache_tags', None)
+
+
+# Instancia global de la caché
+response_cache = ResponseCache()
+
+
+def register_cache_events(session, *models):
+    """Conectar la invalidación automática para los modelos públicos"""
+    for model in models:
+        response_cache.watch(model)
+    if not event.contains(session, 'after_commit', _invalidate_after_commit):
+        event.listen(session, 'after_commit', _invalidate_after_commit)
+        event.listen(session, 'after_soft_rollback', _discard_after_rollback)
@@ -0,0 +1,131 @@
+# Ingesta asíncrona de mensajes de contacto y notificaciones por email
+import re
+import smtplib
+import uuid
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import parseaddr
+
+from flask import current_app
+
+from backend.database import db
+from backend.utils.job_queue import job_queue
+from backend.utils.stats import invalidate_stats
+
+# Lote máximo de mensajes insertados en una sola transacción
+INSERT_BATCH_SIZE = 50
+
+# CR/LF y demás caracteres de control no pueden llegar a una cabecera
+_CONTROL_CHARS = re.compile(r'[\x00-\x1f\x7f-\x9f]+')
+
+
+def enqueue_contact_message(data, ip_address):
+    """Encolar un mensaje del formulario de contacto ya validado"""
+    return job_queue.enqueue('contact_message', {
+        'nombre': data['nombre'],
+        'email': data['email'],
+        'telefono': data.get('telefono', ''),
+        'servicio': data['servicio'],
+        'mensaje': data['mensaje'],
+        'ip_address': ip_address,
+        # La fecha es la del envío, no la de la inserción diferida
+        'fecha': datetime.utcnow().isoformat(),
+        'token_envio': uuid.uuid4().hex
+    })
+
+
+@job_queue.handler('contact_message', batch_size=INSERT_BATCH_SIZE)
+def insert_contact_messages(payloads):
+    """Insertar un lote de mensajes y encolar la notificación de cada uno.
+
+    Si el lote falla después del commit (p. ej. al encolar los avisos), la
+    cola lo reintenta: los envíos cuyo ``token_envio`` ya está en la base no
+    se insertan de nuevo y solo se vuelve a encolar su notificación, con la
+    misma clave para no duplicarla si sigue pendiente.
+    """
+    from backend.models import ContactMessage
+
+    tokens = [payload['token_envio'] for payload in payloads if payload.get('token_envio')]
+    existing = {}
+    if tokens:
+        existing = dict(
+            db.session.query(ContactMessage.token_envio, ContactMessage.id)
+            .filter(ContactMessage.token_envio.in_(tokens))
+            .all()
+        )
+
+    messages = []
+    for payload in payloads:
+        if payload.get('token_envio') in existing:
+            continue
+        fields = dict(payload, fecha=datetime.fromisoformat(payload['fecha']))
+        messages.append(ContactMessage(**fields))
+
+    if messages:
+        db.session.add_all(messages)
+        db.session.commit()
+        invalidate_stats()
+
+    if current_app.config.get('CONTACT_NOTIFICATION_EMAIL'):
+        message_ids = sorted(list(existing.values()) + [message.id for message in messages])
+        for message_id in message_ids:
+            job_queue.enqueue('contact_notification', {'message_id': message_id},
+                              key=str(message_id))
+
+
+def _header_value(text):
+    """Texto del usuario apto para una cabecera: sin saltos ni caracteres de control"""
+    return ' '.join(_CONTROL_CHARS.sub(' ', text or '').split())
+
+
+def _reply_to_address(text):
+    """La dirección para Reply-To si ``text`` es un email simple y válido, o None"""
+    if not text or _CONTROL_CHARS.search(text):
+        return None
+    name, address = parseaddr(text)
+    if name or address != text.strip() or address.count('@') != 1:
+        return None
+    local, domain = address.split('@')
+    return address if local and '.' in domain else None
+
+
+@job_queue.handler('contact_notification')
+def send_contact_notifications(payloads):
+    """Enviar el aviso por email de cada mensaje nuevo"""
+    from backend.models import ContactMessage
+
+    for payload in payloads:
+        message = db.session.get(ContactMessage, payload['message_id'])
+        if message is None:
+            continue
+        send_email(
+            current_app.config['CONTACT_NOTIFICATION_EMAIL'],
+            _header_value(f'Nuevo mensaje de contacto: {message.nombre} ({message.servicio})'),
+            f'Nombre: {message.nombre}\n'
+            f'Email: {message.email}\n'
+            f'Teléfono: {message.telefono or "-"}\n'
+            f'Servicio: {message.servicio}\n'
+            f'Fecha: {message.fecha:%Y-%m-%d %H:%M} UTC\n\n'
+            f'{message.mensaje}\n',
+            reply_to=_reply_to_address(message.email)
+        )
+
+
+def send_email(to, subject, body, reply_to=None):
+    """Enviar un email de texto con la configuración MAIL_* de la aplicación"""
+    config = current_app.config
+    email = EmailMessage()
+    email['Subject'] = subject
+    email['From'] = config.get('MAIL_DEFAULT_SENDER') or config.get('MAIL_USERNAME')
+    email['To'] = to
+    if reply_to:
+        email['Reply-To'] = reply_to
+    email.set_content(body)
+
+    with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'],
+                      timeout=config.get('MAIL_TIMEOUT', 10)) as smtp:
+        if config.get('MAIL_USE_TLS'):
+            smtp.starttls()
+        if config.get('MAIL_USERNAME') and config.get('MAIL_PASSWORD'):
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        smtp.send_message(email)
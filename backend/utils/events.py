@@ -0,0 +1,266 @@
+# Hub de notificaciones de cambios para el stream SSE del panel de administración
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+
+from backend.utils.stats import invalidate_stats
+
+# Eventos pendientes que se guardan por conexión antes de pedirle una resincronización
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class ChangeHub:
+    """Reparte los cambios confirmados a las conexiones SSE abiertas.
+
+    Con el backend ``memory`` los eventos se entregan dentro del proceso. Con
+    ``sqlite`` se insertan en una tabla compartida y un hilo por proceso lee
+    las filas nuevas (por clave primaria) cada ``poll_interval`` segundos,
+    así que un mensaje recibido en un worker de gunicorn llega a los
+    dashboards conectados a cualquier otro.
+    """
+
+    def __init__(self):
+        self.backend = 'memory'
+        self.path = None
+        self.poll_interval = 0.5
+        self.retention = 3600
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._poller_pid = None
+        self._last_id = 0
+
+    def init_app(self, app):
+        """Leer la configuración y preparar la tabla compartida"""
+        self.backend = app.config.get('EVENTS_BACKEND', 'memory')
+        self.path = app.config.get('EVENTS_PATH')
+        self.poll_interval = app.config.get('EVENTS_POLL_INTERVAL', self.poll_interval)
+        app.extensions['change_hub'] = self
+
+        if self.backend == 'sqlite':
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._connection().execute(
+                'CREATE TABLE IF NOT EXISTS change_event ('
+                'id INTEGER PRIMARY KEY, type TEXT NOT NULL, data TEXT NOT NULL, '
+                'created_at REAL NOT NULL)'
+            )
+
+    def _connection(self):
+        """Conexión SQLite propia de cada hilo (y de cada proceso)"""
+        owner = (os.getpid(), self.path)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.owner != owner:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.owner = owner
+        return connection
+
+    def subscribe(self):
+        """Registrar una conexión y devolver su cola de eventos"""
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            first = not self._subscribers
+            self._subscribers.add(subscriber)
+        if self.backend == 'sqlite':
+            if first:
+                # Sin conexiones abiertas no hace falta repartir los eventos anteriores:
+                # la conexión nueva empieza con las estadísticas completas
+                self._last_id = self._connection().execute(
+                    'SELECT coalesce(max(id), 0) FROM change_event'
+                ).fetchone()[0]
+            self._ensure_poller()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event_type, data):
+        """Publicar un evento para todos los dashboards conectados"""
+        if self.backend == 'sqlite':
+            try:
+                now = time.time()
+                connection = self._connection()
+                connection.execute(
+                    'INSERT INTO change_event (type, data, created_at) VALUES (?, ?, ?)',
+                    (event_type, json.dumps(data, default=str), now)
+                )
+                connection.execute('DELETE FROM change_event WHERE created_at < ?',
+                                   (now - self.retention,))
+            except sqlite3.Error as e:
+                logging.error(f"Error al publicar evento {event_type}: {str(e)}")
+            return
+        self._dispatch(event_type, data)
+
+    def last_event_id(self):
+        """Id del último evento de la tabla compartida (0 con el backend ``memory``)"""
+        if self.backend != 'sqlite':
+            return 0
+        return self._connection().execute(
+            'SELECT coalesce(max(id), 0) FROM change_event'
+        ).fetchone()[0]
+
+    def events_since(self, last_id, event_type):
+        """Eventos de un tipo publicados por cualquier worker después de ``last_id``.
+
+        Devuelve una lista de ``(id, data)``; con el backend ``memory`` siempre
+        está vacía porque no hay otros procesos.
+        """
+        if self.backend != 'sqlite':
+            return []
+        rows = self._connection().execute(
+            'SELECT id, data FROM change_event WHERE id > ? AND type = ? ORDER BY id',
+            (last_id, event_type)
+        ).fetchall()
+        return [(event_id, json.loads(data)) for event_id, data in rows]
+
+    def _dispatch(self, event_type, data):
+        """Entregar el evento a las colas de este proceso"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event_type, data))
+            except queue.Full:
+                # Conexión demasiado lenta: se le pide que recargue el estado completo
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(('resync', {}))
+
+    def _ensure_poller(self):
+        """Arrancar el hilo que lee la tabla compartida en este proceso"""
+        if self._poller_pid == os.getpid():
+            return
+        with self._lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._poller_pid = os.getpid()
+        thread = threading.Thread(target=self._poll, name='change-hub-poll', daemon=True)
+        thread.start()
+
+    def _poll(self):
+        """Leer los eventos nuevos mientras haya conexiones abiertas"""
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._subscribers:
+                    continue
+            try:
+                rows = self._connection().execute(
+                    'SELECT id, type, data FROM change_event WHERE id > ? ORDER BY id',
+                    (self._last_id,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logging.error(f"Error al leer eventos: {str(e)}")
+                continue
+            if rows:
+                # El cambio pudo confirmarse en otro worker: sus estadísticas cacheadas
+                # en este proceso ya no valen
+                invalidate_stats()
+            for event_id, event_type, data in rows:
+                self._last_id = event_id
+                self._dispatch(event_type, json.loads(data))
+
+
+def _message_data(message):
+    return {
+        'id': message.id,
+        'nombre': message.nombre,
+        'email': message.email,
+        'servicio': message.servicio,
+        'fecha': message.fecha.isoformat() if message.fecha else None,
+        'leido': bool(message.leido)
+    }
+
+
+def _changed(target, attribute):
+    """El atributo cambió en este flush"""
+    return inspect(target).attrs[attribute].history.has_changes()
+
+
+def queue_event(target, event_type, data):
+    """Guardar el evento en la sesión hasta que se confirme la transacción"""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('change_events', []).append((event_type, data))
+
+
+def _on_message_insert(mapper, connection, target):
+    queue_event(target, 'message.created', _message_data(target))
+
+
+def _on_message_update(mapper, connection, target):
+    if _changed(target, 'leido'):
+        queue_event(target, 'message.read', {'id': target.id, 'leido': bool(target.leido)})
+
+
+def _on_message_delete(mapper, connection, target):
+    queue_event(target, 'message.deleted', {'id': target.id})
+
+
+def _publish_flag(event_type, attribute, inserted=False):
+    """Listener que publica cuando cambia el indicador de publicación del modelo"""
+    def listener(mapper, connection, target):
+        value = getattr(target, attribute)
+        if (value if inserted else _changed(target, attribute)):
+            queue_event(target, event_type, {
+                'id': target.id,
+                'titulo': target.titulo,
+                attribute: bool(value)
+            })
+    return listener
+
+
+_on_project_insert = _publish_flag('project.published', 'activo', inserted=True)
+_on_project_update = _publish_flag('project.published', 'activo')
+_on_post_insert = _publish_flag('post.published', 'publicado', inserted=True)
+_on_post_update = _publish_flag('post.published', 'publicado')
+
+
+def _publish_after_commit(session):
+    """Publicar los eventos pendientes una vez confirmada la transacción"""
+    events = session.info.pop('change_events', None)
+    if not events:
+        return
+    invalidate_stats()
+    for event_type, data in events:
+        change_hub.publish(event_type, data)
+
+
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop('change_events', None)
+
+
+# Instancia global del hub
+change_hub = ChangeHub()
+
+
+def register_change_events(session):
+    """Conectar los eventos de modelos que interesan al dashboard"""
+    from backend.models import ContactMessage, Project, BlogPost
+
+    listeners = [
+        (ContactMessage, 'after_insert', _on_message_insert),
+        (ContactMessage, 'after_update', _on_message_update),
+        (ContactMessage, 'after_delete', _on_message_delete),
+        (Project, 'after_insert', _on_project_insert),
+        (Project, 'after_update', _on_project_update),
+        (BlogPost, 'after_insert', _on_post_insert),
+        (BlogPost, 'after_update', _on_post_update),
+    ]
+    for model, event_name, listener in listeners:
+        if not event.contains(model, event_name, listener):
+            event.listen(model, event_name, listener)
+
+    if not event.contains(session, 'after_commit', _publish_after_commit):
+        event.listen(session, 'after_commit', _publish_after_commit)
+        event.listen(session, 'after_soft_rollback', _discard_after_rollback)
@@ -0,0 +1,78 @@
+# Exportación de consultas en streaming (CSV / NDJSON)
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from flask import Response, stream_with_context
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Filas que se piden al cursor por cada vuelta y que se envían en cada trozo
+EXPORT_CHUNK_SIZE = 1000
+
+# Prefijos que una hoja de cálculo interpretaría como fórmula
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_value(value):
+    """Valor de una celda CSV, neutralizando las fórmulas del texto enviado por usuarios"""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(rows, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM para que Excel detecte UTF-8 (tildes y eñes)
+    buffer.write('\ufeff')
+    writer.writerow(fields)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_csv_value(value) for value in row])
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows, fields):
+    lines = []
+    for row in rows:
+        record = {field: _json_value(value) for field, value in zip(fields, row)}
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) == EXPORT_CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(rows, fields, fmt, filename):
+    """Respuesta que genera el archivo mientras se leen las filas.
+
+    ``rows`` debe ser un iterable perezoso de tuplas (p. ej. una consulta con
+    ``yield_per``): solo hay en memoria un trozo de ``EXPORT_CHUNK_SIZE`` filas,
+    sea cual sea el tamaño de la tabla.
+    """
+    chunks = _csv_chunks(rows, fields) if fmt == 'csv' else _ndjson_chunks(rows, fields)
+    response = Response(stream_with_context(chunks), content_type=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    response.headers['Cache-Control'] = 'no-store'
+    # Que nginx no acumule la respuesta antes de enviarla
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
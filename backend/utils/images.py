@@ -0,0 +1,226 @@
+# Generación de variantes de imágenes (tamaños y formatos) con caché en disco
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+
+from backend.utils.job_queue import job_queue
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow es opcional: sin él se sirven los originales
+    Image = None
+
+# Extensiones de imágenes que admiten variantes
+RASTER_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+
+# Formato de Pillow, extensión y tipo MIME de cada variante, por preferencia
+FORMATS = {
+    'avif': ('AVIF', '.avif', 'image/avif'),
+    'webp': ('WEBP', '.webp', 'image/webp'),
+    'jpeg': ('JPEG', '.jpg', 'image/jpeg'),
+    'png': ('PNG', '.png', 'image/png'),
+}
+
+DEFAULT_WIDTHS = [240, 480, 640, 960, 1280, 1920]
+DEFAULT_QUALITY = {'avif': 50, 'webp': 75, 'jpeg': 80}
+
+_source_hashes = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def images_available():
+    """Pillow está instalado"""
+    return Image is not None
+
+
+def supported_formats():
+    """Formatos de salida que puede escribir el Pillow instalado"""
+    if Image is None:
+        return []
+    Image.init()
+    return [name for name, (pil_format, _, _) in FORMATS.items() if pil_format in Image.SAVE]
+
+
+def is_raster(path):
+    """La ruta es una imagen a la que se pueden generar variantes"""
+    return os.path.splitext(path)[1].lower() in RASTER_EXTENSIONS
+
+
+def source_hash(path):
+    """Hash del contenido del original, recalculado solo si cambia mtime o tamaño"""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    cached = _source_hashes.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    value = digest.hexdigest()[:16]
+    _source_hashes[path] = (key, value)
+    return value
+
+
+def choose_width(requested, widths):
+    """Menor ancho configurado que cubre el solicitado (o el mayor disponible)"""
+    if not requested:
+        return max(widths)
+    for width in sorted(widths):
+        if width >= requested:
+            return width
+    return max(widths)
+
+
+def choose_format(accept_mimetypes, has_alpha, formats=None):
+    """Mejor formato aceptado por el cliente; JPEG o PNG como último recurso"""
+    formats = formats if formats is not None else supported_formats()
+    for name in ('avif', 'webp'):
+        if name in formats and accept_mimetypes.quality(FORMATS[name][2]) > 0:
+            # El comodín image/* no garantiza soporte de formatos modernos
+            if FORMATS[name][2] in accept_mimetypes.values():
+                return name
+    return 'png' if has_alpha else 'jpeg'
+
+
+def _lock_for(path):
+    """Lock por variante para no generar la misma imagen dos veces a la vez"""
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+def derivative_path(cache_dir, digest, width, fmt):
+    """Ruta en ``cache_dir`` de la variante (ancho, formato) del original con ese hash"""
+    digest = digest[:16]
+    return os.path.join(cache_dir, digest[:2], f'{digest}-{width}{FORMATS[fmt][1]}')
+
+
+def get_derivative(src_path, cache_dir, width, fmt, quality=None):
+    """Ruta de la variante (ancho, formato) del original, generándola si no existe.
+
+    Las variantes se guardan en ``cache_dir`` con el hash del original en el
+    nombre, así que un original modificado genera variantes nuevas.
+    """
+    target = derivative_path(cache_dir, source_hash(src_path), width, fmt)
+    if os.path.isfile(target):
+        return target
+
+    with _lock_for(target):
+        if os.path.isfile(target):
+            return target
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        with Image.open(src_path) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.width > width:
+                height = round(image.height * width / image.width)
+                image = image.resize((width, height), Image.LANCZOS)
+            if fmt == 'jpeg' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+
+            options = {'optimize': True} if fmt in ('jpeg', 'png') else {}
+            quality = (quality or DEFAULT_QUALITY).get(fmt)
+            if quality:
+                options['quality'] = quality
+            if fmt == 'jpeg':
+                options['progressive'] = True
+
+            # Escribir en un temporal y renombrar: nunca se sirve un archivo a medias
+            temporary = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+            image.save(temporary, FORMATS[fmt][0], **options)
+        os.replace(temporary, target)
+    return target
+
+
+def has_alpha(src_path):
+    """El original tiene canal alfa (transparencia)"""
+    with Image.open(src_path) as image:
+        return image.mode in ('RGBA', 'LA', 'PA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        )
+
+
+class ImageInfo:
+    """Datos de negociación de un original, guardados en su entrada del índice.
+
+    La entrada (``StaticFile``) se sustituye cuando cambia el mtime o el
+    tamaño del archivo, así que estos datos nunca sobreviven a un cambio.
+    """
+
+    __slots__ = ('alpha', 'variants')
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.variants = {}  # (ancho, formato) -> (última comprobación, ruta o None)
+
+
+def _image_info(entry):
+    """Canal alfa del original, calculado una sola vez por versión del archivo"""
+    if entry.image is None:
+        try:
+            entry.image = ImageInfo(has_alpha(entry.path))
+        except Exception as e:
+            logging.error(f"Error al leer la imagen {entry.path}: {str(e)}")
+            entry.image = False
+    return entry.image
+
+
+def is_negotiable(entry):
+    """La respuesta de ``entry`` depende de Accept: imagen rasterizada legible con Pillow"""
+    return Image is not None and is_raster(entry.path) and bool(_image_info(entry))
+
+
+def negotiate_image(entry, cache_dir, accept_mimetypes, requested_width=None, widths=None,
+                    recheck_interval=2.0):
+    """Mejor variante ya generada para la petición.
+
+    ``entry`` es la entrada del índice de estáticos del original. Devuelve
+    ``(ruta, mimetype)`` o ``None`` si hay que servir el original: sin
+    Pillow, si la imagen no se puede leer o si la variante aún no existe. En
+    este último caso se encola su generación y se vuelve a comprobar el disco
+    como mucho cada ``recheck_interval`` segundos.
+    """
+    if not is_negotiable(entry):
+        return None
+    info = entry.image
+
+    width = choose_width(requested_width, widths or DEFAULT_WIDTHS)
+    fmt = choose_format(accept_mimetypes, info.alpha)
+    now = time.monotonic()
+    checked_at, path = info.variants.get((width, fmt), (None, None))
+    if path is None and (checked_at is None or now - checked_at >= recheck_interval):
+        target = derivative_path(cache_dir, entry.etag, width, fmt)
+        if not os.path.isfile(target):
+            # En modo eager (testing) el trabajo se ejecuta aquí mismo
+            job_queue.enqueue('image_derivative', {
+                'path': entry.path,
+                'width': width,
+                'format': fmt
+            }, key=os.path.basename(target))
+        path = target if os.path.isfile(target) else None
+        info.variants[(width, fmt)] = (now, path)
+    return (path, FORMATS[fmt][2]) if path else None
+
+
+def forget_derivative(entry, path):
+    """Olvidar una variante que ya no está en disco (p. ej. al vaciar la caché)"""
+    if entry.image:
+        for variant, (_, cached) in list(entry.image.variants.items()):
+            if cached == path:
+                entry.image.variants.pop(variant, None)
+
+
+@job_queue.handler('image_derivative')
+def generate_derivatives(payloads):
+    """Generar en segundo plano las variantes pedidas que aún no existen"""
+    config = current_app.config
+    for payload in payloads:
+        if os.path.isfile(payload['path']):
+            get_derivative(payload['path'], config['IMAGE_CACHE_DIR'], payload['width'],
+                           payload['format'], config.get('IMAGE_QUALITY'))
@@ -0,0 +1,257 @@
+# Cola de trabajos persistente en SQLite con hilos trabajadores
+import atexit
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS job (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_at REAL NOT NULL,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    dedupe_key TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_job_kind_status_run_at ON job (kind, status, run_at);
+"""
+
+# Se crea aparte porque las colas anteriores no tienen la columna dedupe_key.
+# Es parcial: un trabajo fallido no impide volver a encolar la misma key
+DEDUPE_INDEX = (
+    'CREATE UNIQUE INDEX IF NOT EXISTS ux_job_kind_dedupe_key_active '
+    "ON job (kind, dedupe_key) WHERE status != 'failed'"
+)
+
+
+class JobQueue:
+    """Cola de trabajos duradera en un archivo SQLite propio.
+
+    ``enqueue`` es un único INSERT en autocommit (WAL, synchronous=NORMAL),
+    así que la petición no espera a la base principal ni a SMTP. Los hilos
+    trabajadores reclaman lotes por tipo dentro de ``BEGIN IMMEDIATE``, por lo
+    que varios workers de gunicorn pueden compartir la misma cola. Un lote que
+    falla se reintenta con espera exponencial hasta ``max_attempts``. Un
+    trabajo encolado con ``key`` no se duplica mientras siga pendiente; una
+    vez fallido se puede volver a encolar.
+
+    Con ``JOB_QUEUE_EAGER`` los trabajos se ejecutan al encolarlos (testing).
+    """
+
+    def __init__(self):
+        self.path = None
+        self.eager = False
+        self.workers = 2
+        self.poll_interval = 1.0
+        self.max_attempts = 5
+        self.backoff_base = 2.0
+        self.backoff_max = 300.0
+        self.lock_timeout = 120.0
+        self._handlers = {}
+        self._app = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._workers_pid = None
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        """Leer la configuración, crear la tabla y arrancar los trabajadores por proceso"""
+        self.path = app.config.get('JOB_QUEUE_PATH')
+        self.eager = app.config.get('JOB_QUEUE_EAGER', False)
+        self.workers = app.config.get('JOB_QUEUE_WORKERS', self.workers)
+        self.poll_interval = app.config.get('JOB_QUEUE_POLL_INTERVAL', self.poll_interval)
+        self.max_attempts = app.config.get('JOB_QUEUE_MAX_ATTEMPTS', self.max_attempts)
+        self.backoff_base = app.config.get('JOB_QUEUE_BACKOFF_BASE', self.backoff_base)
+        self.backoff_max = app.config.get('JOB_QUEUE_BACKOFF_MAX', self.backoff_max)
+        self._app = app
+        app.extensions['job_queue'] = self
+
+        if self.eager:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        columns = {row[1] for row in connection.execute('PRAGMA table_info(job)')}
+        if 'dedupe_key' not in columns:
+            connection.execute('ALTER TABLE job ADD COLUMN dedupe_key TEXT')
+        # El índice anterior incluía los fallidos y bloqueaba su key para siempre
+        connection.execute('DROP INDEX IF EXISTS ux_job_kind_dedupe_key')
+        connection.execute(DEDUPE_INDEX)
+
+        # Los hilos no sobreviven a un fork: se arrancan en la primera petición
+        # de cada proceso (worker de gunicorn)
+        app.before_request(self.start)
+        if not self._atexit_registered:
+            atexit.register(self._stop.set)
+            self._atexit_registered = True
+
+    def handler(self, kind, batch_size=1):
+        """Registrar la función que procesa una lista de payloads del tipo dado"""
+        def decorator(func):
+            self._handlers[kind] = (func, batch_size)
+            return func
+        return decorator
+
+    def _connection(self):
+        """Conexión SQLite propia de cada hilo (y de cada proceso)"""
+        owner = (os.getpid(), self.path)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.owner != owner:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.owner = owner
+        return connection
+
+    def enqueue(self, kind, payload, delay=0, key=None):
+        """Añadir un trabajo a la cola; en modo eager se ejecuta al momento.
+
+        Si ya hay en la cola un trabajo pendiente del mismo tipo con la misma
+        ``key`` no se añade otro y se devuelve None.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f'Tipo de trabajo desconocido: {kind}')
+
+        if self.eager:
+            func, _ = self._handlers[kind]
+            func([payload])
+            return None
+
+        now = time.time()
+        cursor = self._connection().execute(
+            'INSERT OR IGNORE INTO job (kind, payload, dedupe_key, run_at, created_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (kind, json.dumps(payload), key, now + delay, now)
+        )
+        if not cursor.rowcount:
+            return None
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def _claim(self, kind, batch_size):
+        """Reservar hasta ``batch_size`` trabajos listos (o abandonados) del tipo dado"""
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            rows = connection.execute(
+                "SELECT id, payload, attempts FROM job "
+                "WHERE kind = ? AND run_at <= ? AND (status = 'pending' "
+                "OR (status = 'running' AND locked_until < ?)) "
+                "ORDER BY id LIMIT ?",
+                (kind, now, now, batch_size)
+            ).fetchall()
+            if rows:
+                connection.executemany(
+                    "UPDATE job SET status = 'running', locked_until = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    [(now + self.lock_timeout, row[0]) for row in rows]
+                )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return [(job_id, json.loads(payload), attempts + 1) for job_id, payload, attempts in rows]
+
+    def _complete(self, jobs):
+        """Eliminar los trabajos terminados"""
+        self._connection().executemany('DELETE FROM job WHERE id = ?', [(job[0],) for job in jobs])
+
+    def _fail(self, jobs, error):
+        """Reprogramar los trabajos con espera exponencial o marcarlos como fallidos"""
+        now = time.time()
+        updates = []
+        for job_id, _, attempts in jobs:
+            if attempts >= self.max_attempts:
+                updates.append(('failed', now, error, job_id))
+            else:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+                delay *= 1 + random.random() * 0.25
+                updates.append(('pending', now + delay, error, job_id))
+        self._connection().executemany(
+            'UPDATE job SET status = ?, run_at = ?, last_error = ?, locked_until = NULL '
+            'WHERE id = ?',
+            updates
+        )
+
+    def run_pending(self):
+        """Procesar un lote de cada tipo; devuelve el número de trabajos procesados"""
+        processed = 0
+        for kind, (func, batch_size) in list(self._handlers.items()):
+            jobs = self._claim(kind, batch_size)
+            if not jobs:
+                continue
+            try:
+                self._execute(func, jobs)
+            except Exception as e:
+                if len(jobs) == 1:
+                    logging.error(f"Error procesando trabajo '{kind}': {str(e)}")
+                    self._fail(jobs, str(e))
+                else:
+                    # Reintentar uno a uno para que un trabajo defectuoso no bloquee al resto
+                    for job in jobs:
+                        try:
+                            self._execute(func, [job])
+                        except Exception as e:
+                            logging.error(f"Error procesando trabajo '{kind}': {str(e)}")
+                            self._fail([job], str(e))
+            processed += len(jobs)
+        return processed
+
+    def _execute(self, func, jobs):
+        """Ejecutar el handler con los payloads y eliminar los trabajos si termina bien"""
+        with self._app.app_context():
+            func([payload for _, payload, _ in jobs])
+        self._complete(jobs)
+
+    def stats(self):
+        """Número de trabajos por tipo y estado"""
+        if self.eager:
+            return {}
+        rows = self._connection().execute(
+            'SELECT kind, status, count(*) FROM job GROUP BY kind, status'
+        ).fetchall()
+        result = {}
+        for kind, status, count in rows:
+            result.setdefault(kind, {})[status] = count
+        return result
+
+    def start(self):
+        """Arrancar los hilos trabajadores en este proceso si no existen"""
+        if self.eager or not self.workers or self._workers_pid == os.getpid():
+            return
+        with self._lock:
+            if self._workers_pid == os.getpid():
+                return
+            self._workers_pid = os.getpid()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'job-queue-{number}', daemon=True)
+            thread.start()
+
+    def _run(self):
+        """Bucle de un hilo trabajador"""
+        while not self._stop.is_set():
+            try:
+                processed = self.run_pending()
+            except Exception as e:
+                logging.error(f"Error en la cola de trabajos: {str(e)}")
+                processed = 0
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+
+# Instancia global de la cola
+job_queue = JobQueue()
@@ -0,0 +1,95 @@
+# Página de inicio montada en el servidor con los datos iniciales incrustados
+import gzip
+import json
+import logging
+from collections import namedtuple
+
+from flask import current_app, request
+
+from backend.utils.cache import make_etag, response_cache
+from backend.utils.metrics import metrics
+
+# Tablas de las que depende la página: cualquier cambio la regenera
+LANDING_TAGS = ('project', 'testimonial', 'blog_post')
+
+# Elemento <script type="application/json"> que lee dynamic-content.js
+DATA_ELEMENT_ID = 'initial-data'
+
+# Página montada y su versión comprimida, calculadas una vez por cambio
+LandingPage = namedtuple('LandingPage', ['body', 'gzip_body', 'etag'])
+
+# Dentro de <script> no puede aparecer "</script>" ni "<!--"; U+2028/U+2029
+# rompen los scripts en navegadores antiguos
+_JSON_ESCAPES = str.maketrans({
+    '<': '\\u003c',
+    '>': '\\u003e',
+    '&': '\\u0026',
+    '\u2028': '\\u2028',
+    '\u2029': '\\u2029'
+})
+
+
+def embed_json(data):
+    """Serializar ``data`` para incrustarlo de forma segura dentro de <script>"""
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return text.translate(_JSON_ESCAPES)
+
+
+def assemble_page(template, data):
+    """Insertar los datos en el HTML, antes de </body>"""
+    block = (f'<script id="{DATA_ELEMENT_ID}" type="application/json">'
+             f'{embed_json(data)}</script>\n').encode('utf-8')
+    position = template.rfind(b'</body>')
+    if position == -1:
+        return template + block
+    return template[:position] + block + template[position:]
+
+
+def _read_template(entry):
+    if entry.body is not None:
+        return entry.body
+    with open(entry.path, 'rb') as f:
+        return f.read()
+
+
+def landing_response(template, load_data):
+    """Respuesta de la página de inicio con los datos de ``load_data()``.
+
+    ``template`` es la entrada del índice de estáticos del index.html. La
+    página montada se guarda en la caché de respuestas bajo las etiquetas
+    de sus tablas y el ETag del template, así que solo se vuelve a montar
+    cuando cambian los datos o se despliega otro index.html. Devuelve None
+    si no se pudieron cargar los datos (se sirve el HTML sin datos).
+    """
+    key = response_cache.make_key(('landing', template.etag), LANDING_TAGS)
+    page = response_cache.get(key) if response_cache.enabled else None
+    metrics.inc('cache_requests_total', {
+        'cache': 'landing',
+        'result': 'miss' if page is None else 'hit'
+    })
+
+    status = 'HIT'
+    if page is None:
+        status = 'MISS'
+        try:
+            data = load_data()
+        except Exception as e:
+            logging.error(f"Error al cargar los datos de la página de inicio: {str(e)}")
+            return None
+        body = assemble_page(_read_template(template), data)
+        page = LandingPage(body, gzip.compress(body, 6), make_etag(template.etag, body))
+        # Guardar solo si ninguna tabla cambió mientras se montaba
+        if response_cache.enabled and response_cache.make_key(key[0], LANDING_TAGS) == key:
+            response_cache.set(key, page)
+
+    body, etag = page.body, page.etag
+    if 'gzip' in request.accept_encodings:
+        body, etag = page.gzip_body, page.etag + '-gz'
+    response = current_app.response_class(body, mimetype='text/html')
+    if body is page.gzip_body:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True
+    response.headers['X-Cache'] = status
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(body))
@@ -0,0 +1,351 @@
+# Métricas de la aplicación en formato de texto de Prometheus
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import g, request
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# Límites (segundos) del histograma de latencia por endpoint
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Descripción y tipo de cada métrica exportada
+METRICS = {
+    'http_requests_total': ('counter', 'Peticiones HTTP por endpoint, método y código'),
+    'http_request_duration_seconds': ('histogram', 'Latencia de las peticiones por endpoint'),
+    'db_pool_checkouts_total': ('counter', 'Conexiones obtenidas del pool de SQLAlchemy'),
+    'db_pool_checked_out': ('gauge', 'Conexiones del pool en uso'),
+    'db_pool_overflow': ('gauge', 'Conexiones abiertas por encima de pool_size'),
+    'cache_requests_total': ('counter', 'Consultas a las cachés internas por resultado'),
+}
+
+# Archivo donde se acumulan los contadores de procesos ya terminados
+ARCHIVE_FILE = 'metrics_archive.json'
+LOCK_FILE = 'metrics.lock'
+
+
+def _key(name, labels):
+    """Clave hashable de una serie: nombre y etiquetas ordenadas"""
+    return (name, tuple(sorted(labels.items())))
+
+
+def _format_labels(labels):
+    """Etiquetas en la sintaxis de Prometheus"""
+    if not labels:
+        return ''
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _pid_alive(pid):
+    """Comprobar si un proceso sigue vivo"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Metrics:
+    """Registro de contadores y gauges de un proceso.
+
+    Con ``METRICS_DIR`` configurado, cada proceso (worker de gunicorn) vuelca
+    sus valores a ``metrics_<pid>.json`` como mucho cada
+    ``METRICS_FLUSH_INTERVAL`` segundos, y ``/metrics`` suma los archivos de
+    todos los procesos. Los contadores de procesos terminados se acumulan en
+    un archivo de archivo para que los totales nunca retrocedan; sus gauges
+    se descartan.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.directory = None
+        self.flush_interval = 5
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._last_flush = 0.0
+        self._pools = []
+
+    def init_app(self, app):
+        """Configurar el directorio compartido y registrar los hooks"""
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.directory = app.config.get('METRICS_DIR')
+        self.flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', 5)
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            atexit.register(self.flush)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _check_fork(self):
+        """Tras un fork, los valores heredados pertenecen al proceso padre"""
+        pid = os.getpid()
+        if pid != self._pid:
+            with self._lock:
+                if pid != self._pid:
+                    self._counters.clear()
+                    self._gauges.clear()
+                    self._pid = pid
+                    self._last_flush = 0.0
+
+    def inc(self, name, labels=None, value=1):
+        """Incrementar un contador"""
+        if not self.enabled:
+            return
+        self._check_fork()
+        key = _key(name, labels or {})
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, labels=None):
+        """Fijar el valor de un gauge de este proceso"""
+        if not self.enabled:
+            return
+        self._check_fork()
+        with self._lock:
+            self._gauges[_key(name, labels or {})] = value
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        """Registrar una observación en un histograma"""
+        if not self.enabled:
+            return
+        self._check_fork()
+        labels = labels or {}
+        with self._lock:
+            for bound in buckets:
+                if value <= bound:
+                    key = _key(f'{name}_bucket', dict(labels, le=str(bound)))
+                    self._counters[key] = self._counters.get(key, 0) + 1
+            for suffix, amount in (('_bucket', 1), ('_sum', value), ('_count', 1)):
+                series_labels = dict(labels, le='+Inf') if suffix == '_bucket' else labels
+                key = _key(f'{name}{suffix}', series_labels)
+                self._counters[key] = self._counters.get(key, 0) + amount
+
+    def _start(self):
+        g._metrics_start = time.perf_counter()
+
+    def _finish(self, response):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        self.inc('http_requests_total', {
+            'endpoint': endpoint,
+            'method': request.method,
+            'status': str(response.status_code)
+        })
+        self.observe('http_request_duration_seconds', time.perf_counter() - start,
+                     {'endpoint': endpoint})
+        self._update_pool_gauges()
+
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return response
+
+    def watch_pool(self, engine):
+        """Contar los checkouts del pool del engine y exponer su ocupación"""
+        pool = engine.pool
+        if pool in self._pools:
+            return
+        self._pools.append(pool)
+
+        @event.listens_for(pool, 'checkout')
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.inc('db_pool_checkouts_total')
+
+    def _update_pool_gauges(self):
+        """Leer la ocupación actual de los pools vigilados"""
+        for pool in self._pools:
+            checked_out = getattr(pool, 'checkedout', None)
+            overflow = getattr(pool, 'overflow', None)
+            if checked_out is not None:
+                self.set_gauge('db_pool_checked_out', checked_out())
+            if overflow is not None:
+                # QueuePool empieza en -pool_size: solo interesa el desborde real
+                self.set_gauge('db_pool_overflow', max(0, overflow()))
+
+    def _snapshot(self):
+        self._check_fork()
+        with self._lock:
+            return dict(self._counters), dict(self._gauges)
+
+    def flush(self):
+        """Volcar los valores de este proceso a su archivo del directorio compartido"""
+        if not self.directory:
+            return
+        counters, gauges = self._snapshot()
+        data = {
+            'pid': os.getpid(),
+            'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+            'gauges': [[name, list(labels), value] for (name, labels), value in gauges.items()]
+        }
+        path = os.path.join(self.directory, f'metrics_{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temporary, path)
+            self._last_flush = time.monotonic()
+        except OSError as e:
+            logging.error(f"Error al guardar métricas: {str(e)}")
+
+    def collect(self):
+        """Sumar los valores de todos los procesos: ``(counters, gauges)``"""
+        if not self.directory:
+            return self._snapshot()
+
+        self.flush()
+        counters = {}
+        gauges = {}
+        with self._directory_lock():
+            archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+            archive = self._read(archive_path) or {'counters': []}
+            archive_changed = False
+
+            for filename in os.listdir(self.directory):
+                if not (filename.startswith('metrics_') and filename.endswith('.json')):
+                    continue
+                if filename == ARCHIVE_FILE:
+                    continue
+                path = os.path.join(self.directory, filename)
+                data = self._read(path)
+                if data is None:
+                    continue
+
+                if _pid_alive(data['pid']):
+                    _merge(counters, data['counters'])
+                    _merge(gauges, data['gauges'])
+                else:
+                    # Proceso terminado: conservar sus contadores en el archivo
+                    archived = {}
+                    _merge(archived, archive['counters'])
+                    _merge(archived, data['counters'])
+                    archive['counters'] = [[name, list(labels), value]
+                                           for (name, labels), value in archived.items()]
+                    archive_changed = True
+                    os.remove(path)
+
+            if archive_changed:
+                temporary = f'{archive_path}.tmp'
+                with open(temporary, 'w', encoding='utf-8') as f:
+                    json.dump(archive, f)
+                os.replace(temporary, archive_path)
+            _merge(counters, archive['counters'])
+        return counters, gauges
+
+    def _directory_lock(self):
+        """Bloqueo exclusivo del directorio mientras se compactan los archivos"""
+        return _FileLock(os.path.join(self.directory, LOCK_FILE))
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def render(self):
+        """Texto en el formato de exposición de Prometheus"""
+        counters, gauges = self.collect()
+        series = {}
+        for (name, labels), value in list(counters.items()) + list(gauges.items()):
+            series.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for metric, (metric_type, description) in METRICS.items():
+            names = [metric] if metric_type != 'histogram' else [
+                f'{metric}_bucket', f'{metric}_sum', f'{metric}_count'
+            ]
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} {metric_type}')
+            for name in names:
+                for labels, value in sorted(series.get(name, []), key=_sort_key):
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Vaciar los valores de este proceso"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+def _merge(target, items):
+    """Sumar series ``[nombre, etiquetas, valor]`` en el diccionario destino"""
+    for name, labels, value in items:
+        key = (name, tuple(tuple(pair) for pair in labels))
+        target[key] = target.get(key, 0) + value
+
+
+def _sort_key(item):
+    """Ordenar las series por etiquetas, con los buckets en orden numérico"""
+    labels, _ = item
+    values = []
+    for name, value in labels:
+        if name == 'le':
+            value = float('inf') if value == '+Inf' else float(value)
+            values.append((name, (1, value)))
+        else:
+            values.append((name, (0, value)))
+    return values
+
+
+class _FileLock:
+    """flock sobre un archivo; sin efecto donde fcntl no existe"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def clear_metrics_dir(directory):
+    """Borrar los archivos de métricas (al arrancar el proceso maestro de gunicorn)"""
+    if not directory or not os.path.isdir(directory):
+        return
+    for filename in os.listdir(directory):
+        if filename.startswith('metrics_'):
+            os.remove(os.path.join(directory, filename))
+
+
+# Instancia global
+metrics = Metrics()
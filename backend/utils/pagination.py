@@ -0,0 +1,159 @@
+# Paginación por cursor (keyset) para listados grandes
+import base64
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, request
+
+from backend.database import db
+from backend.utils.metrics import metrics
+
+MAX_LIMIT = 100
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def encode_cursor(fecha, item_id):
+    """Codificar la posición (fecha, id) como un cursor opaco (fecha vacía si es NULL)"""
+    raw = f"{fecha.isoformat() if fecha else ''},{item_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decodificar un cursor opaco; lanza ValueError si no es válido"""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        fecha, item_id = raw.rsplit(',', 1)
+        return (datetime.fromisoformat(fecha) if fecha else None), int(item_id)
+    except (UnicodeError, ValueError) as e:
+        raise ValueError('Cursor inválido') from e
+
+
+def wants_cursor():
+    """El modo cursor se activa enviando el parámetro ``after`` (vacío en la primera página)"""
+    return 'after' in request.args
+
+
+class KeysetPage:
+    """Página de resultados obtenida por búsqueda de cursor"""
+
+    # Compatibilidad con las plantillas que usan la paginación por offset
+    pages = 0
+    has_prev = False
+
+    def __init__(self, items, limit, next_cursor, total=None):
+        self.items = items
+        self.limit = limit
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+        self.total = total
+
+    def to_dict(self):
+        """Metadatos de paginación para las respuestas JSON"""
+        data = {
+            'mode': 'cursor',
+            'limit': self.limit,
+            'has_next': self.has_next,
+            'next_cursor': self.next_cursor
+        }
+        if self.total is not None:
+            data['total'] = self.total
+        return data
+
+
+def cached_count(query):
+    """Conteo total de una consulta, reutilizado durante KEYSET_COUNT_CACHE_TTL segundos"""
+    ttl = current_app.config.get('KEYSET_COUNT_CACHE_TTL', 30)
+    compiled = query.order_by(None).statement.compile()
+    key = (str(compiled), tuple(sorted((k, str(v)) for k, v in compiled.params.items())))
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached is not None and cached[1] > now:
+            metrics.inc('cache_requests_total', {'cache': 'count', 'result': 'hit'})
+            return cached[0]
+
+    metrics.inc('cache_requests_total', {'cache': 'count', 'result': 'miss'})
+    total = query.order_by(None).count()
+    with _count_lock:
+        # Descartar conteos expirados para que el diccionario no crezca sin límite
+        for stale in [k for k, (_, expires_at) in _count_cache.items() if expires_at <= now]:
+            del _count_cache[stale]
+        _count_cache[key] = (total, now + ttl)
+    return total
+
+
+def invalidate_counts():
+    """Descartar los conteos cacheados (tras altas o bajas masivas)"""
+    with _count_lock:
+        _count_cache.clear()
+
+
+def keyset_paginate(query, date_column, id_column, after=None, limit=20, with_total=False):
+    """Paginar ``query`` buscando sobre ``(fecha DESC, id DESC)``.
+
+    A diferencia de ``paginate()`` no hay ``OFFSET`` ni ``COUNT(*)`` por página:
+    cada página continúa desde el cursor de la anterior usando el índice. Las
+    filas sin fecha van al final (SQLite ordena NULL último en DESC).
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    total = cached_count(query) if with_total else None
+
+    query = query.order_by(None).order_by(date_column.desc(), id_column.desc())
+    if after:
+        fecha, item_id = decode_cursor(after)
+        if fecha is None:
+            query = query.filter(date_column.is_(None), id_column < item_id)
+        else:
+            # La comparación de tuplas con NULL no es cierta: se añaden aparte
+            query = query.filter(db.or_(
+                db.tuple_(date_column, id_column) < db.tuple_(fecha, item_id),
+                date_column.is_(None)
+            ))
+
+    items = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, date_column.key), getattr(last, id_column.key))
+
+    return KeysetPage(items, limit, next_cursor, total)
+
+
+def paginate_query(query, date_column, id_column, per_page, with_total=None):
+    """Paginar según la petición: por cursor si se envía ``after``, por página si no.
+
+    En modo cursor se aceptan ``after`` y ``limit``; el total solo se calcula
+    (y se cachea) si se pide con ``total=true`` o si ``with_total`` lo fuerza.
+    """
+    if wants_cursor():
+        if with_total is None:
+            with_total = request.args.get('total', '').lower() in ('1', 'true', 'yes')
+        return keyset_paginate(
+            query, date_column, id_column,
+            after=request.args.get('after') or None,
+            limit=request.args.get('limit', per_page, type=int),
+            with_total=with_total
+        )
+
+    return query.order_by(date_column.desc()).paginate(
+        page=request.args.get('page', 1, type=int), per_page=per_page, error_out=False
+    )
+
+
+def pagination_metadata(page):
+    """Metadatos de paginación para las respuestas JSON de ambos modos"""
+    if isinstance(page, KeysetPage):
+        return page.to_dict()
+    return {
+        'page': page.page,
+        'pages': page.pages,
+        'per_page': page.per_page,
+        'total': page.total,
+        'has_next': page.has_next,
+        'has_prev': page.has_prev
+    }
@@ -0,0 +1,167 @@
+# Perfilado por petición: tiempo total, consultas SQL y peticiones lentas
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import g, request
+from flask_login import current_user
+from flask_sqlalchemy.record_queries import get_recorded_queries
+
+# Límites superiores (ms) de los buckets del histograma (acumulado, como "le")
+BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf')]
+
+# Una misma sentencia repetida este número de veces sugiere un patrón N+1
+REPEATED_STATEMENT_THRESHOLD = 5
+
+
+def _percentile(values, fraction):
+    """Percentil de una lista ya ordenada"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+class RequestProfiler:
+    """Mide cada petición y guarda una ventana móvil de muestras por endpoint.
+
+    Los tiempos SQL salen de ``get_recorded_queries()`` de Flask-SQLAlchemy,
+    que solo registra consultas con ``SQLALCHEMY_RECORD_QUERIES = True``.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.window = 500
+        self.slow_threshold_ms = 500
+        self.slowest_statements = 3
+        self.server_timing = True
+        self._samples = {}
+        self._lock = threading.Lock()
+        self.slow_log = logging.getLogger('noelweb.slow_requests')
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Registrar los hooks de medición en la aplicación"""
+        self.enabled = app.config.get('PROFILING_ENABLED', True)
+        self.window = app.config.get('PROFILING_WINDOW', 500)
+        self.slow_threshold_ms = app.config.get('SLOW_REQUEST_THRESHOLD_MS', 500)
+        self.slowest_statements = app.config.get('SLOW_REQUEST_STATEMENTS', 3)
+        self.server_timing = app.config.get('SERVER_TIMING_HEADER', True)
+
+        log_path = app.config.get('SLOW_REQUEST_LOG')
+        if log_path and not self.slow_log.handlers:
+            handler = RotatingFileHandler(log_path, maxBytes=5 * 1024 * 1024, backupCount=3,
+                                          encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.slow_log.addHandler(handler)
+            self.slow_log.setLevel(logging.INFO)
+            self.slow_log.propagate = False
+
+        if self.enabled:
+            app.before_request(self._start)
+            app.after_request(self._finish)
+
+    def _start(self):
+        g._profiling_start = time.perf_counter()
+
+    def _finish(self, response):
+        start = g.pop('_profiling_start', None)
+        if start is None:
+            return response
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        queries = get_recorded_queries()
+        db_ms = sum(query.duration for query in queries) * 1000
+        endpoint = request.endpoint or 'unknown'
+
+        self.record(endpoint, duration_ms, len(queries), db_ms)
+
+        if self._show_server_timing():
+            response.headers.add(
+                'Server-Timing',
+                f'app;dur={duration_ms:.1f}, db;dur={db_ms:.1f};desc="{len(queries)} queries"'
+            )
+
+        if duration_ms >= self.slow_threshold_ms:
+            self._log_slow_request(endpoint, response.status_code, duration_ms, db_ms, queries)
+        return response
+
+    def _show_server_timing(self):
+        """Con SERVER_TIMING_HEADER = 'admin' la cabecera solo va a los administradores"""
+        if self.server_timing == 'admin':
+            return current_user.is_authenticated and current_user.is_admin
+        return bool(self.server_timing)
+
+    def record(self, endpoint, duration_ms, query_count, db_ms):
+        """Añadir una muestra a la ventana del endpoint"""
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append((duration_ms, query_count, db_ms))
+
+    def snapshot(self):
+        """Percentiles e histograma de cada endpoint sobre la ventana actual"""
+        with self._lock:
+            samples = {endpoint: list(values) for endpoint, values in self._samples.items()}
+
+        endpoints = {}
+        for endpoint, values in samples.items():
+            durations = sorted(sample[0] for sample in values)
+            histogram = {}
+            for bound in BUCKETS:
+                label = 'inf' if bound == float('inf') else str(bound)
+                histogram[label] = sum(1 for duration in durations if duration <= bound)
+
+            endpoints[endpoint] = {
+                'count': len(values),
+                'p50_ms': round(_percentile(durations, 0.50), 2),
+                'p95_ms': round(_percentile(durations, 0.95), 2),
+                'p99_ms': round(_percentile(durations, 0.99), 2),
+                'max_ms': round(durations[-1], 2),
+                'avg_queries': round(sum(sample[1] for sample in values) / len(values), 2),
+                'max_queries': max(sample[1] for sample in values),
+                'avg_db_ms': round(sum(sample[2] for sample in values) / len(values), 2),
+                'histogram': histogram
+            }
+        return endpoints
+
+    def reset(self):
+        """Vaciar todas las ventanas"""
+        with self._lock:
+            self._samples.clear()
+
+    def _log_slow_request(self, endpoint, status, duration_ms, db_ms, queries):
+        """Escribir una línea JSON con el detalle de la petición lenta"""
+        slowest = sorted(queries, key=lambda query: query.duration, reverse=True)
+        repeated = Counter(query.statement for query in queries)
+        entry = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': endpoint,
+            'status': status,
+            'duration_ms': round(duration_ms, 2),
+            'db_ms': round(db_ms, 2),
+            'query_count': len(queries),
+            'slowest_statements': [{
+                'statement': query.statement,
+                'duration_ms': round(query.duration * 1000, 2),
+                'location': query.location
+            } for query in slowest[:self.slowest_statements]],
+            'repeated_statements': [{
+                'statement': statement,
+                'count': count
+            } for statement, count in repeated.most_common()
+                if count >= REPEATED_STATEMENT_THRESHOLD]
+        }
+        self.slow_log.info(json.dumps(entry, ensure_ascii=False, default=str))
+
+
+# Instancia global
+request_profiler = RequestProfiler()
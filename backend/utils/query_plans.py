@@ -0,0 +1,73 @@
+# Verificación de planes de consulta (EXPLAIN QUERY PLAN) de las rutas
+import re
+
+from sqlalchemy import event
+
+from backend.database import db
+
+# Rutas cuyos listados y filtros deben resolverse con índices
+ROUTES = [
+    '/api/projects',
+    '/api/testimonials',
+    '/api/blog',
+    '/api/bootstrap',
+    '/api/blog/ejemplo',
+    '/api/admin/messages',
+    '/api/admin/messages?read=unread',
+    '/api/admin/messages?read=read&service=POS',
+    '/api/admin/messages?service=POS',
+    '/api/admin/messages?after=&limit=20',
+    '/api/admin/projects',
+    '/api/admin/projects?active=active',
+    '/api/admin/projects?category=POS',
+    '/api/admin/testimonials',
+    '/api/admin/testimonials?active=active',
+    '/api/admin/blog',
+    '/api/admin/blog?published=published',
+    '/api/admin/blog?category=General',
+]
+
+# Un paso "SCAN tabla" sin índice es un recorrido completo de la tabla
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?!CONSTANT ROW|SUBQUERY)(?!.*USING .*(INDEX|PRIMARY KEY))')
+
+
+def explain(connection, statement, parameters):
+    """Obtener los pasos del plan de consulta de una sentencia"""
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan):
+    """Pasos del plan que recorren una tabla completa"""
+    return [step for step in plan if FULL_SCAN.match(step)]
+
+
+def check_query_plans(app, client, routes=ROUTES):
+    """Ejecutar las rutas y comprobar el plan de cada SELECT que emiten.
+
+    Devuelve una lista de ``(ruta, sentencia, plan)`` con los recorridos
+    completos encontrados; una lista vacía significa que todo usa índices.
+    """
+    problems = []
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+        for route in routes:
+            statements.clear()
+            event.listen(engine, 'before_cursor_execute', capture)
+            try:
+                client.get(route)
+            finally:
+                event.remove(engine, 'before_cursor_execute', capture)
+
+            with engine.connect() as connection:
+                for statement, parameters in list(statements):
+                    plan = explain(connection, statement, parameters)
+                    if full_scans(plan):
+                        problems.append((route, statement, plan))
+    return problems
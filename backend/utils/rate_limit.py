@@ -0,0 +1,223 @@
+# Limitación de peticiones con token buckets (por IP y por usuario)
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+
+def _refill(tokens, updated_at, now, limit, period):
+    """Tokens disponibles tras recargar el bucket desde su última actualización"""
+    if tokens is None:
+        return float(limit)
+    return min(float(limit), tokens + (now - updated_at) * limit / period)
+
+
+def _consume(tokens, limit, period, cost):
+    """Aplicar el consumo: ``(permitido, tokens restantes, segundos de espera)``"""
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) * period / limit
+
+
+class MemoryBackend:
+    """Buckets en un diccionario del proceso, con expulsión LRU al llenarse"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (None, now))
+            tokens = _refill(tokens, updated_at, now, limit, period)
+            allowed, tokens, retry_after = _consume(tokens, limit, period, cost)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def peek(self, key, limit, period):
+        """Como ``hit`` pero sin consumir: ¿queda al menos un token?"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (None, now))
+        tokens = _refill(tokens, updated_at, now, limit, period)
+        allowed, _, retry_after = _consume(tokens, limit, period, 1)
+        return allowed, retry_after
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBackend:
+    """Buckets compartidos entre procesos en un archivo SQLite.
+
+    Cada consulta lee y actualiza una sola fila por clave primaria dentro de
+    ``BEGIN IMMEDIATE``, así que los workers de gunicorn ven el mismo estado.
+    """
+
+    # Cada cuántas consultas se borran los buckets que ya estarían llenos
+    CLEANUP_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+        self._max_period = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit ('
+            'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+
+    def _connection(self):
+        """Conexión SQLite propia de cada hilo (y de cada proceso)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def hit(self, key, limit, period, cost=1):
+        connection = self._connection()
+        now = time.time()
+        self._max_period = max(self._max_period, period)
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated_at FROM rate_limit WHERE key = ?', (key,)
+            ).fetchone()
+            tokens = _refill(row[0] if row else None, row[1] if row else now, now, limit, period)
+            allowed, tokens, retry_after = _consume(tokens, limit, period, cost)
+            connection.execute(
+                'INSERT INTO rate_limit (key, tokens, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, '
+                'updated_at = excluded.updated_at',
+                (key, tokens, now)
+            )
+            self._hits += 1
+            if self._hits % self.CLEANUP_EVERY == 0:
+                connection.execute('DELETE FROM rate_limit WHERE updated_at < ?',
+                                   (now - self._max_period,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+    def peek(self, key, limit, period):
+        now = time.time()
+        row = self._connection().execute(
+            'SELECT tokens, updated_at FROM rate_limit WHERE key = ?', (key,)
+        ).fetchone()
+        tokens = _refill(row[0] if row else None, row[1] if row else now, now, limit, period)
+        allowed, _, retry_after = _consume(tokens, limit, period, 1)
+        return allowed, retry_after
+
+    def reset(self):
+        self._connection().execute('DELETE FROM rate_limit')
+
+
+class RateLimiter:
+    """Token buckets con límites ``(peticiones, segundos)`` configurables.
+
+    Un bucket admite ráfagas de hasta ``peticiones`` y se recarga a razón de
+    ``peticiones / segundos``. Cada comprobación es O(1) en ambos backends.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.backend = MemoryBackend()
+
+    def init_app(self, app):
+        """Elegir el backend según RATELIMIT_BACKEND"""
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        if app.config.get('RATELIMIT_BACKEND', 'memory') == 'sqlite':
+            self.backend = SQLiteBackend(app.config['RATELIMIT_STORAGE_PATH'])
+        else:
+            self.backend = MemoryBackend(app.config.get('RATELIMIT_MEMORY_MAX_KEYS', 10000))
+        app.extensions['rate_limiter'] = self
+
+    def hit(self, scope, key, limit):
+        """Consumir un token del bucket ``scope:key``; devuelve ``(permitido, espera)``"""
+        requests_allowed, period = limit
+        return self.backend.hit(f'{scope}:{key}', requests_allowed, period)
+
+    def peek(self, scope, key, limit):
+        """Comprobar el bucket ``scope:key`` sin consumir; devuelve ``(permitido, espera)``"""
+        requests_allowed, period = limit
+        return self.backend.peek(f'{scope}:{key}', requests_allowed, period)
+
+    def limit(self, scope, keys, methods=('POST',), on_limited=None):
+        """Decorador que rechaza con 429 antes de ejecutar la vista.
+
+        ``keys`` es una lista de ``(nombre, función)``: cada función devuelve
+        la clave del bucket (p. ej. la IP) o None para no limitar por ella, y
+        el límite se lee de ``RATELIMIT_<SCOPE>_<NOMBRE>``. ``on_limited``
+        construye la respuesta a partir de los segundos de espera.
+        """
+        on_limited = on_limited or too_many_requests
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.enabled and request.method in methods:
+                    for name, key_func in keys:
+                        key = key_func()
+                        if not key:
+                            continue
+                        config_key = f'RATELIMIT_{scope.upper()}_{name.upper()}'
+                        limit = current_app.config.get(config_key)
+                        if not limit:
+                            continue
+                        allowed, retry_after = self.hit(f'{scope}:{name}', key, limit)
+                        if not allowed:
+                            return on_limited(retry_after)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+def retry_after_seconds(retry_after):
+    """Segundos enteros para la cabecera Retry-After (al menos 1)"""
+    return max(1, math.ceil(retry_after))
+
+
+def too_many_requests(retry_after):
+    """Respuesta 429 con la cabecera Retry-After en segundos"""
+    seconds = retry_after_seconds(retry_after)
+    response = jsonify({
+        'success': False,
+        'message': 'Demasiadas solicitudes. Inténtalo de nuevo más tarde.',
+        'retry_after': seconds
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+
+def client_ip():
+    """IP del cliente (la misma que se guarda en ip_address).
+
+    Detrás de un proxy, ``remote_addr`` ya viene corregida por ProxyFix según
+    ``PROXY_FIX_X_FOR``; sin él todos los clientes compartirían la IP del
+    balanceador.
+    """
+    return request.remote_addr
+
+
+# Instancia global del limitador
+rate_limiter = RateLimiter()
@@ -0,0 +1,242 @@
+# Búsqueda de texto completo con SQLite FTS5
+import logging
+import re
+import weakref
+
+from markupsafe import escape
+
+from backend.database import db
+
+# Tablas FTS5 de contenido externo: el texto vive en la tabla original y el
+# índice se mantiene sincronizado mediante triggers
+FTS_TABLES = {
+    'blog_post_fts': {
+        'source': 'blog_post',
+        'columns': ['titulo', 'resumen', 'contenido', 'tags'],
+        'weights': [10.0, 5.0, 1.0, 3.0]
+    },
+    'contact_message_fts': {
+        'source': 'contact_message',
+        'columns': ['nombre', 'email', 'mensaje'],
+        'weights': [5.0, 5.0, 1.0]
+    }
+}
+
+# Marcadores temporales del snippet; se sustituyen por <mark> tras escapar el HTML
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_fts5_available = {}
+# Tablas FTS presentes en cada engine; una base creada con db.create_all()
+# o anterior a la búsqueda no las tiene hasta ejecutar upgrade_schema()
+_fts_tables = weakref.WeakKeyDictionary()
+
+
+def fts5_available(connection):
+    """Comprobar si el SQLite enlazado incluye el módulo FTS5"""
+    url = str(connection.engine.url)
+    if url not in _fts5_available:
+        if connection.dialect.name != 'sqlite':
+            _fts5_available[url] = False
+        else:
+            options = connection.exec_driver_sql('PRAGMA compile_options').fetchall()
+            _fts5_available[url] = any(row[0] == 'ENABLE_FTS5' for row in options)
+    return _fts5_available[url]
+
+
+def search_index_ready(connection, fts_table):
+    """Comprobar (una vez por engine) que la tabla FTS5 existe"""
+    if not fts5_available(connection):
+        return False
+    engine = connection.engine
+    if engine not in _fts_tables:
+        rows = connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        ).fetchall()
+        _fts_tables[engine] = {row[0] for row in rows} & set(FTS_TABLES)
+    return fts_table in _fts_tables[engine]
+
+
+def _update_trigger_sql(fts_table, spec):
+    """Trigger de actualización limitado a las columnas indexadas, para que
+    cambios como ``leido`` o ``vistas`` no reindexen la fila"""
+    columns = ', '.join(spec['columns'])
+    new_values = ', '.join(f'new.{column}' for column in spec['columns'])
+    old_values = ', '.join(f'old.{column}' for column in spec['columns'])
+    return (
+        f"CREATE TRIGGER {fts_table}_au AFTER UPDATE OF {columns} ON {spec['source']} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts_table}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+    )
+
+
+def ensure_search_index(connection):
+    """Crear las tablas FTS5 y sus triggers si no existen, reconstruyendo el índice"""
+    if not fts5_available(connection):
+        logging.warning("SQLite sin FTS5: la búsqueda usará LIKE")
+        return []
+
+    created = []
+    for fts_table, spec in FTS_TABLES.items():
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)
+        ).first()
+        if exists:
+            # Sustituir el trigger de actualización de versiones anteriores
+            trigger = connection.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                (f'{fts_table}_au',)
+            ).scalar()
+            if trigger != _update_trigger_sql(fts_table, spec):
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts_table}_au")
+                connection.exec_driver_sql(_update_trigger_sql(fts_table, spec))
+            continue
+
+        source = spec['source']
+        columns = ', '.join(spec['columns'])
+        new_values = ', '.join(f'new.{column}' for column in spec['columns'])
+        old_values = ', '.join(f'old.{column}' for column in spec['columns'])
+
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+            f"{columns}, content='{source}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {fts_table}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        )
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {source} BEGIN "
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values}); END"
+        )
+        connection.exec_driver_sql(_update_trigger_sql(fts_table, spec))
+        # Indexar las filas que ya existían
+        connection.exec_driver_sql(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+        created.append(fts_table)
+    _fts_tables.pop(connection.engine, None)
+    return created
+
+
+def build_match_query(text):
+    """Convertir el texto del usuario en una consulta MATCH segura (prefijos con AND)"""
+    terms = re.findall(r'\w+', text or '', re.UNICODE)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms[:10])
+
+
+def _render_snippet(snippet):
+    """Escapar el snippet y resaltar las coincidencias con <mark>"""
+    html = str(escape(snippet or ''))
+    return html.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def _search(fts_table, select_columns, where, match, limit, types):
+    """Ejecutar una búsqueda ordenada por bm25 con snippet del mejor fragmento"""
+    weights = ', '.join(str(weight) for weight in FTS_TABLES[fts_table]['weights'])
+    source = FTS_TABLES[fts_table]['source']
+    statement = db.text(
+        f"SELECT {select_columns}, "
+        f"snippet({fts_table}, -1, :mark_start, :mark_end, '…', 16) AS snippet, "
+        f"bm25({fts_table}, {weights}) AS score "
+        f"FROM {fts_table} JOIN {source} s ON s.id = {fts_table}.rowid "
+        f"WHERE {fts_table} MATCH :match {where} "
+        f"ORDER BY score LIMIT :limit"
+    ).columns(**types)
+    rows = db.session.execute(statement, {
+        'match': match,
+        'limit': limit,
+        'mark_start': _MARK_START,
+        'mark_end': _MARK_END
+    }).mappings().all()
+
+    results = []
+    for row in rows:
+        result = dict(row)
+        result['snippet'] = _render_snippet(result['snippet'])
+        result['score'] = round(-result['score'], 6)
+        results.append(result)
+    return results
+
+
+def search_blog_posts(text, limit=10):
+    """Buscar artículos publicados del blog"""
+    match = build_match_query(text)
+    if match is None:
+        return []
+
+    if not search_index_ready(db.session.connection(), 'blog_post_fts'):
+        from backend.models import BlogPost
+        pattern = f'%{text}%'
+        posts = BlogPost.query.filter(
+            BlogPost.publicado == db.true(),
+            db.or_(BlogPost.titulo.ilike(pattern), BlogPost.resumen.ilike(pattern),
+                   BlogPost.contenido.ilike(pattern), BlogPost.tags.ilike(pattern))
+        ).limit(limit).all()
+        return [{
+            'id': post.id, 'titulo': post.titulo, 'slug': post.slug,
+            'resumen': post.resumen, 'imagen_url': post.imagen_url,
+            'categoria': post.categoria, 'fecha_publicacion': post.fecha_publicacion,
+            'snippet': str(escape(post.resumen or '')), 'score': None
+        } for post in posts]
+
+    return _search(
+        'blog_post_fts',
+        's.id, s.titulo, s.slug, s.resumen, s.imagen_url, s.categoria, s.fecha_publicacion',
+        'AND s.publicado = 1',
+        match,
+        limit,
+        {'fecha_publicacion': db.DateTime}
+    )
+
+
+def search_messages(text, limit=20):
+    """Buscar mensajes de contacto (solo administradores)"""
+    match = build_match_query(text)
+    if match is None:
+        return []
+
+    if not search_index_ready(db.session.connection(), 'contact_message_fts'):
+        from backend.models import ContactMessage
+        messages = filter_messages(ContactMessage.query, text).order_by(
+            ContactMessage.fecha.desc()
+        ).limit(limit).all()
+        return [{
+            'id': message.id, 'nombre': message.nombre, 'email': message.email,
+            'servicio': message.servicio, 'fecha': message.fecha, 'leido': message.leido,
+            'snippet': str(escape((message.mensaje or '')[:200])), 'score': None
+        } for message in messages]
+
+    return _search(
+        'contact_message_fts',
+        's.id, s.nombre, s.email, s.servicio, s.fecha, s.leido',
+        '',
+        match,
+        limit,
+        {'fecha': db.DateTime, 'leido': db.Boolean}
+    )
+
+
+def filter_messages(query, text):
+    """Filtrar una consulta de ContactMessage por texto usando el índice FTS5"""
+    from backend.models import ContactMessage
+
+    match = build_match_query(text)
+    if match is None:
+        return query
+
+    if not search_index_ready(db.session.connection(), 'contact_message_fts'):
+        pattern = f'%{text}%'
+        return query.filter(db.or_(
+            ContactMessage.nombre.ilike(pattern),
+            ContactMessage.email.ilike(pattern),
+            ContactMessage.mensaje.ilike(pattern)
+        ))
+
+    matching_ids = db.select(db.literal_column('rowid')).select_from(
+        db.table('contact_message_fts')
+    ).where(db.text('contact_message_fts MATCH :fts_match').bindparams(fts_match=match))
+    return query.filter(ContactMessage.id.in_(matching_ids))
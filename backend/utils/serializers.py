@@ -0,0 +1,95 @@
+# Serialización de modelos a JSON con conjuntos de campos y proyección de columnas
+from datetime import date
+
+from sqlalchemy.orm import load_only
+
+from backend.models import BlogPost, ContactMessage, Project, Testimonial
+
+
+def split_tags(post):
+    """Etiquetas separadas por comas como lista"""
+    return post.tags.split(',') if post.tags else []
+
+
+class Serializer:
+    """Convierte objetos de un modelo en dicts con solo los campos pedidos.
+
+    ``fields`` son atributos del modelo (las fechas se devuelven en ISO 8601)
+    y ``computed`` campos calculados: nombre -> (función, columnas que usa).
+    ``query`` añade ``load_only`` con las columnas de los campos elegidos, así
+    que los ``Text`` que no se piden no se leen de la base de datos.
+    """
+
+    def __init__(self, model, fields, computed=None):
+        self.model = model
+        self.computed = computed or {}
+        self.fields = tuple(fields) + tuple(name for name in self.computed if name not in fields)
+
+    def parse(self, value, default, allowed=None):
+        """Campos pedidos en ``value`` ("a,b,c"); lanza ValueError si alguno no se admite.
+
+        Sin ``value`` se devuelven los ``default`` del endpoint; ``allowed``
+        limita los que se pueden pedir (por defecto, todos los del modelo).
+        """
+        if not value:
+            return tuple(default)
+        allowed = self.fields if allowed is None else allowed
+        names = []
+        for name in value.split(','):
+            name = name.strip()
+            if not name or name in names:
+                continue
+            if name not in allowed:
+                raise ValueError(f'Campo no válido: {name}')
+            names.append(name)
+        return tuple(names)
+
+    def columns(self, names, *extra):
+        """Atributos del modelo que hay que cargar para ``names`` y ``extra``"""
+        keys = []
+        for name in tuple(names) + extra:
+            for key in self.computed[name][1] if name in self.computed else (name,):
+                if key not in keys:
+                    keys.append(key)
+        return [getattr(self.model, key) for key in keys]
+
+    def query(self, query, names, *extra):
+        """Limitar ``query`` a las columnas necesarias (``extra``: p. ej. las del cursor)"""
+        return query.options(load_only(*self.columns(names, *extra)))
+
+    def dump(self, obj, names):
+        """Dict con los campos ``names`` del objeto"""
+        data = {}
+        for name in names:
+            if name in self.computed:
+                data[name] = self.computed[name][0](obj)
+                continue
+            value = getattr(obj, name)
+            data[name] = value.isoformat() if isinstance(value, date) else value
+        return data
+
+    def dump_many(self, objs, names):
+        return [self.dump(obj, names) for obj in objs]
+
+
+PROJECT = Serializer(Project, (
+    'id', 'titulo', 'descripcion_problema', 'descripcion_solucion', 'resultados', 'imagen_url',
+    'categoria', 'cliente', 'tecnologias', 'duracion', 'activo', 'orden', 'fecha_creacion',
+    'fecha_actualizacion'
+))
+
+TESTIMONIAL = Serializer(Testimonial, (
+    'id', 'nombre_cliente', 'empresa', 'cargo', 'testimonio', 'imagen_url', 'calificacion',
+    'proyecto_relacionado', 'activo', 'orden', 'fecha_creacion'
+))
+
+BLOG_POST = Serializer(BlogPost, (
+    'id', 'titulo', 'slug', 'resumen', 'contenido', 'imagen_url', 'categoria', 'tags',
+    'publicado', 'fecha_creacion', 'fecha_publicacion', 'fecha_actualizacion', 'autor',
+    'tiempo_lectura', 'vistas'
+), computed={'tags': (split_tags, ('tags',))})
+
+CONTACT_MESSAGE = Serializer(ContactMessage, (
+    'id', 'nombre', 'email', 'telefono', 'servicio', 'mensaje', 'fecha', 'leido', 'ip_address',
+    'respuesta', 'fecha_respuesta'
+))
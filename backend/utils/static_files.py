@@ -0,0 +1,236 @@
+# Motor de archivos estáticos: índice en memoria, caché de archivos pequeños y sendfile
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import current_app, request
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.wsgi import wrap_file
+
+from backend.utils.metrics import metrics
+
+# Tipos que se cargan en memoria al construir el índice (HTML, CSS, JS...)
+PRELOAD_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg', '.txt', '.xml', '.webmanifest')
+PRELOAD_SUFFIXES = PRELOAD_EXTENSIONS + tuple(
+    extension + suffix for extension in PRELOAD_EXTENSIONS for suffix in ('.br', '.gz')
+)
+
+
+class StaticFile:
+    """Datos de un archivo del índice; ``body`` guarda su contenido si está en memoria
+    e ``image`` los datos de negociación de las imágenes (``images.ImageInfo``)"""
+
+    __slots__ = ('path', 'size', 'mtime_ns', 'etag', 'mimetype', 'last_modified', 'body',
+                 'image')
+
+    def __init__(self, path, stat, etag):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.etag = etag
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+        self.body = None
+        self.image = None
+
+
+def has_extension(path, extensions):
+    """La extensión de ``path`` (sin punto, en minúsculas) está en ``extensions``"""
+    return os.path.splitext(path)[1].lower().lstrip('.') in extensions
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()[:20]
+
+
+class StaticFiles:
+    """Índice de los archivos servidos (ruta -> tamaño, mtime, hash y tipo MIME).
+
+    El índice de los directorios raíz se construye en la primera petición y
+    cada entrada se vuelve a comprobar con ``os.stat`` como mucho cada
+    ``check_interval`` segundos, así que entre comprobaciones no se toca el
+    disco. Los archivos de hasta ``memory_max_file`` bytes se sirven desde
+    memoria (LRU limitada a ``memory_max_bytes``); los grandes con
+    ``wsgi.file_wrapper``, que gunicorn convierte en ``sendfile``.
+    """
+
+    def __init__(self):
+        self.roots = []
+        self.check_interval = 2.0
+        self.memory_max_file = 256 * 1024
+        self.memory_max_bytes = 32 * 1024 * 1024
+        self._entries = {}  # ruta -> (última comprobación, StaticFile o None si no existe)
+        self._memory = OrderedDict()  # ruta -> tamaño de los archivos en memoria
+        self._memory_bytes = 0
+        self._indexed = False
+        self._index_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, roots):
+        """Leer la configuración; el índice se construye en la primera petición.
+
+        ``roots`` es una lista de ``(directorio, extensiones)``; con
+        extensiones (sin punto) solo se indexan esos archivos del directorio.
+        """
+        self.roots = [(os.path.abspath(root), extensions) for root, extensions in roots]
+        self.check_interval = app.config.get('STATIC_CHECK_INTERVAL', self.check_interval)
+        self.memory_max_file = app.config.get('STATIC_MEMORY_MAX_FILE', self.memory_max_file)
+        self.memory_max_bytes = app.config.get('STATIC_MEMORY_MAX_BYTES', self.memory_max_bytes)
+        self._entries.clear()
+        self._memory.clear()
+        self._memory_bytes = 0
+        self._indexed = False
+        app.extensions['static_files'] = self
+
+    def _build_index(self):
+        """Indexar los directorios raíz y cargar en memoria los archivos de texto"""
+        with self._index_lock:
+            if self._indexed:
+                return
+            now = time.monotonic()
+            for root, extensions in self.roots:
+                for directory, _, files in os.walk(root):
+                    for name in files:
+                        if extensions and not has_extension(name, extensions):
+                            continue
+                        path = os.path.join(directory, name)
+                        entry = self._load(path)
+                        self._entries[path] = (now, entry)
+                        if entry and name.endswith(PRELOAD_SUFFIXES):
+                            self._cache_body(entry)
+            self._indexed = True
+
+    def _load(self, path, previous=None):
+        """Entrada del archivo, reutilizando la anterior si no cambió"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        if previous and previous.mtime_ns == stat.st_mtime_ns and previous.size == stat.st_size:
+            return previous
+        return StaticFile(path, stat, _file_hash(path))
+
+    def lookup(self, path, cache_missing=False):
+        """Entrada vigente de ``path`` o None si no existe.
+
+        Que un archivo no exista solo se recuerda con ``cache_missing`` (las
+        variantes .br/.gz de archivos conocidos), para que las rutas inventadas
+        no hagan crecer el índice.
+        """
+        if path is None:
+            return None
+        if not self._indexed:
+            self._build_index()
+
+        path = os.path.normpath(path)
+        now = time.monotonic()
+        checked_at, entry = self._entries.get(path, (None, None))
+        if checked_at is not None and now - checked_at < self.check_interval:
+            return entry
+
+        fresh = self._load(path, entry)
+        if fresh is not entry and entry is not None:
+            self._drop_body(entry)
+        if fresh is None and not cache_missing:
+            self._entries.pop(path, None)
+        else:
+            self._entries[path] = (now, fresh)
+        return fresh
+
+    def _cache_body(self, entry):
+        """Guardar el contenido en memoria si cabe, expulsando los menos usados"""
+        if entry.size > self.memory_max_file:
+            return False
+        with open(entry.path, 'rb') as f:
+            body = f.read()
+        if len(body) != entry.size:
+            return False
+        with self._lock:
+            if entry.body is None:
+                while self._memory and self._memory_bytes + entry.size > self.memory_max_bytes:
+                    self._evict_oldest()
+                if self._memory_bytes + entry.size > self.memory_max_bytes:
+                    return False
+                entry.body = body
+                self._memory[entry.path] = entry.size
+                self._memory_bytes += entry.size
+        return True
+
+    def _evict_oldest(self):
+        path, size = self._memory.popitem(last=False)
+        self._memory_bytes -= size
+        entry = self._entries.get(path, (None, None))[1]
+        if entry is not None:
+            entry.body = None
+
+    def _drop_body(self, entry):
+        with self._lock:
+            size = self._memory.pop(entry.path, None)
+            if size is not None:
+                self._memory_bytes -= size
+            entry.body = None
+
+    def send(self, entry, mimetype=None, max_age=None, immutable=False, content_encoding=None):
+        """Respuesta del archivo con ETag, Last-Modified, Range y caché HTTP"""
+        body = entry.body
+        if body is None and entry.size <= self.memory_max_file and self._cache_body(entry):
+            body = entry.body
+        if body is not None:
+            with self._lock:
+                if entry.path in self._memory:
+                    self._memory.move_to_end(entry.path)
+            metrics.inc('cache_requests_total', {'cache': 'static', 'result': 'hit'})
+            response = current_app.response_class(body, mimetype=mimetype or entry.mimetype)
+        else:
+            metrics.inc('cache_requests_total', {'cache': 'static', 'result': 'miss'})
+            # gunicorn envía el archivo con sendfile sin pasar por Python
+            response = current_app.response_class(
+                wrap_file(request.environ, open(entry.path, 'rb')),
+                mimetype=mimetype or entry.mimetype,
+                direct_passthrough=True
+            )
+            response.content_length = entry.size
+
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+        response.set_etag(entry.etag)
+        response.last_modified = entry.last_modified
+
+        # Sin max_age se revalida siempre con ETag/Last-Modified
+        response.cache_control.no_cache = True
+        if max_age:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            response.expires = int(time.time() + max_age)
+        if immutable:
+            response.cache_control.immutable = True
+
+        try:
+            return response.make_conditional(request, accept_ranges=True,
+                                             complete_length=entry.size)
+        except RequestedRangeNotSatisfiable:
+            response.close()
+            raise
+
+    def stats(self):
+        """Entradas indexadas y memoria usada"""
+        return {
+            'entries': sum(1 for _, entry in self._entries.values() if entry is not None),
+            'in_memory': len(self._memory),
+            'memory_bytes': self._memory_bytes
+        }
+
+
+# Instancia global del motor de estáticos
+static_files = StaticFiles()
@@ -0,0 +1,108 @@
+# Servicio de estadísticas agregadas para dashboards y analytics
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from backend.database import db
+from backend.models import ContactMessage, Project, Testimonial, BlogPost, User
+from backend.utils.metrics import metrics
+
+# Períodos de las estadísticas, relativos al momento del cálculo
+PERIODS = {
+    'today': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365)
+}
+
+_cache = {'stats': None, 'expires_at': 0.0}
+_lock = threading.Lock()
+
+
+def _count_if(condition):
+    """Expresión SUM(CASE WHEN condición THEN 1 ELSE 0 END)"""
+    return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
+
+def _period_counts(column, now):
+    """Conteos condicionales de una columna de fecha para cada período"""
+    return [_count_if(column >= now - delta).label(name) for name, delta in PERIODS.items()]
+
+
+def compute_stats():
+    """Calcular todos los contadores con una sola consulta por tabla"""
+    now = datetime.utcnow()
+
+    messages = db.session.query(
+        db.func.count(ContactMessage.id).label('total'),
+        _count_if(ContactMessage.leido == db.false()).label('unread'),
+        *_period_counts(ContactMessage.fecha, now)
+    ).one()
+
+    projects = db.session.query(
+        db.func.count(Project.id).label('total'),
+        _count_if(Project.activo == db.true()).label('active'),
+        *_period_counts(Project.fecha_creacion, now)
+    ).one()
+
+    testimonials = db.session.query(
+        db.func.count(Testimonial.id).label('total'),
+        _count_if(Testimonial.activo == db.true()).label('active')
+    ).one()
+
+    posts = db.session.query(
+        db.func.count(BlogPost.id).label('total'),
+        _count_if(BlogPost.publicado == db.true()).label('published')
+    ).one()
+
+    users = db.session.query(
+        db.func.count(User.id).label('total'),
+        _count_if(User.is_admin == db.true()).label('admins')
+    ).one()
+
+    return {
+        'messages': dict(messages._mapping),
+        'projects': dict(projects._mapping),
+        'testimonials': dict(testimonials._mapping),
+        'posts': dict(posts._mapping),
+        'users': dict(users._mapping),
+        'generated_at': now.isoformat()
+    }
+
+
+def get_stats():
+    """Obtener las estadísticas, reutilizando el último cálculo durante unos segundos"""
+    ttl = current_app.config.get('STATS_CACHE_TTL', 5)
+    with _lock:
+        if _cache['stats'] is not None and _cache['expires_at'] > time.monotonic():
+            metrics.inc('cache_requests_total', {'cache': 'stats', 'result': 'hit'})
+            return _cache['stats']
+
+    metrics.inc('cache_requests_total', {'cache': 'stats', 'result': 'miss'})
+    stats = compute_stats()
+    with _lock:
+        _cache['stats'] = stats
+        _cache['expires_at'] = time.monotonic() + ttl
+    return stats
+
+
+def invalidate_stats():
+    """Descartar las estadísticas cacheadas"""
+    with _lock:
+        _cache['stats'] = None
+        _cache['expires_at'] = 0.0
+
+
+def get_overview(stats=None):
+    """Resumen general usado por el dashboard y la API de administración"""
+    stats = stats or get_stats()
+    return {
+        'total_messages': stats['messages']['total'],
+        'unread_messages': stats['messages']['unread'],
+        'active_projects': stats['projects']['active'],
+        'active_testimonials': stats['testimonials']['active'],
+        'published_posts': stats['posts']['published'],
+        'total_users': stats['users']['total']
+    }
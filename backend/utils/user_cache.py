@@ -0,0 +1,130 @@
+# Caché de usuarios para el user_loader de Flask-Login
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+
+from backend.database import db
+from backend.utils.events import change_hub, queue_event
+from backend.utils.metrics import metrics
+
+# Evento de la tabla compartida de change_hub que invalida un usuario
+USER_CHANGED_EVENT = 'user.changed'
+
+
+class UserCache:
+    """Caché LRU con TTL de los valores de columna de cada usuario.
+
+    En un acierto se reconstruye el ``User`` y se adjunta a la sesión con
+    ``merge(load=False)``, sin consultar la base de datos. Los cambios del
+    usuario (contraseña, ``is_admin``...) invalidan su entrada en este
+    proceso al momento. Con el backend ``sqlite`` de ``change_hub`` además
+    se publican al confirmarse y cada worker lee los cambios nuevos antes de
+    usar su caché, así que ninguno sirve un usuario modificado en otro.
+    """
+
+    def __init__(self, ttl=30, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._watching = False
+        self._last_event_id = 0
+
+    def init_app(self, app):
+        """Leer la configuración y vigilar los cambios del modelo User"""
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('USER_CACHE_MAX_ENTRIES', self.max_entries)
+        self.enabled = app.config.get('USER_CACHE_ENABLED', True)
+        app.extensions['user_cache'] = self
+        # Los cambios anteriores ya están en la base; solo interesan los nuevos
+        self._last_event_id = change_hub.last_event_id()
+
+        if not self._watching:
+            from backend.models import User
+            for event_name in ('after_update', 'after_delete'):
+                event.listen(User, event_name, self._on_change)
+            self._watching = True
+
+    def _on_change(self, mapper, connection, target):
+        self.invalidate(target.id)
+        if change_hub.backend == 'sqlite':
+            # Avisar a los demás workers cuando se confirme la transacción
+            queue_event(target, USER_CHANGED_EVENT, {'id': target.id})
+
+    def _sync(self):
+        """Descartar los usuarios que otros workers cambiaron desde la última lectura"""
+        try:
+            events = change_hub.events_since(self._last_event_id, USER_CHANGED_EVENT)
+        except sqlite3.Error as e:
+            # Sin la tabla compartida no se puede saber qué cambió: mejor vaciar
+            logging.error(f"Error al leer invalidaciones de usuarios: {str(e)}")
+            self.clear()
+            return
+        if not events:
+            return
+        with self._lock:
+            for event_id, data in events:
+                self._entries.pop(data['id'], None)
+                self._last_event_id = max(self._last_event_id, event_id)
+            self._generation += 1
+
+    def invalidate(self, user_id):
+        """Descartar la entrada de un usuario"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generation += 1
+
+    def clear(self):
+        """Vaciar la caché por completo"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def load(self, user_id):
+        """Obtener el usuario para Flask-Login, desde la caché si es posible"""
+        from backend.models import User
+
+        if not self.enabled:
+            return db.session.get(User, user_id)
+
+        self._sync()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] < time.monotonic():
+                del self._entries[user_id]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+            generation = self._generation
+
+        if entry is not None:
+            metrics.inc('cache_requests_total', {'cache': 'user', 'result': 'hit'})
+            user = User(**entry[0])
+            make_transient_to_detached(user)
+            return db.session.merge(user, load=False)
+
+        metrics.inc('cache_requests_total', {'cache': 'user', 'result': 'miss'})
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+
+        values = {attr.key: getattr(user, attr.key) for attr in db.inspect(User).column_attrs}
+        with self._lock:
+            # No guardar si el usuario cambió mientras se consultaba
+            if generation == self._generation:
+                self._entries[user_id] = (values, time.monotonic() + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return user
+
+
+# Instancia global de la caché
+user_cache = UserCache()
@@ -0,0 +1,129 @@
+# Contador de vistas del blog con escritura diferida
+import atexit
+import logging
+import os
+import threading
+
+from flask import current_app
+from sqlalchemy import bindparam
+
+from backend.database import db
+
+
+class ViewCounter:
+    """Acumula las vistas de los artículos en memoria y las persiste por lotes.
+
+    Cada lectura de un artículo solo incrementa un contador en memoria. Los
+    incrementos se agrupan por artículo y se escriben en un único
+    ``UPDATE ... SET vistas = vistas + :n`` cuando pasa el intervalo, cuando
+    se alcanza el umbral o al cerrar el proceso. Los vaciados los hace el hilo
+    de fondo: la petición que alcanza el umbral solo lo despierta.
+
+    Mientras un lote se escribe sus vistas pasan a ``_inflight`` y se siguen
+    sumando en ``pending()`` hasta el commit, así que las lecturas no pierden
+    vistas durante el vaciado.
+    """
+
+    def __init__(self, flush_interval=10, flush_threshold=100):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending = {}
+        self._inflight = {}
+        self._total = 0
+        self._app = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread_pid = None
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        """Leer la configuración y registrar el vaciado al cerrar"""
+        self.flush_interval = app.config.get('VIEW_COUNTER_FLUSH_INTERVAL', self.flush_interval)
+        self.flush_threshold = app.config.get('VIEW_COUNTER_FLUSH_THRESHOLD', self.flush_threshold)
+        app.extensions['view_counter'] = self
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def increment(self, post_id):
+        """Registrar una vista y devolver las vistas aún no persistidas del artículo"""
+        with self._lock:
+            self._app = current_app._get_current_object()
+            self._pending[post_id] = self._pending.get(post_id, 0) + 1
+            self._total += 1
+            should_flush = self._total >= self.flush_threshold
+            pending = self._pending[post_id] + self._inflight.get(post_id, 0)
+        if should_flush:
+            if self._ensure_timer():
+                self._wakeup.set()
+            else:
+                self.flush()
+        else:
+            self._ensure_timer()
+        return pending
+
+    def pending(self, post_id):
+        """Vistas aún no persistidas de un artículo (incluidas las que se están escribiendo)"""
+        with self._lock:
+            return self._pending.get(post_id, 0) + self._inflight.get(post_id, 0)
+
+    def flush(self):
+        """Persistir todas las vistas pendientes en un único lote"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._inflight = pending
+                self._total = 0
+                app = self._app
+            if not pending or app is None:
+                return 0
+
+            from backend.models import BlogPost
+            table = BlogPost.__table__
+            stmt = table.update().where(
+                table.c.id == bindparam('post_id')
+            ).values(vistas=db.func.coalesce(table.c.vistas, 0) + bindparam('views'))
+            params = [{'post_id': post_id, 'views': views} for post_id, views in pending.items()]
+
+            try:
+                with app.app_context():
+                    with db.engine.begin() as connection:
+                        connection.execute(stmt, params)
+            except Exception as e:
+                logging.error(f"Error al guardar vistas del blog: {str(e)}")
+                # Devolver los incrementos para reintentar en el siguiente vaciado
+                with self._lock:
+                    for post_id, views in pending.items():
+                        self._pending[post_id] = self._pending.get(post_id, 0) + views
+                        self._total += views
+                    self._inflight = {}
+                return 0
+            with self._lock:
+                self._inflight = {}
+            return len(params)
+
+    def _ensure_timer(self):
+        """Arrancar el hilo de vaciado en este proceso si no existe; False si no hay hilo"""
+        if not self.flush_interval:
+            return False
+        if self._thread_pid == os.getpid():
+            return True
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return True
+            self._thread_pid = os.getpid()
+        thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+        thread.start()
+        return True
+
+    def _run(self):
+        """Bucle del hilo de vaciado: cada intervalo o al alcanzar el umbral"""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+# Instancia global del contador
+view_counter = ViewCounter()
@@ -12,13 +12,51 @@ class Config:
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{os.path.join(BASE_DIR, "database", "instance", "noelmoreno.db")}'
     
+    # PRAGMA aplicados a cada conexión SQLite nueva
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',          # lectores y escritor concurrentes
+        'synchronous': 'NORMAL',        # fsync solo en checkpoints con WAL
+        'cache_size': -64000,           # 64 MB de caché de páginas
+        'mmap_size': 268435456,         # 256 MB de E/S mapeada en memoria
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,           # esperar 5 s antes de "database is locked"
+        'foreign_keys': 'ON'
+    }
+    
+    # Opciones del pool de conexiones de SQLAlchemy
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True
+    }
+    
     # Configuración de sesiones
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     
+    # Caché del user_loader: segundos que otro worker puede tardar en ver
+    # un cambio de contraseña o de permisos
+    USER_CACHE_ENABLED = True
+    USER_CACHE_TTL = 30
+    USER_CACHE_MAX_ENTRIES = 256
+    
     # Configuración de archivos
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB máximo
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'backend', 'uploads')
     ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
+    # Solo las imágenes de UPLOAD_FOLDER (imagen_url) se sirven en /uploads/
+    UPLOAD_PUBLIC_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'avif'}
+    
+    # Configuración de variantes de imágenes (requiere Pillow); IMAGE_CACHE_DIR no
+    # puede estar dentro de UPLOAD_FOLDER ni del frontend
+    IMAGE_DERIVATIVES_ENABLED = True
+    IMAGE_CACHE_DIR = os.path.join(BASE_DIR, 'backend', 'cache', 'images')
+    IMAGE_WIDTHS = [240, 480, 640, 960, 1280, 1920]
+    IMAGE_QUALITY = {'avif': 50, 'webp': 75, 'jpeg': 80}
+    
+    # Archivos estáticos: índice en memoria y caché de los archivos pequeños
+    STATIC_CHECK_INTERVAL = 2.0  # segundos entre comprobaciones de mtime de cada archivo
+    STATIC_MEMORY_MAX_FILE = 256 * 1024  # los mayores se envían con sendfile
+    STATIC_MEMORY_MAX_BYTES = 32 * 1024 * 1024
+    # Incrustar proyectos, testimonios y blog en la página de inicio (sin esperar a la API)
+    LANDING_PRERENDER = True
     
     # Configuración de email
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
@@ -26,10 +64,82 @@ class Config:
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
+    MAIL_TIMEOUT = 10  # segundos
+    # Destinatario de los avisos de mensajes nuevos (sin definir no se envían)
+    CONTACT_NOTIFICATION_EMAIL = os.environ.get('CONTACT_NOTIFICATION_EMAIL')
+    
+    # Cola de trabajos en segundo plano (formulario de contacto y emails)
+    JOB_QUEUE_PATH = os.path.join(BASE_DIR, 'database', 'instance', 'jobs.db')
+    JOB_QUEUE_EAGER = False  # ejecutar los trabajos al encolarlos
+    JOB_QUEUE_WORKERS = 2  # hilos por proceso
+    JOB_QUEUE_POLL_INTERVAL = 1.0  # segundos
+    JOB_QUEUE_MAX_ATTEMPTS = 5
+    JOB_QUEUE_BACKOFF_BASE = 2.0  # segundos; se duplica en cada reintento
+    JOB_QUEUE_BACKOFF_MAX = 300.0
+    
+    # Crear tablas y datos iniciales en create_app(); si no, "flask init-db" y "flask seed"
+    AUTO_INIT_DB = False
+    
+    # Copias de seguridad de la base de datos (flask backup create / panel)
+    BACKUP_DIR = os.path.join(BASE_DIR, 'database', 'backups')
+    BACKUP_KEEP = 14  # copias que se conservan
+    BACKUP_PAGES_PER_STEP = 256  # páginas copiadas en cada paso de la API de backup
+    BACKUP_STEP_SLEEP = 0.01  # segundos de pausa entre pasos
+    BACKUP_INTERVAL = 0  # segundos entre copias automáticas (0 = solo manuales)
     
     # Configuración de paginación
     POSTS_PER_PAGE = 10
     MESSAGES_PER_PAGE = 20
+    KEYSET_COUNT_CACHE_TTL = 30  # segundos que se reutiliza el total en modo cursor
+    
+    # Configuración de caché de respuestas de la API pública
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_TTL = 300  # 5 minutos
+    RESPONSE_CACHE_MAX_ENTRIES = 256
+    
+    # Configuración del contador de vistas del blog
+    VIEW_COUNTER_FLUSH_INTERVAL = 10  # segundos
+    VIEW_COUNTER_FLUSH_THRESHOLD = 100  # vistas pendientes
+    
+    # Segundos que se reutilizan las estadísticas del dashboard
+    STATS_CACHE_TTL = 5
+    
+    # Eventos en vivo del panel (SSE en /admin/api/events)
+    EVENTS_BACKEND = 'memory'  # 'memory' (un proceso) o 'sqlite' (varios workers)
+    EVENTS_PATH = os.path.join(BASE_DIR, 'database', 'instance', 'events.db')
+    EVENTS_POLL_INTERVAL = 0.5  # segundos entre lecturas de la tabla compartida
+    EVENTS_KEEPALIVE = 15  # segundos entre comentarios keepalive
+    EVENTS_STREAM_TIMEOUT = 300  # el navegador se reconecta al cerrarse el stream
+    
+    # Perfilado de peticiones (cabecera Server-Timing, /admin/api/perf y log de lentas)
+    PROFILING_ENABLED = True
+    PROFILING_WINDOW = 500  # muestras por endpoint
+    SERVER_TIMING_HEADER = True  # True, False o 'admin' (solo administradores con sesión)
+    SLOW_REQUEST_THRESHOLD_MS = 500
+    SLOW_REQUEST_STATEMENTS = 3  # sentencias más lentas incluidas en el log
+    SLOW_REQUEST_LOG = os.path.join(BASE_DIR, 'backend', 'logs', 'slow_requests.log')
+    
+    # Métricas de Prometheus en /metrics, agregadas entre workers mediante archivos
+    METRICS_ENABLED = True
+    METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(BASE_DIR, 'backend', 'cache', 'metrics')
+    METRICS_FLUSH_INTERVAL = 5  # segundos entre volcados de cada worker
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_LOOPBACK_ONLY = False  # sin token, aceptar solo peticiones desde 127.0.0.1/::1
+    
+    # Limitación de peticiones: (peticiones, segundos) por bucket
+    RATELIMIT_ENABLED = True
+    RATELIMIT_BACKEND = 'memory'  # 'memory' (un proceso) o 'sqlite' (varios workers)
+    RATELIMIT_STORAGE_PATH = os.path.join(BASE_DIR, 'database', 'instance', 'ratelimit.db')
+    RATELIMIT_MEMORY_MAX_KEYS = 10000
+    RATELIMIT_CONTACT_IP = (5, 60)
+    RATELIMIT_LOGIN_IP = (10, 60)
+    RATELIMIT_LOGIN_USERNAME = (5, 300)  # solo intentos fallidos, por usuario e IP
+    
+    # Proxies de confianza delante de la aplicación (ProxyFix): número de
+    # saltos de X-Forwarded-For / X-Forwarded-Proto que se aceptan; 0 = ninguno
+    PROXY_FIX_X_FOR = 0
+    PROXY_FIX_X_PROTO = 0
     
     # Configuración de seguridad
     WTF_CSRF_ENABLED = True
@@ -61,6 +171,37 @@ class ProductionConfig(Config):
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     
+    # Los workers de gunicorn comparten los buckets y los eventos a través de SQLite
+    RATELIMIT_BACKEND = 'sqlite'
+    EVENTS_BACKEND = 'sqlite'
+    
+    # Solo detrás de un proxy de confianza: la IP del cliente llega en
+    # X-Forwarded-For. Sin proxy el cliente podría falsificar la cabecera,
+    # así que se activa explícitamente (PROXY_FIX_X_FOR=1)
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    PROXY_FIX_X_PROTO = int(os.environ.get('PROXY_FIX_X_PROTO', 0))
+    
+    # Copia diaria automática
+    BACKUP_INTERVAL = 24 * 3600
+    
+    # El frontend solo cambia al desplegar
+    STATIC_CHECK_INTERVAL = 30.0
+    
+    # Los tiempos internos solo se muestran a los administradores
+    SERVER_TIMING_HEADER = 'admin'
+    
+    # /metrics cerrado por defecto: con METRICS_TOKEN o solo desde la propia máquina
+    METRICS_LOOPBACK_ONLY = True
+    
+    # Pool por worker de gunicorn: pocas conexiones y reciclado periódico
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 5,
+        'max_overflow': 5,
+        'pool_timeout': 10,
+        'pool_recycle': 3600,
+        'pool_pre_ping': True
+    }
+    
     # Configuración de logging
     LOG_TO_STDOUT = os.environ.get('LOG_TO_STDOUT')
     
@@ -72,6 +213,18 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    
+    # La base en memoria usa una única conexión compartida (StaticPool)
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLITE_PRAGMAS = {
+        'foreign_keys': 'ON'
+    }
+    SLOW_REQUEST_LOG = None
+    METRICS_DIR = None
+    JOB_QUEUE_EAGER = True
+    RATELIMIT_ENABLED = False
+    # La base en memoria empieza vacía en cada create_app()
+    AUTO_INIT_DB = True
 
 # Diccionario de configuraciones
 config = {
@@ -5,25 +5,75 @@ window.NoelMorenoAPI = {
         ? 'http://localhost:5000/api' 
         : '/api',
     
+    // Prefijo de las respuestas guardadas para peticiones condicionales
+    cachePrefix: 'noelmoreno-api:',
+    
+    // Leer una respuesta guardada (ETag, Last-Modified y datos)
+    getCachedResponse(url) {
+        try {
+            const cached = localStorage.getItem(this.cachePrefix + url);
+            return cached ? JSON.parse(cached) : null;
+        } catch (error) {
+            return null;
+        }
+    },
+    
+    // Guardar una respuesta con sus validadores
+    setCachedResponse(url, response, data) {
+        const etag = response.headers.get('ETag');
+        const lastModified = response.headers.get('Last-Modified');
+        if (!etag && !lastModified) {
+            return;
+        }
+        try {
+            localStorage.setItem(this.cachePrefix + url, JSON.stringify({ etag, lastModified, data }));
+        } catch (error) {
+            // Almacenamiento lleno o no disponible: continuar sin caché
+        }
+    },
+    
     // Función genérica para hacer requests
     async request(endpoint, options = {}) {
         const url = `${this.baseURL}${endpoint}`;
+        const isGet = !options.method || options.method.toUpperCase() === 'GET';
+        const cached = isGet ? this.getCachedResponse(url) : null;
+        const validators = {};
+        
+        // Reenviar los validadores para recibir 304 si nada cambió
+        if (cached) {
+            if (cached.etag) {
+                validators['If-None-Match'] = cached.etag;
+            }
+            if (cached.lastModified) {
+                validators['If-Modified-Since'] = cached.lastModified;
+            }
+        }
+        
         const config = {
+            ...options,
             headers: {
                 'Content-Type': 'application/json',
+                ...validators,
                 ...options.headers
-            },
-            ...options
+            }
         };
         
         try {
             const response = await fetch(url, config);
             
+            if (response.status === 304 && cached) {
+                return cached.data;
+            }
+            
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
             
-            return await response.json();
+            const data = await response.json();
+            if (isGet) {
+                this.setCachedResponse(url, response, data);
+            }
+            return data;
         } catch (error) {
             console.error('API Error:', error);
             throw error;
@@ -60,6 +110,18 @@ window.NoelMorenoAPI = {
         }
     },
     
+    // Obtener proyectos, testimonios y blog en una sola petición
+    // (fields opcional, p. ej. 'projects.titulo,projects.imagen_url,blog')
+    async getBootstrap(fields) {
+        const query = fields ? `?fields=${encodeURIComponent(fields)}` : '';
+        try {
+            return await this.request(`/bootstrap${query}`);
+        } catch (error) {
+            console.error('Error cargando contenido:', error);
+            return {};
+        }
+    },
+    
     // Obtener un post específico del blog
     async getBlogPost(slug) {
         try {
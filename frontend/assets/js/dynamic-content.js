@@ -1,17 +1,45 @@
 // Cargar contenido dinámico desde la API
 window.NoelMorenoDynamicContent = {
     // Inicializar carga de contenido
-    init: function() {
-        this.loadProjects();
-        this.loadTestimonials();
-        this.loadBlogPosts();
+    init: async function() {
+        // Datos incrustados por el servidor en la página: se pintan sin
+        // esperar a la API; si faltan, se piden todos en /api/bootstrap
+        const initialData = this.getInitialData() || await NoelMorenoAPI.getBootstrap();
+        this.loadProjects(initialData.projects);
+        this.loadTestimonials(initialData.testimonials);
+        this.loadBlogPosts(initialData.blog);
+    },
+    
+    // Leer el bloque <script id="initial-data"> que genera el backend
+    getInitialData: function() {
+        const element = document.getElementById('initial-data');
+        if (!element) {
+            return null;
+        }
+        try {
+            return JSON.parse(element.textContent);
+        } catch (error) {
+            console.error('❌ Error leyendo los datos iniciales:', error);
+            return null;
+        }
+    },
+    
+    // Atributos srcset/sizes para imágenes servidas por el backend (/uploads/),
+    // que genera variantes redimensionadas con ?w=
+    responsiveImage: function(url, sizes) {
+        if (!url || !url.startsWith('/uploads/')) {
+            return '';
+        }
+        const widths = [480, 960];
+        const srcset = widths.map(width => `${url}?w=${width} ${width}w`).join(', ');
+        return `srcset="${srcset}" sizes="${sizes}" loading="lazy"`;
     },
     
     // Cargar proyectos dinámicamente
-    async loadProjects() {
+    async loadProjects(initial) {
         try {
             console.log('🔄 Cargando proyectos desde API...');
-            const projects = await NoelMorenoAPI.getProjects();
+            const projects = initial || await NoelMorenoAPI.getProjects();
             
             if (projects && projects.length > 0) {
                 this.renderProjects(projects);
@@ -52,6 +80,7 @@ window.NoelMorenoDynamicContent = {
         card.innerHTML = `
             <div class="project-image">
                 <img src="${project.imagen_url || 'https://via.placeholder.com/400x300/4A90E2/FFFFFF?text=Proyecto'}" 
+                     ${this.responsiveImage(project.imagen_url, '(max-width: 768px) 100vw, 400px')}
                      alt="${project.titulo}" 
                      onerror="this.src='https://via.placeholder.com/400x300/4A90E2/FFFFFF?text=Proyecto'">
             </div>
@@ -76,10 +105,10 @@ window.NoelMorenoDynamicContent = {
     },
     
     // Cargar testimonios dinámicamente
-    async loadTestimonials() {
+    async loadTestimonials(initial) {
         try {
             console.log('🔄 Cargando testimonios desde API...');
-            const testimonials = await NoelMorenoAPI.getTestimonials();
+            const testimonials = initial || await NoelMorenoAPI.getTestimonials();
             
             if (testimonials && testimonials.length > 0) {
                 this.renderTestimonials(testimonials);
@@ -133,10 +162,10 @@ window.NoelMorenoDynamicContent = {
     },
     
     // Cargar posts del blog dinámicamente
-    async loadBlogPosts() {
+    async loadBlogPosts(initial) {
         try {
             console.log('🔄 Cargando posts del blog desde API...');
-            const posts = await NoelMorenoAPI.getBlogPosts();
+            const posts = initial || await NoelMorenoAPI.getBlogPosts();
             
             if (posts && posts.length > 0) {
                 this.renderBlogPosts(posts);
@@ -184,6 +213,7 @@ window.NoelMorenoDynamicContent = {
         card.innerHTML = `
             <div class="blog-image">
                 <img src="${post.imagen_url || 'https://via.placeholder.com/400x250/4A90E2/FFFFFF?text=Blog+Post'}" 
+                     ${this.responsiveImage(post.imagen_url, '(max-width: 768px) 100vw, 400px')}
                      alt="${post.titulo}" 
                      onerror="this.src='https://via.placeholder.com/400x250/4A90E2/FFFFFF?text=Blog+Post'">
             </div>
@@ -0,0 +1,39 @@
+# Configuración de Gunicorn para producción
+# Ejecutar con: gunicorn -c gunicorn.conf.py app:app
+# (antes, una vez por despliegue: flask --app app init-db)
+import os
+
+# app:app se crea con la configuración indicada en FLASK_ENV
+os.environ.setdefault('FLASK_ENV', 'production')
+
+# Con PROXY_FIX_X_FOR > 0 conviene escuchar solo en la interfaz del proxy
+# (GUNICORN_BIND=127.0.0.1:5000) para que nadie envíe X-Forwarded-For directo
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+
+# Hilos por worker: cada stream SSE del dashboard (/admin/api/events) ocupa un
+# hilo mientras está abierto, no un proceso entero como con worker_class "sync"
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Los streams SSE se cierran solos cada EVENTS_STREAM_TIMEOUT segundos y envían
+# keepalives, así que el timeout del worker no los corta
+timeout = 30
+keepalive = 5
+max_requests = 1000
+max_requests_jitter = 100
+
+
+def on_starting(server):
+    """Vaciar las métricas de la ejecución anterior antes de arrancar los workers"""
+    from config import Config
+    from backend.utils.metrics import clear_metrics_dir
+
+    clear_metrics_dir(Config.METRICS_DIR)
+
+
+def post_worker_init(worker):
+    """Registrar Flask-Admin antes de que el worker acepte conexiones"""
+    from app import ensure_flask_admin
+
+    ensure_flask_admin(worker.wsgi)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Medir el arranque de la aplicación: importación en frío y primera petición
+# Ejecutar con: python scripts/bench_startup.py [--runs 10] [--config development]
+#
+# Cada ejecución es un intérprete nuevo, como un worker de gunicorn recién
+# creado. Se mide la importación de app.py, la creación de ``app:app`` y las
+# dos primeras peticiones (la primera registra Flask-Admin).
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Agregar la raíz del proyecto al path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+PROBE = """
+import contextlib, io, json, sys, time
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app as module
+    t1 = time.perf_counter()
+    application = module.app
+t2 = time.perf_counter()
+client = application.test_client()
+status = client.get(sys.argv[1]).status_code
+t3 = time.perf_counter()
+client.get(sys.argv[1])
+t4 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'first_request_ms': (t3 - t2) * 1000,
+    'second_request_ms': (t4 - t3) * 1000,
+    'status': status,
+}))
+"""
+
+INIT = """
+import contextlib, io
+from app import create_app, init_database
+with contextlib.redirect_stdout(io.StringIO()):
+    app = create_app(__import__('os').environ['FLASK_ENV'])
+    with app.app_context():
+        init_database(seed=True)
+"""
+
+
+def run_probe(env, path):
+    """Ejecutar una medición en un proceso nuevo; añade el tiempo total del proceso"""
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, path],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    sample = json.loads(output.strip().splitlines()[-1])
+    sample['process_ms'] = (time.perf_counter() - started) * 1000
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de arranque de la aplicación')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--config', default='development',
+                        help='Valor de FLASK_ENV (development, production, testing)')
+    parser.add_argument('--path', default='/api/projects', help='Ruta de la primera petición')
+    parser.add_argument('--json', dest='json_path', help='Guardar los resultados en un archivo JSON')
+    args = parser.parse_args()
+
+    env = dict(os.environ, FLASK_ENV=args.config)
+
+    # Las tablas deben existir antes de medir (fuera de la medición)
+    subprocess.run([sys.executable, '-c', INIT], cwd=PROJECT_ROOT, env=env, check=True)
+
+    samples = [run_probe(env, args.path) for _ in range(args.runs)]
+    if any(sample['status'] >= 500 for sample in samples):
+        print(f"❌ {args.path} devolvió un error durante la medición")
+        return 1
+
+    fields = ('import_ms', 'create_app_ms', 'first_request_ms', 'second_request_ms', 'process_ms')
+    summary = {}
+    print(f"Arranque con FLASK_ENV={args.config}, {args.runs} ejecuciones, GET {args.path}\n")
+    print(f"{'':20}{'mediana':>10}{'mín':>10}{'máx':>10}")
+    for field in fields:
+        values = [sample[field] for sample in samples]
+        summary[field] = {
+            'median': statistics.median(values),
+            'min': min(values),
+            'max': max(values)
+        }
+        print(f"{field:20}{summary[field]['median']:>10.1f}{summary[field]['min']:>10.1f}"
+              f"{summary[field]['max']:>10.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'config': args.config, 'path': args.path, 'runs': args.runs,
+                       'summary': summary, 'samples': samples}, f, indent=2)
+        print(f"\n✅ Resultados guardados en {args.json_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# Banco de pruebas de rendimiento de la API, el panel y los estáticos
+# Ejecutar con: python scripts/benchmark.py --rows 1k,100k --mode both --json bench.json
+#
+# Para cada tamaño se crea (o reutiliza) una base SQLite en backend/cache/benchmark
+# con mensajes, proyectos y artículos sintéticos. Cada endpoint se mide con el
+# cliente de pruebas de Flask (sin red, un hilo) y con un servidor WSGI local
+# con clientes concurrentes. Se informa de p50/p95/p99, peticiones por segundo
+# y consultas SQL por petición (de la cabecera Server-Timing).
+#
+# Comparar con una ejecución anterior: --compare bench-base.json
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.cookies import SimpleCookie
+
+# Agregar la raíz del proyecto al path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from config import config, DevelopmentConfig
+
+BENCH_DIR = os.path.join(PROJECT_ROOT, 'backend', 'cache', 'benchmark')
+SEED_BATCH = 5000
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+SERVICES = ['pos', 'inventario', 'reportes', 'consultoria']
+WORDS = ('sistema inventario ventas factura reporte cliente tienda farmacia stock '
+         'automatización proceso dashboard pedido proveedor caja control análisis').split()
+
+# (nombre, ruta, requiere sesión de administrador)
+ENDPOINTS = [
+    ('api.projects', '/api/projects', False),
+    ('api.testimonials', '/api/testimonials', False),
+    ('api.blog', '/api/blog', False),
+    ('api.bootstrap', '/api/bootstrap', False),
+    ('api.blog_post', '/api/blog/articulo-1', False),
+    ('api.search', '/api/search?q=inventario', False),
+    ('api.dashboard_stats', '/api/dashboard/stats', False),
+    ('api.admin_messages', '/api/admin/messages?per_page=20', True),
+    ('api.admin_messages_cursor', '/api/admin/messages?per_page=20&after=', True),
+    ('api.admin_messages_filtered', '/api/admin/messages?read=unread&service=pos&per_page=20', True),
+    ('api.admin_messages_search', '/api/admin/messages?q=factura&per_page=20', True),
+    ('admin.api_stats', '/admin/api/stats', True),
+    ('admin.dashboard', '/admin/dashboard', True),
+    ('admin.messages', '/admin/messages', True),
+    ('static.index', '/static/index.html', False),
+    ('static.asset', None, False),  # bundle JS del manifest (o styles.css)
+]
+
+
+def parse_rows(value):
+    """'1k,100k,1m' -> [1000, 100000, 1000000]"""
+    sizes = []
+    for item in value.split(','):
+        item = item.strip().lower()
+        multiplier = {'k': 1000, 'm': 1000000}.get(item[-1:], 1)
+        sizes.append(int(float(item.rstrip('km')) * multiplier))
+    return sizes
+
+
+def asset_path():
+    """Ruta del bundle JS compilado, o de una hoja de estilos si no hay bundles"""
+    manifest = os.path.join(PROJECT_ROOT, 'frontend', 'assets', 'dist', 'manifest.json')
+    if os.path.exists(manifest):
+        with open(manifest, encoding='utf-8') as f:
+            return f"/assets/dist/{json.load(f)['app.js']}"
+    return '/assets/css/styles.css'
+
+
+def make_app(rows):
+    """Aplicación sobre la base del tamaño dado, sin límites ni tareas de fondo"""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    db_path = os.path.join(BENCH_DIR, f'bench-{rows}.db')
+
+    class BenchmarkConfig(DevelopmentConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        AUTO_INIT_DB = False
+        RATELIMIT_ENABLED = False
+        METRICS_DIR = None
+        SLOW_REQUEST_LOG = None
+        BACKUP_INTERVAL = 0
+        JOB_QUEUE_PATH = os.path.join(BENCH_DIR, 'jobs.db')
+        EVENTS_PATH = os.path.join(BENCH_DIR, 'events.db')
+
+    config['benchmark'] = BenchmarkConfig
+    from app import create_app
+    with contextlib.redirect_stdout(io.StringIO()):
+        return create_app('benchmark'), db_path
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed(app, rows, batch=SEED_BATCH):
+    """Crear el esquema y ``rows`` filas en cada tabla si la base está vacía"""
+    from app import init_database
+    from backend.database import db
+    from backend.models import ContactMessage, Project, BlogPost
+
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+        init_database()
+        if db.session.query(ContactMessage.id).first() is not None:
+            return False
+
+    rng = random.Random(rows)
+    now = datetime.utcnow()
+    # Datos con la forma de un sitio real: pocos proyectos activos y casi todos
+    # los artículos publicados
+    generators = [
+        (ContactMessage, lambda i: {
+            'nombre': f'Cliente {i}', 'email': f'cliente{i}@example.com',
+            'telefono': f'+34 600 {i % 1000000:06d}', 'servicio': rng.choice(SERVICES),
+            'mensaje': _text(rng, 40), 'leido': rng.random() < 0.7,
+            'fecha': now - timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)),
+            'ip_address': f'10.0.{i % 256}.{i // 256 % 256}'
+        }),
+        (Project, lambda i: {
+            'titulo': f'Proyecto {i}', 'descripcion_problema': _text(rng, 30),
+            'descripcion_solucion': _text(rng, 30), 'resultados': _text(rng, 15),
+            'categoria': rng.choice(SERVICES), 'activo': i <= 10 or rng.random() < 0.001,
+            'orden': i, 'cliente': f'Empresa {i}', 'tecnologias': 'Python, Flask, SQLite',
+            'fecha_creacion': now, 'fecha_actualizacion': now
+        }),
+        (BlogPost, lambda i: {
+            'titulo': f'Artículo {i}', 'slug': f'articulo-{i}', 'contenido': _text(rng, 300),
+            'resumen': _text(rng, 30), 'categoria': rng.choice(SERVICES),
+            'tags': ','.join(rng.sample(WORDS, 3)), 'publicado': i == 1 or rng.random() < 0.9,
+            'fecha_creacion': now, 'fecha_actualizacion': now,
+            'fecha_publicacion': now - timedelta(minutes=rng.randrange(365 * 24 * 60)),
+            'vistas': 0, 'tiempo_lectura': rng.randint(2, 15)
+        }),
+    ]
+
+    with app.app_context():
+        for model, make_row in generators:
+            started = time.perf_counter()
+            for offset in range(1, rows + 1, batch):
+                values = [make_row(i) for i in range(offset, min(offset + batch, rows + 1))]
+                db.session.execute(model.__table__.insert(), values)
+                db.session.commit()
+            print(f"   {model.__tablename__}: {rows} filas en {time.perf_counter() - started:.1f} s")
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+    return True
+
+
+def _percentile(values, fraction):
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(name, mode, rows, samples, wall_time, concurrency):
+    """Resumen de las muestras ``(latencia_ms, estado, consultas)`` de un endpoint"""
+    latencies = sorted(sample[0] for sample in samples)
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        'endpoint': name,
+        'mode': mode,
+        'rows': rows,
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[1] >= 400),
+        'p50_ms': round(_percentile(latencies, 0.50), 3),
+        'p95_ms': round(_percentile(latencies, 0.95), 3),
+        'p99_ms': round(_percentile(latencies, 0.99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'rps': round(len(samples) / wall_time, 1) if wall_time else None,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None
+    }
+
+
+def _queries(header):
+    match = QUERIES_RE.search(header or '')
+    return int(match.group(1)) if match else None
+
+
+def run_client(app, endpoints, requests, warmup, rows):
+    """Medir con el cliente de pruebas de Flask (sin red ni concurrencia)"""
+    client = app.test_client()
+    client.post('/admin/login', json={'username': 'admin', 'password': 'admin123'})
+    results = []
+    for name, path, _ in endpoints:
+        for _ in range(warmup):
+            client.get(path)
+        samples = []
+        started = time.perf_counter()
+        for _ in range(requests):
+            request_started = time.perf_counter()
+            response = client.get(path)
+            response.get_data()
+            samples.append(((time.perf_counter() - request_started) * 1000, response.status_code,
+                            _queries(response.headers.get('Server-Timing'))))
+        results.append(summarize(name, 'client', rows, samples, time.perf_counter() - started, 1))
+    return results
+
+
+class _QuietHandler(WSGIRequestHandler):
+    """HTTP/1.1 con keep-alive y sin una línea de log por petición"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def _login_cookie(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('POST', '/admin/login', body=json.dumps({'username': 'admin', 'password': 'admin123'}),
+                       headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    cookie = SimpleCookie()
+    for header in response.headers.get_all('Set-Cookie') or []:
+        cookie.load(header)
+    connection.close()
+    return '; '.join(f'{key}={morsel.value}' for key, morsel in cookie.items())
+
+
+def run_server(app, endpoints, requests, warmup, concurrency, rows):
+    """Medir contra un servidor WSGI local con ``concurrency`` clientes en paralelo"""
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=_QuietHandler)
+    port = server.server_port
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        cookie = _login_cookie(port)
+        results = []
+        for name, path, _ in endpoints:
+            per_client = max(1, requests // concurrency)
+            samples = []
+            lock = threading.Lock()
+            barrier = threading.Barrier(concurrency + 1)
+
+            def worker():
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                headers = {'Cookie': cookie, 'Accept-Encoding': 'gzip, br'}
+                local = []
+                for _ in range(warmup):
+                    connection.request('GET', path, headers=headers)
+                    connection.getresponse().read()
+                barrier.wait()
+                for _ in range(per_client):
+                    request_started = time.perf_counter()
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    local.append(((time.perf_counter() - request_started) * 1000, response.status,
+                                  _queries(response.getheader('Server-Timing'))))
+                connection.close()
+                with lock:
+                    samples.extend(local)
+
+            workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+            for client in workers:
+                client.start()
+            barrier.wait()
+            started = time.perf_counter()
+            for client in workers:
+                client.join()
+            results.append(summarize(name, 'server', rows, samples,
+                                     time.perf_counter() - started, concurrency))
+        return results
+    finally:
+        server.shutdown()
+
+
+def print_results(results):
+    print(f"   {'endpoint':32}{'modo':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}{'q/req':>7}{'err':>5}")
+    for result in results:
+        queries = result['queries_per_request']
+        print(f"   {result['endpoint']:32}{result['mode']:>8}{result['p50_ms']:>9.2f}"
+              f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['rps'] or 0:>9.0f}"
+              f"{'-' if queries is None else f'{queries:.1f}':>7}{result['errors']:>5}")
+
+
+def compare(results, baseline_path):
+    """Mostrar la variación frente a una ejecución anterior guardada en JSON"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['rows'], r['mode'], r['endpoint']): r for r in baseline['results']}
+    commit = baseline.get('meta', {}).get('commit') or baseline_path
+    print(f"\n📊 Comparación con {commit} (p50, p95 y rps; negativo = más rápido en latencia)")
+    for result in results:
+        old = previous.get((result['rows'], result['mode'], result['endpoint']))
+        if not old:
+            continue
+
+        def delta(field):
+            if not old[field] or result[field] is None:
+                return '     -'
+            return f"{(result[field] - old[field]) / old[field] * 100:+6.1f}%"
+
+        print(f"   {result['rows']:>8} {result['endpoint']:32}{result['mode']:>8}  "
+              f"p50 {delta('p50_ms')}  p95 {delta('p95_ms')}  rps {delta('rps')}")
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=PROJECT_ROOT, capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la API, el panel y los estáticos')
+    parser.add_argument('--rows', default='1k', help='Tamaños separados por comas (1k,100k,1m)')
+    parser.add_argument('--mode', choices=('client', 'server', 'both'), default='both')
+    parser.add_argument('--requests', type=int, default=200, help='Peticiones medidas por endpoint')
+    parser.add_argument('--warmup', type=int, default=5, help='Peticiones previas sin medir')
+    parser.add_argument('--concurrency', type=int, default=8, help='Clientes del modo servidor')
+    parser.add_argument('--endpoints', help='Medir solo los endpoints cuyo nombre contenga este texto')
+    parser.add_argument('--reseed', action='store_true', help='Recrear las bases sintéticas')
+    parser.add_argument('--json', dest='json_path', help='Guardar los resultados en un archivo JSON')
+    parser.add_argument('--compare', help='JSON de una ejecución anterior para comparar')
+    args = parser.parse_args()
+
+    endpoints = [(name, path or asset_path(), admin) for name, path, admin in ENDPOINTS
+                 if not args.endpoints or args.endpoints in name]
+    modes = ('client', 'server') if args.mode == 'both' else (args.mode,)
+
+    results = []
+    for rows in parse_rows(args.rows):
+        db_path = os.path.join(BENCH_DIR, f'bench-{rows}.db')
+        if args.reseed:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+
+        app, db_path = make_app(rows)
+        print(f"\n🗄️  {rows} filas por tabla ({os.path.relpath(db_path, PROJECT_ROOT)})")
+        if seed(app, rows):
+            print("   ✅ Datos sintéticos creados")
+
+        for mode in modes:
+            if mode == 'client':
+                mode_results = run_client(app, endpoints, args.requests, args.warmup, rows)
+            else:
+                mode_results = run_server(app, endpoints, args.requests, args.warmup,
+                                          args.concurrency, rows)
+            print_results(mode_results)
+            results.extend(mode_results)
+
+    if args.json_path:
+        output = {
+            'meta': {
+                'commit': git_commit(),
+                'date': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'requests': args.requests,
+                'warmup': args.warmup,
+                'concurrency': args.concurrency
+            },
+            'results': results
+        }
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+        print(f"\n✅ Resultados guardados en {args.json_path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    errors = sum(result['errors'] for result in results)
+    if errors:
+        print(f"\n⚠️  {errors} respuestas con error (4xx/5xx)")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
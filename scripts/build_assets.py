@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# Compilación de los assets del frontend (CSS/JS) para producción
+# Ejecutar con: python scripts/build_assets.py
+#
+# Concatena y minifica los CSS y JS locales que carga index.html, añade el
+# hash del contenido al nombre de cada bundle y genera las versiones .gz y
+# .br (esta última solo si el paquete "brotli" está instalado). El resultado
+# se escribe en frontend/assets/dist/ junto con un index.html que referencia
+# los bundles y un manifest.json.
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional
+    brotli = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_DIR = os.path.join(PROJECT_ROOT, 'frontend')
+DIST_DIR = os.path.join(FRONTEND_DIR, 'assets', 'dist')
+
+CSS_LINK = re.compile(r'[ \t]*<link rel="stylesheet" href="(assets/css/[^"]+\.css)">\n')
+JS_SCRIPT = re.compile(r'[ \t]*<script src="(assets/js/[^"]+\.js)"></script>\n')
+
+
+def minify_css(source):
+    """Eliminar comentarios y espacios innecesarios de una hoja de estilos"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    # No tocar el espacio antes de ":" (selectores como "a :hover")
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    source = source.replace(';}', '}')
+    return source.strip() + '\n'
+
+
+def minify_js(source):
+    """Minificación conservadora: quita comentarios de línea completa,
+    sangrías y líneas vacías sin tocar el contenido de los template literals"""
+    lines = []
+    in_template = False
+    in_comment = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if in_comment:
+                if '*/' in stripped:
+                    in_comment = False
+                continue
+            if stripped.startswith('/*'):
+                in_comment = '*/' not in stripped
+                continue
+            if not stripped or stripped.startswith('//'):
+                continue
+            lines.append(stripped)
+        # Contar las comillas invertidas no escapadas para saber si seguimos
+        # dentro de un template literal multilínea
+        if len(re.findall(r'(?<!\\)`', line)) % 2 == 1:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+def content_hash(data):
+    """Hash corto del contenido para el nombre del archivo"""
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def write_compressed(path, data):
+    """Escribir el archivo y sus versiones precomprimidas"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build_bundle(sources, minify, extension):
+    """Concatenar, minificar y escribir un bundle con hash en el nombre"""
+    parts = []
+    for source in sources:
+        with open(os.path.join(FRONTEND_DIR, source), encoding='utf-8') as f:
+            parts.append(f'/* {source} */\n' if extension == 'css' else '')
+            parts.append(minify(f.read()))
+            # Separar scripts para evitar problemas de inserción de ";"
+            if extension == 'js':
+                parts.append(';\n')
+    data = ''.join(parts).encode('utf-8')
+    filename = f'app.{content_hash(data)}.{extension}'
+    write_compressed(os.path.join(DIST_DIR, filename), data)
+    return filename, len(data)
+
+
+def main():
+    index_path = os.path.join(FRONTEND_DIR, 'index.html')
+    with open(index_path, encoding='utf-8') as f:
+        html = f.read()
+
+    css_sources = CSS_LINK.findall(html)
+    js_sources = JS_SCRIPT.findall(html)
+    if not css_sources or not js_sources:
+        print("❌ No se encontraron CSS/JS locales en index.html")
+        return 1
+
+    if os.path.exists(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    css_file, css_size = build_bundle(css_sources, minify_css, 'css')
+    js_file, js_size = build_bundle(js_sources, minify_js, 'js')
+
+    # Sustituir las etiquetas individuales por un único bundle de cada tipo
+    css_tag = f'    <link rel="stylesheet" href="assets/dist/{css_file}">\n'
+    js_tag = f'    <script src="assets/dist/{js_file}"></script>\n'
+    html = CSS_LINK.sub(lambda m: css_tag if m.group(1) == css_sources[0] else '', html)
+    html = JS_SCRIPT.sub(lambda m: js_tag if m.group(1) == js_sources[0] else '', html)
+    write_compressed(os.path.join(DIST_DIR, 'index.html'), html.encode('utf-8'))
+
+    manifest = {
+        'app.css': css_file,
+        'app.js': js_file,
+        'index.html': 'index.html',
+        'sources': {'css': css_sources, 'js': js_sources}
+    }
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"✅ {css_file} ({css_size} bytes, {len(css_sources)} archivos)")
+    print(f"✅ {js_file} ({js_size} bytes, {len(js_sources)} archivos)")
+    if brotli is None:
+        print("⚠️  brotli no instalado: solo se generaron versiones .gz")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
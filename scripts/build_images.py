@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# Pregenerar las variantes de las imágenes del frontend y de uploads/
+# Ejecutar con: python scripts/build_images.py
+#
+# Genera cada ancho de IMAGE_WIDTHS en todos los formatos que soporta el
+# Pillow instalado, para que la primera visita no pague la conversión.
+
+import os
+import sys
+
+# Agregar la raíz del proyecto al path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from config import Config
+from backend.utils.images import (
+    images_available, supported_formats, is_raster, has_alpha, get_derivative
+)
+
+SOURCE_DIRS = [
+    os.path.join(PROJECT_ROOT, 'frontend', 'assets', 'images'),
+    Config.UPLOAD_FOLDER
+]
+
+
+def iter_images():
+    """Imágenes originales de los directorios de origen"""
+    for source_dir in SOURCE_DIRS:
+        if not os.path.isdir(source_dir):
+            continue
+        for root, _, files in os.walk(source_dir):
+            for name in sorted(files):
+                if is_raster(name):
+                    yield os.path.join(root, name)
+
+
+def main():
+    if not images_available():
+        print("❌ Pillow no está instalado: pip install Pillow")
+        return 1
+
+    formats = supported_formats()
+    total = 0
+    for path in iter_images():
+        # El formato de respaldo depende de la transparencia del original
+        fallback = 'png' if has_alpha(path) else 'jpeg'
+        targets = [fmt for fmt in ('avif', 'webp') if fmt in formats] + [fallback]
+        original_size = os.path.getsize(path)
+        for width in Config.IMAGE_WIDTHS:
+            for fmt in targets:
+                get_derivative(path, Config.IMAGE_CACHE_DIR, width, fmt, Config.IMAGE_QUALITY)
+                total += 1
+        smallest = get_derivative(path, Config.IMAGE_CACHE_DIR, min(Config.IMAGE_WIDTHS),
+                                  targets[0], Config.IMAGE_QUALITY)
+        print(f"✅ {os.path.relpath(path, PROJECT_ROOT)}: {original_size} bytes → "
+              f"{os.path.getsize(smallest)} bytes ({targets[0]}, {min(Config.IMAGE_WIDTHS)}px)")
+
+    print(f"✅ {total} variantes en {Config.IMAGE_CACHE_DIR} (formatos: {', '.join(formats)})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
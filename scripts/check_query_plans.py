@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# Comprobar que las consultas de las rutas usan índices (EXPLAIN QUERY PLAN)
+# Ejecutar con: python scripts/check_query_plans.py
+
+import os
+import sys
+
+# Agregar la raíz del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from backend.utils.query_plans import check_query_plans
+
+
+def main():
+    app = create_app('testing')
+    client = app.test_client()
+
+    # Iniciar sesión para poder consultar las rutas de administración
+    response = client.post('/admin/login', json={'username': 'admin', 'password': 'admin123'})
+    if response.status_code != 200:
+        print("❌ No se pudo iniciar sesión como administrador")
+        return 1
+
+    problems = check_query_plans(app, client)
+    if not problems:
+        print("✅ Todas las consultas de las rutas usan índices")
+        return 0
+
+    print(f"❌ {len(problems)} consultas recorren tablas completas:")
+    for route, statement, plan in problems:
+        print(f"\n   Ruta: {route}")
+        print(f"   SQL:  {' '.join(statement.split())}")
+        for step in plan:
+            print(f"         {step}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -129,24 +129,22 @@ def create_startup_script():
     startup_content = """#!/usr/bin/env python3
 # Script de inicio para el Backend de Noel Moreno
 
-import sys
 import os
+import sys
 
 # Agregar el directorio actual al path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db, create_admin_user, create_sample_data
+from app import create_app, init_database
 
 if __name__ == '__main__':
-    with app.app_context():
-        # Crear tablas si no existen
-        db.create_all()
-        
-        # Crear usuario administrador
-        create_admin_user()
-        
-        # Crear datos de ejemplo
-        create_sample_data()
+    app = create_app(os.environ.get('FLASK_ENV', 'default'))
+    
+    # Con el recargador el script se ejecuta dos veces: las tablas y los datos
+    # de ejemplo solo se crean en el proceso principal
+    if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        with app.app_context():
+            init_database(seed=True)
         
         print("\\n🚀 Backend de Noel Moreno iniciado")
         print("📊 Panel de administración: http://localhost:5000/admin")
@@ -155,9 +153,9 @@ if __name__ == '__main__':
         print("📡 API disponible en: http://localhost:5000/api/")
         print("\\n⚠️  IMPORTANTE: Cambiar contraseña en producción")
         print("=" * 50)
-        
-        # Iniciar servidor
-        app.run(debug=True, host='0.0.0.0', port=5000)
+    
+    # Iniciar servidor
+    app.run(debug=True, host='0.0.0.0', port=5000)
 """
     
     with open("start.py", "w", encoding="utf-8") as f:
@@ -0,0 +1,81 @@
+# Fixtures comunes: aplicación de testing con base en memoria y clientes
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Agregar la raíz del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from backend.database import db
+from backend.utils.cache import response_cache
+from backend.utils.rate_limit import rate_limiter
+
+
+@pytest.fixture
+def app():
+    """Aplicación con TestingConfig (SQLite en memoria, datos de ejemplo y cola eager)"""
+    app = create_app('testing')
+    # Las instancias globales sobreviven entre tests: empezar sin entradas
+    response_cache.clear()
+    rate_limiter.backend.reset()
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    """Crear la aplicación de testing con otros valores de configuración"""
+    import config
+
+    def make(**settings):
+        custom = type('CustomTestingConfig', (config.TestingConfig,), settings)
+        monkeypatch.setitem(config.config, 'custom', custom)
+        app = create_app('custom')
+        response_cache.clear()
+        rate_limiter.backend.reset()
+        return app
+    return make
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(app):
+    """Cliente con la sesión del administrador creado por init_database"""
+    client = app.test_client()
+    response = client.post('/admin/login', json={'username': 'admin', 'password': 'admin123'})
+    assert response.status_code == 200
+    return client
+
+
+@pytest.fixture
+def messages(app):
+    """Crear mensajes de contacto con fechas distintas; devuelve sus ids (del más reciente al más antiguo)"""
+    from backend.models import ContactMessage
+
+    def create(count, **fields):
+        base = datetime(2024, 1, 1)
+        with app.app_context():
+            rows = [
+                ContactMessage(
+                    nombre=fields.get('nombre', f'Cliente {i}'),
+                    email=f'cliente{i}@example.com',
+                    telefono='600000000',
+                    servicio=fields.get('servicio', 'pos'),
+                    mensaje=fields.get('mensaje', f'Mensaje número {i}'),
+                    fecha=base + timedelta(hours=i),
+                    ip_address='203.0.113.7'
+                )
+                for i in range(count)
+            ]
+            db.session.add_all(rows)
+            db.session.commit()
+            return [row.id for row in reversed(rows)]
+    return create
@@ -0,0 +1,70 @@
+# Copias de seguridad en caliente: creación, verificación y rotación
+import gzip
+import os
+import sqlite3
+
+import pytest
+
+from backend.utils.backup import backup_manager
+
+
+@pytest.fixture
+def file_app(make_app, tmp_path):
+    """Aplicación con la base de datos en un archivo (la de memoria no se copia)"""
+    return make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "web.db"}',
+                    BACKUP_DIR=str(tmp_path / 'backups'), BACKUP_KEEP=2)
+
+
+def test_backup_is_a_compressed_consistent_copy(file_app, tmp_path):
+    with file_app.app_context():
+        backup = backup_manager.create_backup()
+
+    assert backup['path'].endswith('.db.gz')
+    assert backup_manager.verify(backup['path'])
+
+    restored = tmp_path / 'restored.db'
+    with gzip.open(backup['path']) as compressed:
+        restored.write_bytes(compressed.read())
+    connection = sqlite3.connect(restored)
+    try:
+        assert connection.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+        assert connection.execute("SELECT username FROM user").fetchall() == [('admin',)]
+    finally:
+        connection.close()
+
+
+def test_rotation_keeps_the_newest_backups(file_app):
+    with file_app.app_context():
+        created = [backup_manager.create_backup() for _ in range(3)]
+        names = [backup['name'] for backup in backup_manager.list_backups()]
+
+    created = [os.path.basename(backup['path']) for backup in created]
+    assert names == [created[2], created[1]]
+    assert not os.path.exists(os.path.join(file_app.config['BACKUP_DIR'], created[0]))
+
+
+def test_verify_detects_a_corrupted_backup(file_app):
+    with file_app.app_context():
+        backup = backup_manager.create_backup()
+    with open(backup['path'], 'r+b') as f:
+        f.seek(-8, 2)
+        f.write(b'\0' * 8)
+
+    assert not backup_manager.verify(backup['path'])
+    result = file_app.test_cli_runner().invoke(args=['backup', 'verify'])
+    assert result.exit_code == 1
+    assert '❌' in result.output
+
+
+def test_cli_create_and_list(file_app):
+    runner = file_app.test_cli_runner()
+    result = runner.invoke(args=['backup', 'create'])
+    assert result.exit_code == 0, result.output
+    assert 'Backup creado' in result.output
+    assert '.db.gz' in runner.invoke(args=['backup', 'list']).output
+
+
+def test_memory_database_cannot_be_backed_up(app):
+    from backend.utils.backup import BackupError
+    with app.app_context(), pytest.raises(BackupError):
+        backup_manager.create_backup()
@@ -0,0 +1,43 @@
+# /api/bootstrap: contenido de la página de inicio en una sola respuesta cacheada
+from datetime import datetime
+
+from backend.database import db
+from backend import models
+
+
+def test_bootstrap_returns_all_sections(client):
+    data = client.get('/api/bootstrap').get_json()
+    assert set(data) == {'projects', 'testimonials', 'blog'}
+    assert data['projects'] == client.get('/api/projects').get_json()
+    assert data['testimonials'] == client.get('/api/testimonials').get_json()
+
+
+def test_bootstrap_is_cached_until_any_section_changes(app, client):
+    assert client.get('/api/bootstrap').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/bootstrap').headers['X-Cache'] == 'HIT'
+
+    with app.app_context():
+        db.session.add(models.BlogPost(titulo='Nuevo artículo', slug='nuevo', contenido='Texto',
+                                publicado=True, fecha_publicacion=datetime(2024, 1, 1)))
+        db.session.commit()
+
+    response = client.get('/api/bootstrap')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [post['slug'] for post in response.get_json()['blog']] == ['nuevo']
+
+    with app.app_context():
+        models.Testimonial.query.first().empresa = 'Otra empresa'
+        db.session.commit()
+    assert client.get('/api/bootstrap').headers['X-Cache'] == 'MISS'
+
+
+def test_bootstrap_sections_are_cached_separately(client):
+    assert client.get('/api/bootstrap').headers['X-Cache'] == 'MISS'
+    response = client.get('/api/bootstrap?fields=projects')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert list(response.get_json()) == ['projects']
+    assert client.get('/api/bootstrap?fields=projects').headers['X-Cache'] == 'HIT'
+
+
+def test_bootstrap_rejects_unknown_section(client):
+    assert client.get('/api/bootstrap?fields=usuarios').status_code == 400
@@ -0,0 +1,67 @@
+# Acciones masivas sobre mensajes en una sola transacción
+from backend.models import ContactMessage
+from backend.routes import api
+
+
+def _unread(app):
+    with app.app_context():
+        return ContactMessage.query.filter_by(leido=False).count()
+
+
+def test_bulk_mark_read_by_ids(app, admin_client, messages):
+    ids = messages(5)
+    response = admin_client.post('/api/admin/messages/bulk',
+                                 json={'action': 'mark_read', 'ids': ids[:3]})
+    assert response.status_code == 200
+    assert response.get_json()['affected'] == 3
+    assert _unread(app) == 2
+
+
+def test_bulk_failure_rolls_back_every_chunk(app, admin_client, messages, monkeypatch):
+    ids = messages(5)
+    monkeypatch.setattr(api, 'BULK_ID_CHUNK', 2)
+
+    from sqlalchemy.orm import Query
+    original_update = Query.update
+    calls = []
+
+    def failing_update(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError('fallo simulado')
+        return original_update(self, *args, **kwargs)
+
+    monkeypatch.setattr(Query, 'update', failing_update)
+    response = admin_client.post('/api/admin/messages/bulk',
+                                 json={'action': 'mark_read', 'ids': ids})
+    assert response.status_code == 500
+    # El primer trozo ya actualizado también se revierte
+    assert _unread(app) == 5
+
+
+def test_bulk_rejects_empty_filters(admin_client, messages):
+    messages(2)
+    response = admin_client.post('/api/admin/messages/bulk',
+                                 json={'action': 'delete', 'filters': {}})
+    assert response.status_code == 400
+
+
+def test_bulk_rejects_filters_without_effect(app, admin_client, messages):
+    messages(3)
+    for filters in ({'read': 'all'}, {'service': 'all'}, {'q': '   '},
+                    {'read': 'all', 'service': 'all', 'q': ''}):
+        response = admin_client.post('/api/admin/messages/bulk',
+                                     json={'action': 'delete', 'filters': filters})
+        assert response.status_code == 400, filters
+    with app.app_context():
+        assert ContactMessage.query.count() == 3
+
+
+def test_bulk_rejects_non_string_dates(app, admin_client, messages):
+    messages(3)
+    for key in ('date_from', 'date_to'):
+        response = admin_client.post('/api/admin/messages/bulk',
+                                     json={'action': 'delete', 'filters': {key: 20240101}})
+        assert response.status_code == 400
+    with app.app_context():
+        assert ContactMessage.query.count() == 3
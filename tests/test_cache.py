@@ -0,0 +1,68 @@
+# Caché de respuestas de la API pública y peticiones condicionales (304)
+from datetime import datetime
+
+from backend.database import db
+from backend.models import BlogPost, Project
+
+
+def test_listing_is_cached_and_invalidated_on_change(app, client):
+    first = client.get('/api/projects')
+    assert first.status_code == 200
+    assert first.headers['X-Cache'] == 'MISS'
+    assert client.get('/api/projects').headers['X-Cache'] == 'HIT'
+
+    with app.app_context():
+        project = Project.query.filter_by(activo=True).first()
+        project.titulo = 'Título actualizado'
+        db.session.commit()
+
+    response = client.get('/api/projects')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert 'Título actualizado' in [item['titulo'] for item in response.get_json()]
+
+
+def test_rollback_discards_pending_invalidation(app, client):
+    client.get('/api/projects')
+    with app.app_context():
+        project = Project.query.first()
+        project.titulo = 'Cambio descartado'
+        db.session.flush()
+        # El listener de after_soft_rollback recibe (session, previous_transaction)
+        db.session.rollback()
+        assert 'response_cache_tags' not in db.session.info
+
+    response = client.get('/api/projects')
+    assert 'Cambio descartado' not in [item['titulo'] for item in response.get_json()]
+
+
+def test_if_none_match_returns_304(client):
+    response = client.get('/api/projects')
+    etag = response.headers['ETag']
+
+    revalidated = client.get('/api/projects', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+
+
+def test_if_modified_since_returns_304(app, client):
+    with app.app_context():
+        db.session.add(BlogPost(titulo='Nuevo', slug='nuevo', contenido='Texto', publicado=True,
+                                fecha_publicacion=datetime(2024, 1, 1)))
+        db.session.commit()
+
+    response = client.get('/api/blog')
+    last_modified = response.headers['Last-Modified']
+    revalidated = client.get('/api/blog', headers={'If-Modified-Since': last_modified})
+    assert revalidated.status_code == 304
+
+
+def test_etag_changes_after_update(app, client):
+    etag = client.get('/api/projects').headers['ETag']
+    with app.app_context():
+        Project.query.first().titulo = 'Otro título'
+        db.session.commit()
+
+    response = client.get('/api/projects', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
@@ -0,0 +1,150 @@
+# Ingesta de mensajes de contacto: reintentos idempotentes y aviso por SMTP
+import socket
+import threading
+
+import pytest
+
+from backend.database import db
+from backend.models import ContactMessage
+from backend.utils.contact_queue import enqueue_contact_message
+from backend.utils.job_queue import job_queue
+
+CONTACT = {'nombre': 'Ana', 'email': 'ana@example.com', 'servicio': 'pos', 'mensaje': 'Hola'}
+
+
+# Estado de la cola global que init_app cambia; se restaura al terminar cada test
+QUEUE_ATTRIBUTES = ('path', 'eager', 'workers', 'poll_interval', 'max_attempts',
+                    'backoff_base', 'backoff_max', '_app', '_local')
+
+
+@pytest.fixture
+def queued(app, tmp_path, monkeypatch):
+    """La cola global sin ejecución inmediata ni hilos, para controlar los reintentos"""
+    for attribute in QUEUE_ATTRIBUTES:
+        monkeypatch.setattr(job_queue, attribute, getattr(job_queue, attribute))
+    monkeypatch.setattr(job_queue, '_local', threading.local())
+    app.config.update(JOB_QUEUE_EAGER=False, JOB_QUEUE_PATH=str(tmp_path / 'jobs.db'),
+                      JOB_QUEUE_WORKERS=0, JOB_QUEUE_BACKOFF_BASE=0.0,
+                      CONTACT_NOTIFICATION_EMAIL='admin@example.com')
+    job_queue.init_app(app)
+    yield app
+    job_queue._connection().close()
+
+
+def _jobs():
+    return job_queue._connection().execute(
+        'SELECT kind, status FROM job ORDER BY id'
+    ).fetchall()
+
+
+def test_retry_after_commit_does_not_duplicate_messages(queued, monkeypatch):
+    with queued.test_request_context():
+        enqueue_contact_message(CONTACT, '203.0.113.7')
+        enqueue_contact_message(dict(CONTACT, nombre='Luis'), '203.0.113.8')
+
+    # El primer aviso falla después de insertar el lote
+    original_enqueue = job_queue.enqueue
+    failures = []
+
+    def flaky_enqueue(kind, payload, delay=0, key=None):
+        if kind == 'contact_notification' and not failures:
+            failures.append(kind)
+            raise RuntimeError('cola no disponible')
+        return original_enqueue(kind, payload, delay, key)
+
+    monkeypatch.setattr(job_queue, 'enqueue', flaky_enqueue)
+    job_queue.run_pending()
+
+    with queued.app_context():
+        assert ContactMessage.query.count() == 2
+    assert _jobs() == [('contact_notification', 'pending'), ('contact_notification', 'pending')]
+
+
+def test_notification_key_is_not_enqueued_twice(queued):
+    assert job_queue.enqueue('contact_notification', {'message_id': 1}, key='1') is not None
+    assert job_queue.enqueue('contact_notification', {'message_id': 1}, key='1') is None
+    assert len(_jobs()) == 1
+
+
+def test_failed_notification_can_be_enqueued_again(queued, monkeypatch):
+    from backend.utils import contact_queue
+
+    def failing_send(*args, **kwargs):
+        raise OSError('SMTP no disponible')
+
+    monkeypatch.setattr(contact_queue, 'send_email', failing_send)
+    monkeypatch.setattr(job_queue, 'max_attempts', 1)
+    with queued.test_request_context():
+        enqueue_contact_message(CONTACT, '203.0.113.7')
+    job_queue.run_pending()
+    job_queue.run_pending()
+    assert _jobs() == [('contact_notification', 'failed')]
+
+    with queued.app_context():
+        message_id = db.session.query(ContactMessage.id).scalar()
+    assert job_queue.enqueue('contact_notification', {'message_id': message_id},
+                             key=str(message_id)) is not None
+    assert _jobs() == [('contact_notification', 'failed'), ('contact_notification', 'pending')]
+
+
+def test_notification_headers_drop_control_characters(app, monkeypatch):
+    from backend.utils import contact_queue
+
+    sent = []
+    monkeypatch.setattr(contact_queue, 'send_email',
+                        lambda to, subject, body, reply_to=None: sent.append((subject, reply_to)))
+    app.config['CONTACT_NOTIFICATION_EMAIL'] = 'admin@example.com'
+    with app.app_context():
+        for email in ('ana@example.com\r\nBcc: otro@example.com', 'Ana <ana@example.com>'):
+            message = ContactMessage(nombre='Ana\r\nBcc: otro@example.com', email=email,
+                                     servicio='pos\x00', mensaje='Hola')
+            db.session.add(message)
+            db.session.commit()
+            contact_queue.send_contact_notifications([{'message_id': message.id}])
+
+    assert sent == [
+        ('Nuevo mensaje de contacto: Ana Bcc: otro@example.com (pos )', None),
+        ('Nuevo mensaje de contacto: Ana Bcc: otro@example.com (pos )', None)
+    ]
+
+
+class _Recorder:
+    """Handler de aiosmtpd que guarda los mensajes recibidos"""
+
+    def __init__(self):
+        self.messages = []
+        self.received = threading.Event()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.received.set()
+        return '250 OK'
+
+
+def test_notification_is_delivered_over_smtp(app, client):
+    controller_module = pytest.importorskip('aiosmtpd.controller')
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    recorder = _Recorder()
+    controller = controller_module.Controller(recorder, hostname='127.0.0.1', port=port)
+    controller.start()
+    try:
+        app.config.update(CONTACT_NOTIFICATION_EMAIL='admin@example.com',
+                          MAIL_SERVER='127.0.0.1', MAIL_PORT=port, MAIL_USE_TLS=False,
+                          MAIL_USERNAME=None, MAIL_DEFAULT_SENDER='web@example.com')
+        response = client.post('/api/contact', json=CONTACT)
+        assert response.status_code == 202
+        assert recorder.received.wait(5)
+    finally:
+        controller.stop()
+
+    envelope = recorder.messages[0]
+    assert envelope.rcpt_tos == ['admin@example.com']
+    content = envelope.content.decode()
+    assert 'Reply-To: ana@example.com' in content
+    assert 'Nuevo mensaje de contacto: Ana (pos)' in content
+    with app.app_context():
+        assert db.session.query(ContactMessage.token_envio).scalar()
+
@@ -0,0 +1,60 @@
+# Exportación de mensajes en streaming (CSV / NDJSON)
+import csv
+import io
+import json
+
+from backend.utils import export
+
+
+def test_csv_export_is_streamed_in_chunks(admin_client, messages, monkeypatch):
+    messages(5)
+    monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 2)
+
+    response = admin_client.get('/api/admin/messages/export?format=csv')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers['Content-Disposition'].endswith('.csv"')
+    assert response.headers['Cache-Control'] == 'no-store'
+
+    chunks = [chunk for chunk in response.response if chunk]
+    assert len(chunks) == 3
+    text = b''.join(chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in chunks)
+    rows = list(csv.reader(io.StringIO(text.decode('utf-8-sig'))))
+    assert rows[0][:3] == ['id', 'fecha', 'nombre']
+    assert len(rows) == 6
+
+
+def test_csv_export_neutralises_formulas(admin_client, messages):
+    messages(1, nombre='=HYPERLINK("http://example.com")', mensaje='+34 600 000 000')
+    text = admin_client.get('/api/admin/messages/export?format=csv').get_data(as_text=True)
+    row = dict(zip(*list(csv.reader(io.StringIO(text.lstrip('\ufeff'))))))
+    assert row['nombre'] == '\'=HYPERLINK("http://example.com")'
+    assert row['mensaje'] == "'+34 600 000 000"
+
+
+def test_ndjson_export_applies_listing_filters(admin_client, messages):
+    messages(3, servicio='pos')
+    messages(2, servicio='web')
+    response = admin_client.get('/api/admin/messages/export?format=ndjson&service=web')
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(records) == 2
+    assert {record['servicio'] for record in records} == {'web'}
+    # NDJSON conserva los valores tal cual, sin el escape de fórmulas del CSV
+    assert records[0]['nombre'].startswith('Cliente')
+
+
+def test_analytics_export_counts_per_day_and_service(admin_client, messages):
+    messages(3, servicio='pos')
+    messages(2, servicio='web')
+    text = admin_client.get('/api/admin/analytics/export?format=csv').get_data(as_text=True)
+    rows = list(csv.reader(io.StringIO(text.lstrip('\ufeff'))))
+    assert rows == [['dia', 'servicio', 'mensajes'], ['2024-01-01', 'pos', '3'],
+                    ['2024-01-01', 'web', '2']]
+
+
+def test_unknown_format_returns_400(admin_client):
+    assert admin_client.get('/api/admin/messages/export?format=xlsx').status_code == 400
+
+
+def test_export_requires_login(client):
+    assert client.get('/api/admin/messages/export').status_code == 302
@@ -0,0 +1,72 @@
+# Variantes de imágenes: caché por entrada del índice y generación en la cola
+import pytest
+
+from backend.utils import images
+from backend.utils.job_queue import job_queue
+from backend.utils.static_files import static_files
+
+PIL = pytest.importorskip('PIL.Image')
+
+WEBP = {'Accept': 'image/webp,image/*'}
+
+
+@pytest.fixture
+def uploads(make_app, tmp_path):
+    upload_dir = tmp_path / 'uploads'
+    upload_dir.mkdir()
+    PIL.new('RGB', (800, 600), 'red').save(upload_dir / 'foto.png')
+    app = make_app(UPLOAD_FOLDER=str(upload_dir), IMAGE_CACHE_DIR=str(tmp_path / 'images'))
+    return app
+
+
+def test_variant_is_served_when_generated_eagerly(uploads):
+    response = uploads.test_client().get('/uploads/foto.png?w=480', headers=WEBP)
+    assert response.status_code == 200
+    assert response.mimetype == 'image/webp'
+    assert {'Accept', 'Accept-Encoding'} <= set(response.vary)
+
+
+def test_missing_variant_is_queued_and_original_served(uploads, monkeypatch):
+    queued = []
+    monkeypatch.setattr(job_queue, 'enqueue',
+                        lambda kind, payload, delay=0, key=None: queued.append(payload))
+    alpha_checks = []
+    original_has_alpha = images.has_alpha
+    monkeypatch.setattr(images, 'has_alpha',
+                        lambda path: alpha_checks.append(path) or original_has_alpha(path))
+    monkeypatch.setattr(static_files, 'check_interval', 60)
+    client = uploads.test_client()
+
+    for _ in range(3):
+        response = client.get('/uploads/foto.png?w=480', headers=WEBP)
+        assert response.mimetype == 'image/png'
+        # El original también depende de Accept mientras no hay variante
+        assert 'Accept' in response.vary
+
+    # Un solo trabajo encolado y una sola lectura del original mientras no cambie
+    assert [(p['width'], p['format']) for p in queued] == [(480, 'webp')]
+    assert len(alpha_checks) == 1
+
+    # Cuando la cola genera la variante se sirve tras la siguiente comprobación
+    images.get_derivative(queued[0]['path'], uploads.config['IMAGE_CACHE_DIR'], 480, 'webp')
+    monkeypatch.setattr(static_files, 'check_interval', 0)
+    assert client.get('/uploads/foto.png?w=480', headers=WEBP).mimetype == 'image/webp'
+
+
+def test_uploads_only_serve_images(uploads):
+    upload_dir = uploads.config['UPLOAD_FOLDER']
+    with open(f'{upload_dir}/notas.txt', 'w') as f:
+        f.write('privado')
+    with open(f'{upload_dir}/foto.PNG.bak', 'w') as f:
+        f.write('copia')
+
+    client = uploads.test_client()
+    assert client.get('/uploads/foto.png').status_code == 200
+    assert client.get('/uploads/notas.txt').status_code == 404
+    assert client.get('/uploads/foto.PNG.bak').status_code == 404
+    assert not any(path.endswith('notas.txt') for path in static_files._entries)
+
+
+def test_image_cache_inside_uploads_is_rejected(make_app, tmp_path):
+    with pytest.raises(RuntimeError):
+        make_app(UPLOAD_FOLDER=str(tmp_path), IMAGE_CACHE_DIR=str(tmp_path / 'cache'))
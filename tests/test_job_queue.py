@@ -0,0 +1,111 @@
+# Cola de trabajos persistente: reintentos con espera y fallo definitivo
+import pytest
+
+from backend.utils.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(app, tmp_path):
+    app.config.update(JOB_QUEUE_EAGER=False, JOB_QUEUE_PATH=str(tmp_path / 'jobs.db'),
+                      JOB_QUEUE_WORKERS=0, JOB_QUEUE_MAX_ATTEMPTS=2,
+                      JOB_QUEUE_BACKOFF_BASE=0.0)
+    queue = JobQueue()
+    queue.init_app(app)
+    yield queue
+    app.config['JOB_QUEUE_EAGER'] = True
+
+
+def _jobs(queue):
+    return queue._connection().execute(
+        'SELECT payload, status, attempts FROM job ORDER BY id'
+    ).fetchall()
+
+
+def test_successful_jobs_are_removed(queue):
+    done = []
+    queue.handler('echo', batch_size=10)(lambda payloads: done.extend(payloads))
+    queue.enqueue('echo', {'n': 1})
+    queue.enqueue('echo', {'n': 2})
+
+    assert queue.run_pending() == 2
+    assert done == [{'n': 1}, {'n': 2}]
+    assert _jobs(queue) == []
+
+
+def test_failing_job_is_retried_then_marked_failed(queue):
+    calls = []
+
+    def handler(payloads):
+        calls.append(payloads)
+        raise RuntimeError('SMTP no disponible')
+
+    queue.handler('flaky')(handler)
+    queue.enqueue('flaky', {'n': 1})
+
+    queue.run_pending()
+    assert _jobs(queue) == [('{"n": 1}', 'pending', 1)]
+
+    queue.run_pending()
+    assert _jobs(queue) == [('{"n": 1}', 'failed', 2)]
+    assert len(calls) == 2
+
+
+def test_bad_job_in_batch_does_not_block_the_rest(queue):
+    done = []
+
+    def handler(payloads):
+        if any(payload['bad'] for payload in payloads):
+            raise ValueError('payload defectuoso')
+        done.extend(payloads)
+
+    queue.handler('batch', batch_size=10)(handler)
+    for bad in (False, True, False):
+        queue.enqueue('batch', {'bad': bad})
+
+    queue.run_pending()
+    assert done == [{'bad': False}, {'bad': False}]
+    assert [status for _, status, _ in _jobs(queue)] == ['pending']
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue('desconocido', {})
+
+
+def test_failed_job_key_can_be_enqueued_again(queue):
+    def handler(payloads):
+        raise RuntimeError('sin espacio en disco')
+
+    queue.handler('variant')(handler)
+    assert queue.enqueue('variant', {'n': 1}, key='foto-640.webp') is not None
+    assert queue.enqueue('variant', {'n': 1}, key='foto-640.webp') is None
+
+    queue.run_pending()
+    queue.run_pending()
+    assert queue.enqueue('variant', {'n': 1}, key='foto-640.webp') is not None
+    assert [status for _, status, _ in _jobs(queue)] == ['failed', 'pending']
+
+
+def test_legacy_dedupe_index_is_replaced(app, tmp_path):
+    import sqlite3
+
+    path = tmp_path / 'legacy.db'
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        'CREATE TABLE job (id INTEGER PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, '
+        "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+        'run_at REAL NOT NULL, locked_until REAL, last_error TEXT, created_at REAL NOT NULL, '
+        'dedupe_key TEXT);'
+        'CREATE UNIQUE INDEX ux_job_kind_dedupe_key ON job (kind, dedupe_key);'
+    )
+    connection.close()
+
+    app.config.update(JOB_QUEUE_EAGER=False, JOB_QUEUE_PATH=str(path), JOB_QUEUE_WORKERS=0)
+    queue = JobQueue()
+    queue.init_app(app)
+    app.config['JOB_QUEUE_EAGER'] = True
+    indexes = {row[0] for row in queue._connection().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'job'"
+    )}
+    assert 'ux_job_kind_dedupe_key' not in indexes
+    assert 'ux_job_kind_dedupe_key_active' in indexes
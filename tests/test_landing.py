@@ -0,0 +1,56 @@
+# Página de inicio con los datos iniciales incrustados
+import json
+import re
+
+from backend.database import db
+from backend.models import Project
+
+
+def _initial_data(response):
+    match = re.search(rb'<script id="initial-data" type="application/json">(.*?)</script>',
+                      response.data)
+    assert match, 'la página no lleva los datos incrustados'
+    return json.loads(match.group(1))
+
+
+def test_landing_embeds_public_content(client):
+    response = client.get('/static/index.html')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/html'
+    data = _initial_data(response)
+    assert set(data) == {'projects', 'testimonials', 'blog'}
+    assert data['projects'] and 'activo' not in data['projects'][0]
+
+
+def test_landing_is_cached_and_revalidated(client):
+    first = client.get('/static/index.html')
+    assert first.headers['X-Cache'] == 'MISS'
+    second = client.get('/static/index.html')
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.headers['ETag'] == first.headers['ETag']
+
+    revalidated = client.get('/static/index.html', headers={'If-None-Match': first.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_landing_is_regenerated_when_content_changes(app, client):
+    etag = client.get('/static/index.html').headers['ETag']
+    with app.app_context():
+        Project.query.filter_by(activo=True).first().titulo = 'Proyecto </script> nuevo'
+        db.session.commit()
+
+    response = client.get('/static/index.html', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.headers['ETag'] != etag
+    # El texto se escapa para no cerrar el <script> antes de tiempo
+    assert b'</script> nuevo' not in response.data
+    titles = [project['titulo'] for project in _initial_data(response)['projects']]
+    assert 'Proyecto </script> nuevo' in titles
+
+
+def test_landing_gzip_variant(client):
+    response = client.get('/static/index.html', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].endswith('-gz"')
+    assert 'Accept-Encoding' in response.vary
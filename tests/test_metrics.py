@@ -0,0 +1,35 @@
+# Acceso al exportador de Prometheus (/metrics)
+from config import ProductionConfig
+
+
+def test_metrics_open_outside_production(client):
+    assert client.get('/metrics').status_code == 200
+
+
+def test_metrics_loopback_only_without_token(make_app):
+    client = make_app(METRICS_LOOPBACK_ONLY=True).test_client()
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '::1'}).status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.5'}).status_code == 403
+
+
+def test_metrics_token_is_required_when_set(make_app):
+    client = make_app(METRICS_LOOPBACK_ONLY=True, METRICS_TOKEN='secreto').test_client()
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secreto'},
+                          environ_base={'REMOTE_ADDR': '203.0.113.5'})
+    assert response.status_code == 200
+    assert b'http_requests_total' in response.data
+
+
+def test_metrics_closed_by_default_in_production():
+    assert ProductionConfig.METRICS_LOOPBACK_ONLY is True
+
+
+def test_metrics_loopback_ignores_forwarded_for(make_app):
+    client = make_app(METRICS_LOOPBACK_ONLY=True, PROXY_FIX_X_FOR=1).test_client()
+    spoofed = client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.5'},
+                         headers={'X-Forwarded-For': '127.0.0.1'})
+    assert spoofed.status_code == 403
+    local = client.get('/metrics', headers={'X-Forwarded-For': '198.51.100.1'})
+    assert local.status_code == 200
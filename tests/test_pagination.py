@@ -0,0 +1,54 @@
+# Paginación por cursor (keyset) de los listados del panel
+def test_cursor_pages_cover_all_messages_once(admin_client, messages):
+    ids = messages(7)
+
+    seen = []
+    after = ''
+    while True:
+        response = admin_client.get(f'/api/admin/messages?after={after}&limit=3')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['pagination']['mode'] == 'cursor'
+        seen.extend(message['id'] for message in data['messages'])
+        if not data['pagination']['has_next']:
+            break
+        after = data['pagination']['next_cursor']
+
+    assert seen == ids
+
+
+def test_cursor_total_on_request(admin_client, messages):
+    messages(4)
+    data = admin_client.get('/api/admin/messages?after=&limit=2&total=true').get_json()
+    assert data['pagination']['total'] == 4
+
+
+def test_invalid_cursor_returns_400(admin_client, messages):
+    messages(2)
+    response = admin_client.get('/api/admin/messages?after=no-es-un-cursor')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_cursor_pages_include_rows_without_date(app, admin_client, messages):
+    from backend.database import db
+    from backend.models import ContactMessage
+
+    ids = messages(6)
+    undated = ids[1::2]
+    with app.app_context():
+        ContactMessage.query.filter(ContactMessage.id.in_(undated)).update(
+            {'fecha': None}, synchronize_session=False)
+        db.session.commit()
+
+    seen = []
+    after = ''
+    while True:
+        data = admin_client.get(f'/api/admin/messages?after={after}&limit=2').get_json()
+        seen.extend(message['id'] for message in data['messages'])
+        if not data['pagination']['has_next']:
+            break
+        after = data['pagination']['next_cursor']
+
+    # Primero las fechadas (más recientes antes) y al final las que no tienen fecha
+    assert seen == [i for i in ids if i not in undated] + sorted(undated, reverse=True)
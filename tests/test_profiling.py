@@ -0,0 +1,25 @@
+# Cabecera Server-Timing del perfilado de peticiones
+from config import ProductionConfig
+
+
+def test_server_timing_header_by_default(client):
+    assert 'Server-Timing' in client.get('/api/projects').headers
+
+
+def test_server_timing_only_for_admins(make_app):
+    app = make_app(SERVER_TIMING_HEADER='admin')
+    anonymous = app.test_client()
+    assert 'Server-Timing' not in anonymous.get('/api/projects').headers
+
+    admin = app.test_client()
+    admin.post('/admin/login', json={'username': 'admin', 'password': 'admin123'})
+    assert 'db;dur=' in admin.get('/api/projects').headers['Server-Timing']
+
+
+def test_server_timing_disabled(make_app):
+    app = make_app(SERVER_TIMING_HEADER=False)
+    assert 'Server-Timing' not in app.test_client().get('/api/projects').headers
+
+
+def test_production_hides_server_timing_from_visitors():
+    assert ProductionConfig.SERVER_TIMING_HEADER == 'admin'
@@ -0,0 +1,123 @@
+# Limitación de peticiones con token buckets (429 y Retry-After)
+import pytest
+
+from backend.utils.rate_limit import MemoryBackend, rate_limiter
+
+CONTACT = {'nombre': 'Ana', 'email': 'ana@example.com', 'servicio': 'pos', 'mensaje': 'Hola'}
+
+
+@pytest.fixture
+def limited(app):
+    app.config['RATELIMIT_CONTACT_IP'] = (2, 60)
+    rate_limiter.enabled = True
+    yield app
+    rate_limiter.enabled = False
+
+
+def test_contact_returns_429_with_retry_after(limited, client):
+    assert client.post('/api/contact', json=CONTACT).status_code == 202
+    assert client.post('/api/contact', json=CONTACT).status_code == 202
+
+    response = client.post('/api/contact', json=CONTACT)
+    assert response.status_code == 429
+    retry_after = int(response.headers['Retry-After'])
+    assert 1 <= retry_after <= 30
+    assert response.get_json()['retry_after'] == retry_after
+
+
+def test_buckets_are_per_ip(limited, client):
+    for _ in range(2):
+        client.post('/api/contact', json=CONTACT)
+    assert client.post('/api/contact', json=CONTACT).status_code == 429
+
+    other = client.post('/api/contact', json=CONTACT, environ_base={'REMOTE_ADDR': '198.51.100.9'})
+    assert other.status_code == 202
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    backend = MemoryBackend()
+    now = [1000.0]
+    monkeypatch.setattr('backend.utils.rate_limit.time.monotonic', lambda: now[0])
+
+    assert backend.hit('k', 1, 10) == (True, 0.0)
+    allowed, retry_after = backend.hit('k', 1, 10)
+    assert not allowed and retry_after == pytest.approx(10)
+
+    now[0] += 10
+    assert backend.hit('k', 1, 10)[0]
+
+
+@pytest.fixture
+def proxied_app(make_app):
+    """Aplicación detrás de un proxy de confianza (PROXY_FIX_X_FOR = 1)"""
+    app = make_app(PROXY_FIX_X_FOR=1, RATELIMIT_CONTACT_IP=(1, 60))
+    rate_limiter.enabled = True
+    yield app
+    rate_limiter.enabled = False
+
+
+def test_forwarded_ip_is_used_for_buckets_and_storage(proxied_app):
+    from backend.models import ContactMessage
+
+    client = proxied_app.test_client()
+    balancer = {'REMOTE_ADDR': '10.0.0.1'}
+
+    first = client.post('/api/contact', json=CONTACT, environ_base=balancer,
+                        headers={'X-Forwarded-For': '198.51.100.1'})
+    second = client.post('/api/contact', json=CONTACT, environ_base=balancer,
+                         headers={'X-Forwarded-For': '198.51.100.2'})
+    repeated = client.post('/api/contact', json=CONTACT, environ_base=balancer,
+                           headers={'X-Forwarded-For': '198.51.100.1'})
+    assert (first.status_code, second.status_code, repeated.status_code) == (202, 202, 429)
+
+    with proxied_app.app_context():
+        stored = sorted(ip for ip, in ContactMessage.query.with_entities(ContactMessage.ip_address))
+    assert stored == ['198.51.100.1', '198.51.100.2']
+
+
+def test_forwarded_header_is_ignored_without_trusted_proxy(limited, client):
+    for number in range(2):
+        client.post('/api/contact', json=CONTACT, headers={'X-Forwarded-For': f'198.51.100.{number}'})
+    response = client.post('/api/contact', json=CONTACT, headers={'X-Forwarded-For': '198.51.100.9'})
+    assert response.status_code == 429
+
+
+@pytest.fixture
+def login_limited(app):
+    app.config.update(RATELIMIT_LOGIN_IP=(100, 60), RATELIMIT_LOGIN_USERNAME=(2, 300))
+    rate_limiter.enabled = True
+    yield app
+    rate_limiter.enabled = False
+
+
+def _login(client, password, ip='203.0.113.1'):
+    return client.post('/admin/login', json={'username': 'admin', 'password': password},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+def test_successful_logins_do_not_consume_attempts(login_limited, client):
+    for _ in range(5):
+        assert _login(client, 'admin123').status_code == 200
+
+
+def test_failed_logins_are_limited_per_username_and_ip(login_limited, client):
+    assert _login(client, 'mala').status_code == 401
+    assert _login(client, 'mala').status_code == 401
+
+    # Ni siquiera la contraseña correcta pasa desde la IP que agotó los intentos
+    response = _login(client, 'admin123')
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers
+
+    # El administrador sigue pudiendo entrar desde su propia IP
+    assert _login(client, 'admin123', ip='198.51.100.20').status_code == 200
+
+
+def test_sqlite_backend_peek_does_not_consume(tmp_path):
+    from backend.utils.rate_limit import SQLiteBackend
+
+    backend = SQLiteBackend(str(tmp_path / 'ratelimit.db'))
+    assert backend.peek('k', 1, 60) == (True, 0.0)
+    assert backend.hit('k', 1, 60)[0]
+    allowed, retry_after = backend.peek('k', 1, 60)
+    assert not allowed and retry_after > 0
@@ -0,0 +1,79 @@
+# Índice FTS5 de artículos y mensajes mantenido por triggers
+from datetime import datetime
+
+import pytest
+
+from backend.database import db
+from backend.models import BlogPost, ContactMessage
+from backend.utils.search import fts5_available, search_blog_posts, search_messages
+
+
+@pytest.fixture(autouse=True)
+def require_fts5(app):
+    with app.app_context():
+        if not fts5_available(db.session.connection()):
+            pytest.skip('SQLite sin FTS5')
+
+
+def _create_post(**fields):
+    post = BlogPost(titulo=fields.get('titulo', 'Inventario para tiendas'),
+                    slug=fields.get('slug', 'inventario-tiendas'),
+                    contenido=fields.get('contenido', 'Control de existencias con códigos de barras'),
+                    resumen='Resumen', publicado=True, fecha_publicacion=datetime(2024, 1, 1))
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_insert_update_delete_keep_index_in_sync(app):
+    with app.app_context():
+        post = _create_post()
+        assert [r['slug'] for r in search_blog_posts('existencias', 10)] == ['inventario-tiendas']
+
+        post.contenido = 'Facturación electrónica para farmacias'
+        db.session.commit()
+        assert search_blog_posts('existencias', 10) == []
+        assert [r['slug'] for r in search_blog_posts('farmacias', 10)] == ['inventario-tiendas']
+
+        db.session.delete(post)
+        db.session.commit()
+        assert search_blog_posts('farmacias', 10) == []
+
+
+def test_update_of_unindexed_column_keeps_row_searchable(app, messages):
+    messages(1, mensaje='Necesito un sistema de facturación')
+    with app.app_context():
+        message = ContactMessage.query.first()
+        message.leido = True
+        db.session.commit()
+        results = search_messages('facturación', 10)
+        assert [r['id'] for r in results] == [message.id]
+
+
+def test_search_endpoint_orders_by_relevance(app, client):
+    with app.app_context():
+        _create_post(titulo='Guía de inventario', slug='guia', contenido='inventario inventario inventario')
+        _create_post(titulo='Otro tema', slug='otro', contenido='Un inventario breve')
+
+    data = client.get('/api/search?q=inventario').get_json()
+    assert data['success'] is True
+    assert [r['slug'] for r in data['results']] == ['guia', 'otro']
+
+
+def test_messages_fall_back_to_like_without_index(app):
+    from backend.utils import search
+
+    with app.app_context():
+        # Base creada con db.create_all(): sin tabla FTS ni triggers
+        for suffix in ('ai', 'ad', 'au'):
+            db.session.execute(db.text(f'DROP TRIGGER contact_message_fts_{suffix}'))
+        db.session.execute(db.text('DROP TABLE contact_message_fts'))
+        db.session.commit()
+        search._fts_tables.pop(db.engine, None)
+
+        db.session.add(ContactMessage(nombre='Ana', email='ana@example.com', servicio='web',
+                                      mensaje='Necesito una tienda online'))
+        db.session.commit()
+        assert [r['nombre'] for r in search_messages('tienda', 10)] == ['Ana']
+        query = search.filter_messages(ContactMessage.query, 'tienda')
+        assert [m.nombre for m in query] == ['Ana']
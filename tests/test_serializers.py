@@ -0,0 +1,74 @@
+# Conjuntos de campos (?fields=) y proyección de columnas
+from sqlalchemy import event
+
+from backend.database import db
+
+
+def test_fields_limit_response_and_selected_columns(app, client):
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+    response = client.get('/api/projects?fields=id,titulo')
+    assert response.status_code == 200
+    assert all(set(item) == {'id', 'titulo'} for item in response.get_json())
+
+    select = [s for s in statements if 'FROM project' in s and 'ORDER BY project.orden' in s][-1]
+    assert 'descripcion_problema' not in select
+    assert 'project.titulo' in select
+
+
+def test_public_endpoints_reject_unknown_and_private_fields(client):
+    for url in ('/api/projects?fields=activo', '/api/projects?fields=nope',
+                '/api/testimonials?fields=orden', '/api/blog?fields=contenido',
+                '/api/blog?fields=publicado'):
+        response = client.get(url)
+        assert response.status_code == 400, url
+        assert response.get_json()['success'] is False
+
+
+def test_admin_can_request_any_model_field(admin_client):
+    response = admin_client.get('/api/admin/projects?fields=id,activo,fecha_actualizacion')
+    assert response.status_code == 200
+    assert set(response.get_json()['projects'][0]) == {'id', 'activo', 'fecha_actualizacion'}
+
+
+def test_admin_blog_list_omits_content_by_default(app, admin_client):
+    from datetime import datetime
+    from backend.models import BlogPost
+    with app.app_context():
+        db.session.add(BlogPost(titulo='T', slug='t', contenido='largo', publicado=True,
+                                fecha_publicacion=datetime(2024, 1, 1)))
+        db.session.commit()
+
+    post = admin_client.get('/api/admin/blog').get_json()['posts'][0]
+    assert 'contenido' not in post
+    post = admin_client.get('/api/admin/blog?fields=id,contenido').get_json()['posts'][0]
+    assert post == {'id': post['id'], 'contenido': 'largo'}
+
+
+def test_bootstrap_rejects_unknown_fields(client):
+    assert client.get('/api/bootstrap?fields=projects.activo').status_code == 400
+    assert client.get('/api/bootstrap?fields=usuarios').status_code == 400
+    data = client.get('/api/bootstrap?fields=projects.titulo').get_json()
+    assert list(data) == ['projects']
+    assert all(set(item) == {'titulo'} for item in data['projects'])
+
+
+def test_recent_messages_requires_login(client, messages):
+    messages(1)
+    response = client.get('/api/dashboard/recent-messages?fields=ip_address')
+    assert response.status_code == 302
+    assert b'203.0.113.7' not in response.data
+
+
+def test_recent_messages_reject_unknown_and_private_fields(admin_client, messages):
+    messages(2)
+    for name in ('ip_address', 'telefono', 'respuesta', 'nope'):
+        response = admin_client.get(f'/api/dashboard/recent-messages?fields=id,{name}')
+        assert response.status_code == 400, name
+
+    data = admin_client.get('/api/dashboard/recent-messages?fields=id,nombre').get_json()
+    assert len(data) == 2
+    assert all(set(item) == {'id', 'nombre'} for item in data)
@@ -0,0 +1,73 @@
+# Índice de estáticos: validadores, peticiones Range y refresco por mtime
+import os
+
+import pytest
+
+from backend.utils.static_files import static_files
+
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def uploads(make_app, tmp_path):
+    upload_dir = tmp_path / 'uploads'
+    upload_dir.mkdir()
+    (upload_dir / 'logo.png').write_bytes(PNG)
+    return make_app(UPLOAD_FOLDER=str(upload_dir), IMAGE_DERIVATIVES_ENABLED=False,
+                    STATIC_CHECK_INTERVAL=0)
+
+
+def test_full_response_has_validators(uploads):
+    response = uploads.test_client().get('/uploads/logo.png')
+    assert response.status_code == 200
+    assert response.data == PNG
+    assert response.mimetype == 'image/png'
+    assert response.headers['ETag']
+    assert response.headers['Last-Modified']
+
+
+def test_conditional_requests_return_304(uploads):
+    client = uploads.test_client()
+    response = client.get('/uploads/logo.png')
+
+    assert client.get('/uploads/logo.png', headers={
+        'If-None-Match': response.headers['ETag']
+    }).status_code == 304
+    assert client.get('/uploads/logo.png', headers={
+        'If-Modified-Since': response.headers['Last-Modified']
+    }).status_code == 304
+
+
+# Desde memoria y, con un límite menor que el archivo, con wsgi.file_wrapper
+@pytest.mark.parametrize('max_file', [256 * 1024, 16])
+def test_range_requests(uploads, monkeypatch, max_file):
+    monkeypatch.setattr(static_files, 'memory_max_file', max_file)
+    client = uploads.test_client()
+
+    partial = client.get('/uploads/logo.png', headers={'Range': 'bytes=8-15'})
+    assert partial.status_code == 206
+    assert partial.headers['Content-Range'] == f'bytes 8-15/{len(PNG)}'
+    assert partial.data == PNG[8:16]
+
+    beyond = client.get('/uploads/logo.png', headers={'Range': f'bytes={len(PNG) + 10}-'})
+    assert beyond.status_code == 416
+
+
+def test_changed_file_is_served_with_new_etag(uploads):
+    client = uploads.test_client()
+    first = client.get('/uploads/logo.png')
+
+    path = os.path.join(uploads.config['UPLOAD_FOLDER'], 'logo.png')
+    with open(path, 'wb') as f:
+        f.write(PNG[::-1])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    second = client.get('/uploads/logo.png', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.data == PNG[::-1]
+    assert second.headers['ETag'] != first.headers['ETag']
+
+
+def test_missing_file_returns_404(uploads):
+    assert uploads.test_client().get('/uploads/no-existe.png').status_code == 404
@@ -0,0 +1,51 @@
+# Caché de usuarios del user_loader: invalidación entre workers
+import pytest
+
+from backend.database import db
+from backend.utils.events import change_hub
+from backend.utils.user_cache import USER_CHANGED_EVENT, user_cache
+
+
+@pytest.fixture
+def shared_app(make_app, tmp_path):
+    """Aplicación con la tabla de eventos compartida entre workers"""
+    app = make_app(EVENTS_BACKEND='sqlite', EVENTS_PATH=str(tmp_path / 'events.db'))
+    user_cache.clear()
+    yield app
+    user_cache.clear()
+
+
+def _admin_email(app):
+    with app.app_context():
+        return user_cache.load(1).email
+
+
+def _update_in_other_worker(app, email):
+    """Cambio confirmado por otro proceso: sin eventos del ORM en este"""
+    with app.app_context():
+        db.session.execute(db.text('UPDATE user SET email = :email WHERE id = 1'),
+                           {'email': email})
+        db.session.commit()
+
+
+def test_change_in_other_worker_invalidates_entry(shared_app):
+    original = _admin_email(shared_app)
+
+    _update_in_other_worker(shared_app, 'nuevo@example.com')
+    # Sin aviso, la entrada cacheada sigue sirviéndose hasta el TTL
+    assert _admin_email(shared_app) == original
+
+    change_hub.publish(USER_CHANGED_EVENT, {'id': 1})
+    assert _admin_email(shared_app) == 'nuevo@example.com'
+
+
+def test_orm_change_is_published_after_commit(shared_app):
+    from backend.models import User
+
+    with shared_app.app_context():
+        user = db.session.get(User, 1)
+        user.email = 'otro@example.com'
+        db.session.commit()
+
+    events = change_hub.events_since(0, USER_CHANGED_EVENT)
+    assert [data for _, data in events] == [{'id': 1}]
@@ -0,0 +1,77 @@
+# Contador de vistas con escritura diferida
+import threading
+from datetime import datetime
+
+from sqlalchemy import event
+
+from backend.database import db
+from backend.models import BlogPost
+from backend.utils.view_counter import ViewCounter
+
+
+def _create_post(app):
+    with app.app_context():
+        post = BlogPost(titulo='Vistas', slug='vistas', contenido='Texto', publicado=True,
+                        fecha_publicacion=datetime(2024, 1, 1), vistas=0)
+        db.session.add(post)
+        db.session.commit()
+        return post.id
+
+
+def _stored_views(app, post_id):
+    with app.app_context():
+        return db.session.get(BlogPost, post_id).vistas
+
+
+def test_views_being_written_are_still_counted(app):
+    post_id = _create_post(app)
+    counter = ViewCounter(flush_interval=0, flush_threshold=1000)
+    with app.app_context():
+        for _ in range(3):
+            counter.increment(post_id)
+
+        seen = []
+
+        def during_update(conn, cursor, statement, *args):
+            if statement.startswith('UPDATE blog_post'):
+                seen.append(counter.pending(post_id))
+
+        event.listen(db.engine, 'before_cursor_execute', during_update)
+        try:
+            assert counter.flush() == 1
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', during_update)
+
+    assert seen == [3]
+    assert counter.pending(post_id) == 0
+    assert _stored_views(app, post_id) == 3
+
+
+def test_threshold_flush_runs_in_background_thread(app, monkeypatch):
+    post_id = _create_post(app)
+    counter = ViewCounter(flush_interval=60, flush_threshold=2)
+    flushed = threading.Event()
+    threads = []
+    original_flush = counter.flush
+
+    def recording_flush():
+        threads.append(threading.current_thread().name)
+        result = original_flush()
+        flushed.set()
+        return result
+
+    monkeypatch.setattr(counter, 'flush', recording_flush)
+    with app.app_context():
+        counter.increment(post_id)
+        counter.increment(post_id)
+
+    assert flushed.wait(5)
+    assert threads == ['view-counter-flush']
+    assert _stored_views(app, post_id) == 2
+
+
+def test_blog_post_includes_pending_views(app, client):
+    _create_post(app)
+    first = client.get('/api/blog/vistas').get_json()['vistas']
+    assert first >= 1
+    assert client.get('/api/blog/vistas').get_json()['vistas'] == first + 1